@@ -1,6 +1,7 @@
 import streamlit as st
 import base64
 from pathlib import Path
+from tablero import monitor, precarga  # precarga de los datos en segundo plano y monitor de sesiones
 
 # ===================================================
 # 1. Configuración inicial de la página
@@ -12,6 +13,15 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# ===================================================
+# 1.1 Precarga de datos (una sola vez por proceso, en segundo plano)
+# ===================================================
+# La primera visita arranca la carga de ambos conjuntos y sus agregados para
+# que al abrir las páginas 4 y 5 ya estén en caché (ver tablero/precarga.py).
+estado_precarga = precarga.iniciar()
+precarga.mostrar_estado(estado_precarga)
+monitor.registrar_sesion("portada")
+
 # ===================================================
 # 2. Rutas y carga de los logos y la imagen de fondo
 # ===================================================
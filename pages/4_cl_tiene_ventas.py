@@ -1,10 +1,11 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from pathlib import Path
 import datetime
 import base64 # ¡Esta importación debe estar aquí y solo aquí!
+from tablero import datos, filtros, precarga, monitor  # carga, filtros por máscara, precarga y cachés
+from tablero import cubos, tendencias, ranking, anomalias  # agregados precalculados
+from tablero import calidad, exportar, graficos  # calidad, exportación y figuras
 
 # ===================================================
 # 1. Configuración inicial de la página
@@ -21,7 +22,6 @@ data_folder_path = project_root / "data"
 
 # Ruta del archivo Excel
 excel_file_path = data_folder_path / "Ventas se le tiene_hoy.xlsx"
-df = pd.read_excel(excel_file_path)
 
 # Ruta de la imagen COE.jpeg (¡en mayúsculas!)
 logo_coe_path = data_folder_path / "COE.jpg"
@@ -44,39 +44,115 @@ encoded_logo_coe = encode_image(logo_coe_path)
 # ===================================================
 # 3. Preprocesamiento de Datos
 # ===================================================
-df['fecha_convertida'] = pd.to_datetime(df['Fecha'], errors='coerce')
-df['Agente'] = df['Agente'].astype(str)
-for col in ['Puntaje_Total_%', 'Confianza', 'Polarity', 'Subjectivity']:
-    df[col] = pd.to_numeric(df[col].astype(str).replace('%', ''), errors='coerce')
+estado_col = datos.ESTADO_COL_VENTAS # Asegúrate que este nombre de columna sea exacto
+
+# Preprocesamiento: tablero/datos.py (preparar_datos_ventas). Solo corre cuando
+# cambia el Excel y el resultado se publica en el almacén Arrow compartido.
+# El DataFrame queda compartido entre sesiones (st.cache_resource) y mapeado desde
+# el almacén, así que no se modifica después de aquí: los filtros se aplican con
+# máscaras sobre él. `version` solo forma parte de la clave de caché.
+@monitor.cache_recurso("datos", show_spinner="Cargando datos de ventas...", max_entries=1)
+def cargar_datos_ventas(ruta_archivo, version):
+    df, metadatos = datos.cargar_ventas(ruta_archivo)
+    # Índices por valor para el estado de la llamada y los agentes (precalculados)
+    indices = datos.indices_ventas(ruta_archivo)
+    # Informe de calidad hecho al preprocesar esta versión (tablero/calidad.py)
+    return df, indices, calidad.informe_de(metadatos)
+
+# Series de tendencia precalculadas (incrementales por versión del Excel)
+@monitor.cache_recurso("agregados", show_spinner=False, max_entries=1)
+def cargar_tendencias_ventas(ruta_archivo, version):
+    return datos.tendencias_ventas(ruta_archivo)
+
+# Acumulados por agente y día: mejores y peores agentes de cualquier ventana sin recorrer llamadas
+@monitor.cache_recurso("agregados", show_spinner=False, max_entries=1)
+def cargar_ranking_ventas(ruta_archivo, version):
+    return datos.ranking_ventas(ruta_archivo)
+
+# Cubo diario por Agente, estado y Cola: promedios del periodo anterior sin recorrer llamadas
+@monitor.cache_recurso("agregados", show_spinner=False, max_entries=1)
+def cargar_cubo_filtros_ventas(ruta_archivo, version):
+    return datos.cubo_filtros_ventas(ruta_archivo)
+
+# Índice de palabras de las columnas de texto (solo se abre cuando alguien busca)
+@monitor.cache_recurso("indices", show_spinner=False, max_entries=1)
+def cargar_busqueda_ventas(ruta_archivo, version):
+    return datos.busqueda_ventas(ruta_archivo)
+
+# Días atípicos por agente: los calcula la precarga en segundo plano; aquí solo se
+# abren si ya están publicados (si no, FileNotFoundError y no queda en caché)
+@monitor.cache_recurso("agregados", show_spinner=False, max_entries=1)
+def cargar_anomalias_ventas(ruta_archivo, version):
+    return datos.anomalias_ventas(ruta_archivo, calcular=False)
+
+# Si la página se abre sin pasar por la portada, también lanza la precarga
+precarga.iniciar()
+monitor.registrar_sesion("ventas")
+
+df_base, indices, informe_calidad = cargar_datos_ventas(excel_file_path, datos.version_conjunto("ventas", excel_file_path))
 
 # ===================================================
 # 4. Filtros en la barra lateral
 # ===================================================
 st.sidebar.title("🎛️ Filtros")
 
+# Cada filtro produce una máscara sobre df_base; se combinan al final.
+mascara = filtros.mascara_completa(df_base)
+# Valores elegidos por dimensión, para las mismas métricas en el periodo anterior
+selecciones = {}
+
 # Filtro por Estado de la Llamada
-estado_col = "Estado de la LLamada" # Asegúrate que este nombre de columna sea exacto
-if estado_col in df.columns:
-    estados = ["Todos"] + sorted(df[estado_col].dropna().unique())
+if estado_col in indices:
+    estados = ["Todos"] + list(indices[estado_col].valores)
     estado_sel = st.sidebar.selectbox("Estado de la Llamada", estados)
     if estado_sel != "Todos":
-        df = df[df[estado_col] == estado_sel]
+        mascara &= indices[estado_col].mascara_valor(estado_sel)
+        selecciones[estado_col] = [estado_sel]
 else:
     st.sidebar.warning(f"La columna '{estado_col}' no se encontró en los datos.")
 
 # Filtro por Rango de Fechas
-min_f, max_f = df['fecha_convertida'].min(), df['fecha_convertida'].max()
+fechas_estado = df_base['fecha_convertida'][mascara]
+min_f, max_f = fechas_estado.min(), fechas_estado.max()
 fecha_ini, fecha_fin = st.sidebar.date_input(
     "📅 Rango de Fechas",
     (min_f.date(), max_f.date() if pd.notna(max_f) else datetime.date.today())
 )
-df = df[(df['fecha_convertida'] >= pd.Timestamp(fecha_ini)) &
-        (df['fecha_convertida'] <= pd.Timestamp(fecha_fin))]
+# Fin inclusivo por día (las fechas traen hora), igual que los días del cubo del periodo anterior
+mascara &= filtros.mascara_rango_fechas(df_base['fecha_convertida'], fecha_ini, fecha_fin)
 
-# Filtro por Agentes
-agentes = sorted(df['Agente'].dropna().unique())
+# Filtro por Agentes (opciones: agentes con llamadas en los filtros anteriores)
+agentes = indices['Agente'].valores_presentes(mascara)
 agentes_sel = st.sidebar.multiselect("👤 Agentes", agentes, default=agentes)
-df = df[df['Agente'].isin(agentes_sel)]
+mascara &= indices['Agente'].mascara(agentes_sel)
+# Como en los demás filtros, el periodo anterior solo se restringe si el usuario
+# quitó algún agente (las opciones son los agentes de la ventana actual)
+if len(agentes_sel) < len(agentes):
+    selecciones['Agente'] = agentes_sel
+
+# Búsqueda por palabras en las columnas de texto (sin tildes ni mayúsculas)
+consulta = st.sidebar.text_input("🔎 Buscar en textos", placeholder="p. ej. negativo agente19",
+                                 help="Llamadas que contienen todas las palabras (también como inicio de palabra) "
+                                 "en la transcripción o en los datos de la llamada.")
+mascara_texto = None
+if consulta.strip():
+    mascara_texto = cargar_busqueda_ventas(excel_file_path, datos.version_conjunto("ventas", excel_file_path)).mascara(consulta)
+    mascara &= mascara_texto
+
+# Informe de calidad de esta versión del Excel, ya calculado al preprocesarla
+calidad.mostrar_informe(informe_calidad)
+
+# Una sola selección de filas sobre el DataFrame base
+df = filtros.seleccionar(df_base, mascara)
+if df.empty:
+    st.info("ℹ️ No hay llamadas para los filtros seleccionados. Ajusta tus selecciones.")
+    st.stop()
+
+
+def promedio(col):
+    # Las columnas del almacén son ArrowDtype: sin valores el promedio es pd.NA, no NaN
+    valor = df[col].mean()
+    return float(valor) if pd.notna(valor) else float("nan")
 
 # ===================================================
 # 5. Métricas Resumen
@@ -84,11 +160,30 @@ df = df[df['Agente'].isin(agentes_sel)]
 st.subheader("📋 Resumen General")
 col1, col2, col3, col4, col5, col6 = st.columns(6) # Definición correcta de 6 columnas
 
-col1.metric("Puntaje promedio", f"{df['Puntaje_Total_%'].mean():.2f}%")
-col2.metric("Confianza", f"{df['Confianza'].mean():.2f}%")
-col3.metric("Polaridad", f"{df['Polarity'].mean():.2f}")
-col4.metric("Subjetividad", f"{df['Subjectivity'].mean():.2f}")
-col5.metric("Total llamadas", len(df))
+# Delta de cada tarjeta: mismo filtro en el periodo anterior de igual largo, desde el cubo diario
+fecha_ini_anterior, fecha_fin_anterior = cubos.periodo_anterior(fecha_ini, fecha_fin)
+anterior = cubos.resumen(
+    cargar_cubo_filtros_ventas(excel_file_path, datos.version_conjunto("ventas", excel_file_path)),
+    fecha_ini_anterior, fecha_fin_anterior, selecciones
+)
+ayuda = f"Variación frente a {fecha_ini_anterior:%d/%m/%Y} – {fecha_fin_anterior:%d/%m/%Y}"
+
+def delta(col, valor, formato):
+    # El cubo no conoce las palabras de cada llamada: con búsqueda no hay comparación
+    if mascara_texto is not None or not anterior['llamadas']:
+        return None
+    diferencia = cubos.variacion(valor, anterior[col])
+    return None if diferencia is None else formato.format(diferencia)
+
+col1.metric("Puntaje promedio", f"{promedio('Puntaje_Total_%'):.2f}%",
+            delta('Puntaje_Total_%', promedio('Puntaje_Total_%'), "{:+.2f}%"), help=ayuda)
+col2.metric("Confianza", f"{promedio('Confianza'):.2f}%",
+            delta('Confianza', promedio('Confianza'), "{:+.2f}%"), help=ayuda)
+col3.metric("Polaridad", f"{promedio('Polarity'):.2f}",
+            delta('Polarity', promedio('Polarity'), "{:+.2f}"), help=ayuda)
+col4.metric("Subjetividad", f"{promedio('Subjectivity'):.2f}",
+            delta('Subjectivity', promedio('Subjectivity'), "{:+.2f}"), help=ayuda)
+col5.metric("Total llamadas", len(df), delta('llamadas', len(df), "{:+.0f}"), help=ayuda)
 
 # La métrica adicional en la sexta columna con el logo y el mensaje
 if encoded_logo_coe:
@@ -117,49 +212,52 @@ else:
 # ===================================================
 # 6. Gráficos
 # ===================================================
+# Las figuras se construyen en tablero/graficos.py, que importa plotly dentro de
+# cada función: los filtros y las métricas llegan al navegador antes de pagar la
+# importación de plotly.express en un proceso en frío.
 
 # --- GRÁFICO 1: Puntaje por Agente ---
 st.subheader("🎯 Puntaje Total por Agente")
-fig1 = px.bar(
-    df.groupby("Agente")["Puntaje_Total_%"].mean().reset_index(),
-    x="Agente",
-    y="Puntaje_Total_%",
-    text="Puntaje_Total_%",
-    color="Puntaje_Total_%",
-    color_continuous_scale="Greens"
-)
-fig1.update_traces(texttemplate='%{y:.2f}%', textposition='outside')
-fig1.update_layout(xaxis_tickangle=-45)
+fig1 = graficos.figura_puntaje_por_agente(df.groupby("Agente")["Puntaje_Total_%"].mean().reset_index())
 st.plotly_chart(fig1, use_container_width=True)
 
+# --- MEJORES Y PEORES AGENTES (puntaje, confianza o cumplimiento de cada paso) ---
+ranking.mostrar_ranking(
+    cargar_ranking_ventas(excel_file_path, datos.version_conjunto("ventas", excel_file_path)),
+    datos.METRICAS_GENERALES + datos.METRICAS_VENTAS, fecha_ini, fecha_fin, agentes_sel, clave="ranking_ventas"
+)
+
 
 # --- GRÁFICO 2: Polaridad por Agente ---
 st.subheader("📊 Polaridad por Agente")
-fig2 = px.bar(
-    df.groupby("Agente")["Polarity"].mean().reset_index(),
-    x="Agente",
-    y="Polarity",
-    text="Polarity",
-    color="Polarity",
-    color_continuous_scale="Greens"
-)
-fig2.update_traces(texttemplate='%{y:.2f}', textposition='outside')
-fig2.update_layout(xaxis_tickangle=-45)
+fig2 = graficos.figura_polaridad_por_agente(df.groupby("Agente")["Polarity"].mean().reset_index())
 st.plotly_chart(fig2, use_container_width=True)
 
 
 # --- HEATMAP ---
+# Caídas atípicas por agente, desde las marcas que dejó la precarga (ver tablero/anomalias.py)
+marcados = None
+try:
+    marcados = anomalias.agentes_marcados(
+        cargar_anomalias_ventas(excel_file_path, datos.version_conjunto("ventas", excel_file_path)),
+        fecha_ini, fecha_fin, agentes_sel
+    )
+except FileNotFoundError:
+    pass
+
 st.subheader("🗺️ Heatmap de Métricas")
-metricas = ['apertura', 'presentacion_beneficio', 'creacion_necesidad',
-            'manejo_objeciones', 'cierre', 'confirmacion_bienvenida', 'consejos_cierre']
-metricas_existentes = [m for m in metricas if m in df.columns]
+metricas_existentes = [m for m in datos.METRICAS_VENTAS if m in df.columns]
 if metricas_existentes:
     df_heatmap = df.groupby("Agente")[metricas_existentes].mean().round(2)
-    fig3 = px.imshow(df_heatmap, color_continuous_scale="Greens")
+    if marcados is not None and not marcados.empty:
+        df_heatmap = anomalias.marcar_agentes(df_heatmap, marcados)
+    fig3 = graficos.figura_heatmap_pasos(df_heatmap, "Heatmap: Agente vs. Pasos de Venta (Promedio)", "Valor promedio")
     st.plotly_chart(fig3, use_container_width=True)
 else:
     st.info("No hay columnas de métricas para el heatmap.")
 
+anomalias.mostrar_marcados(marcados)
+
 # ===================================================
 # 7. Indicadores Tipo Gauge
 # ===================================================
@@ -167,44 +265,14 @@ colg1, colg2 = st.columns(2)
 
 with colg1:
     st.subheader("🔍 Polaridad Promedio General")
-    polaridad = df['Polarity'].mean()
-    fig_g1 = go.Figure(go.Indicator(
-        mode="gauge+number+delta",
-        value=polaridad,
-        delta={'reference': 0},
-        gauge={
-            'axis': {'range': [-1, 1]},
-            'bar': {'color': 'green'},
-            'steps': [
-                {'range': [-1, -0.3], 'color': '#c7e9c0'},
-                {'range': [-0.3, 0.3], 'color': '#a1d99b'},
-                {'range': [0.3, 1], 'color': '#31a354'}
-            ],
-            'threshold': {'line': {'color': "black", 'width': 2}, 'value': polaridad}
-        },
-        title={'text': "Polaridad Promedio"}
-    ))
+    polaridad = promedio('Polarity')
+    fig_g1 = graficos.figura_gauge_polaridad(polaridad)
     st.plotly_chart(fig_g1, use_container_width=False)
 
 with colg2:
     st.subheader("🔍 Subjetividad Promedio General")
-    subjetividad = df['Subjectivity'].mean()
-    fig_g2 = go.Figure(go.Indicator(
-        mode="gauge+number+delta",
-        value=subjetividad,
-        delta={'reference': 0.5},
-        gauge={
-            'axis': {'range': [0, 1]},
-            'bar': {'color': 'green'},
-            'steps': [
-                {'range': [0.0, 0.3], 'color': '#e5f5e0'},
-                {'range': [0.3, 0.7], 'color': '#a1d99b'},
-                {'range': [0.7, 1.0], 'color': '#31a354'}
-            ],
-            'threshold': {'line': {'color': "black", 'width': 2}, 'value': subjetividad}
-        },
-        title={'text': "Subjectividad Promedio"}
-    ))
+    subjetividad = promedio('Subjectivity')
+    fig_g2 = graficos.figura_gauge_subjetividad(subjetividad)
     st.plotly_chart(fig_g2, use_container_width=False)
 
 # ===================================================
@@ -214,48 +282,24 @@ st.subheader("📈 Polaridad vs Confianza por Agente")
 df_bubble = df.groupby("Agente").agg(
     promedio_polaridad=('Polarity', 'mean'),
     promedio_confianza=('Confianza', 'mean'),
-    llamadas=('Agente', 'count')
+    numero_llamadas=('Agente', 'count')
 ).reset_index()
 
-fig_bubble = px.scatter(
-    df_bubble,
-    x="promedio_polaridad",
-    y="promedio_confianza",
-    size="llamadas",
-    hover_name="Agente",
-    color="promedio_polaridad",
-    color_continuous_scale="Greens",
-    title="Polaridad vs Confianza",
-    labels={
-        "promedio_polaridad": "Polaridad",
-        "promedio_confianza": "Confianza (%)"
-    }
-)
+fig_bubble = graficos.figura_burbujas(df_bubble)
+st.plotly_chart(fig_bubble, use_container_width=True)
 
-fig_bubble.update_layout(
-    plot_bgcolor="white",
-    height=600,
-    xaxis=dict(title="Polaridad", range=[-0.1, 0.1]),
-    yaxis=dict(title="Confianza (%)", range=[-1, 1])
+# ===================================================
+# 8.1 Tendencia en el tiempo (series precalculadas)
+# ===================================================
+tendencias.mostrar_tendencias(
+    cargar_tendencias_ventas(excel_file_path, datos.version_conjunto("ventas", excel_file_path)),
+    agentes_sel, fecha_ini, fecha_fin, clave="tendencias_ventas"
 )
 
-st.plotly_chart(fig_bubble, use_container_width=True)
-
 # ===================================================
 # 9. Acordeones por Agente (Detalle de Registros)
 # ===================================================
 st.subheader("🧾 Detalle por Agente")
-# Lista de columnas a ocultar en el detalle del acordeón
-columnas_ocultas = [
-    "Identificador único", "Telefono", "Puntaje_Total_%", "Polarity", "Subjectivity",
-    "Confianza", "Palabra", "Oraciones", "asesor_corto", "fecha_convertida",
-    "NombreAudios", "NombreAudios_Normalizado", "Coincidencia_Excel",
-    "Archivo_Vacio", estado_col, "Sentimiento", "Direccion grabacion",
-    "Evento", "Nombre de Opción", "Codigo Entrante", "Troncal",
-    "Grupo de Colas", "Cola", "Contacto", "Identificacion",
-    "Tiempo de Espera", "Tiempo de Llamada", "Posicion de Entrada",
-    "Tiempo de Timbrado", "Comentario", "audio"
-]
 
 for agente in df['Agente'].unique():
     subset = df[df['Agente'] == agente]
@@ -264,7 +308,7 @@ for agente in df['Agente'].unique():
             for idx, row in subset.iterrows():
                 st.write(f"--- Registro #{idx} ---")
                 for col in subset.columns:
-                    if col in columnas_ocultas:
+                    if col in datos.COLUMNAS_OCULTAS_DETALLE_VENTAS:
                         continue
                     val = row[col]
                     if pd.isna(val) or str(val).strip() == '':
@@ -273,3 +317,12 @@ for agente in df['Agente'].unique():
                         st.write(f"🔹 **{col}**: {val}")
         else:
             st.info(f"No hay registros disponibles para el agente {agente} con los filtros actuales.")
+
+# ===================================================
+# 10. Exportación de datos filtrados
+# ===================================================
+exportar.mostrar_exportacion(
+    df_base, mascara,
+    datos.METRICAS_GENERALES + datos.METRICAS_VENTAS,
+    nombre_base="ventas", clave="exportar_ventas"
+)
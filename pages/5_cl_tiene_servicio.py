@@ -4,10 +4,11 @@
 import streamlit as st
 import pandas as pd
 from pathlib import Path
-import plotly.express as px
-import plotly.graph_objects as go
 import datetime
 import base64  # necesario para codificar imágenes
+from tablero import datos, filtros, precarga, monitor  # carga, filtros por máscara, precarga y cachés
+from tablero import cubos, tendencias, ranking, anomalias  # agregados precalculados
+from tablero import calidad, exportar, graficos, reproductor  # calidad, exportación, figuras y audio
 
 
 # ===================================================
@@ -38,9 +39,65 @@ if not archivo_principal.exists():
     st.warning("📂 Asegúrate de que 'final_servicio_cltiene.xlsx' esté dentro de la carpeta 'data' en la raíz del proyecto.")
     st.stop()
 
+# El preprocesamiento vive en tablero/datos.py (preparar_datos_servicio) y solo
+# corre cuando el Excel cambia; el resultado se publica en el almacén Arrow.
+# st.cache_resource comparte el MISMO objeto entre todas las sesiones (sin copias),
+# por eso el DataFrame devuelto se trata como inmutable: los filtros trabajan con
+# máscaras (ver tablero/filtros.py) y ninguna función lo modifica.
+# `version` solo forma parte de la clave de caché: cuando el Excel cambia se abre
+# la nueva versión publicada y la anterior sale de la caché (max_entries=1).
+@monitor.cache_recurso("datos", show_spinner="Cargando datos de servicio...", max_entries=1)
+def cargar_datos_servicio(ruta_archivo, version):
+    df, metadatos = datos.cargar_servicio(ruta_archivo)
+
+    # Índices por valor para los filtros de selección múltiple, ya construidos por
+    # el precálculo (python -m tablero.precalculo); ver tablero/filtros.py
+    indices = datos.indices_servicio(ruta_archivo)
+
+    # Informe de calidad hecho al preprocesar esta versión (tablero/calidad.py)
+    return df, calidad.informe_de(metadatos), indices
+
+
+# Series de tendencia precalculadas (se actualizan de forma incremental con cada versión del Excel)
+@monitor.cache_recurso("agregados", show_spinner=False, max_entries=1)
+def cargar_tendencias_servicio(ruta_archivo, version):
+    return datos.tendencias_servicio(ruta_archivo)
+
+
+# Acumulados por agente y día: mejores y peores agentes de cualquier ventana sin recorrer llamadas
+@monitor.cache_recurso("agregados", show_spinner=False, max_entries=1)
+def cargar_ranking_servicio(ruta_archivo, version):
+    return datos.ranking_servicio(ruta_archivo)
+
+
+# Cubo diario por Agente, estado y Cola: promedios del periodo anterior sin recorrer llamadas
+@monitor.cache_recurso("agregados", show_spinner=False, max_entries=1)
+def cargar_cubo_filtros_servicio(ruta_archivo, version):
+    return datos.cubo_filtros_servicio(ruta_archivo)
+
+
+# Índice de palabras de las columnas de texto (solo se abre cuando alguien busca)
+@monitor.cache_recurso("indices", show_spinner=False, max_entries=1)
+def cargar_busqueda_servicio(ruta_archivo, version):
+    return datos.busqueda_servicio(ruta_archivo)
+
+
+# Días atípicos por agente: los calcula la precarga en segundo plano; aquí solo se
+# abren si ya están publicados (si no, FileNotFoundError y no queda en caché)
+@monitor.cache_recurso("agregados", show_spinner=False, max_entries=1)
+def cargar_anomalias_servicio(ruta_archivo, version):
+    return datos.anomalias_servicio(ruta_archivo, calcular=False)
+
+
+# Si la página se abre sin pasar por la portada, también lanza la precarga
+precarga.iniciar()
+monitor.registrar_sesion("servicio")
+
 # Intentar cargar el archivo Excel
 try:
-    df = pd.read_excel(archivo_principal)
+    df, informe_calidad, indices = cargar_datos_servicio(
+        archivo_principal, datos.version_conjunto("servicio", archivo_principal)
+    )
     #st.success(f"✅ Archivo '{archivo_principal.name}' cargado correctamente.")
 except Exception as e:
     st.error(f"❌ Error al cargar el archivo Excel: {e}")
@@ -48,54 +105,21 @@ except Exception as e:
 
 
 
-# --- LÍNEA CLAVE PARA DEPURACIÓN ---
-# Imprime las columnas del DataFrame para verificar si son las esperadas.
-# Esta salida aparecerá en la consola o en los logs de Streamlit Cloud.
-print("Columnas en el DataFrame después de la carga:", df.columns.tolist())
-# -----------------------------------
-
-# Convertir la columna 'Fecha' a formato de fecha y hora, manejando errores.
-if 'Fecha' in df.columns:
-    df['fecha_convertida'] = pd.to_datetime(df['Fecha'], errors='coerce')
-    # Aviso si hay muchas fechas nulas después de la conversión
-    if df['fecha_convertida'].isnull().sum() > 0:
-        st.warning("")
-else:
-    st.error("❌ La columna 'Fecha' no se encontró en el DataFrame. No se podrá filtrar por fecha.")
-
-# Asegurarse de que 'Agente' sea de tipo string para evitar errores en agrupaciones/filtros.
-if 'Agente' in df.columns:
-    df['Agente'] = df['Agente'].astype(str)
-else:
-    st.error("❌ La columna 'Agente' no se encontró en el DataFrame. Esto afectará los gráficos por Agente.")
-
-# --- INICIO DE CAMBIOS PARA SOLUCIONAR TypeError y manejo de porcentajes ---
-# Convertir columnas de métricas a numérico, forzando los errores a NaN
-# Esto es crucial para que las operaciones de promedio funcionen correctamente.
-# Nombres de columna actualizados: 'Polarity', 'Subjectivity', 'Confianza', etc.
-numeric_cols_to_convert = ['Puntaje_Total_%', 'Confianza', 'Polarity', 'Subjectivity', 'Palabras', 'Oraciones']
-for col in numeric_cols_to_convert:
-    if col in df.columns:
-        # Si es la columna de puntaje y contiene el símbolo %, lo eliminamos primero.
-        if col == 'Puntaje_Total_%' and df[col].dtype == 'object': # Comprobar si es un objeto (string)
-            df[col] = df[col].astype(str).str.replace('%', '', regex=False)
-            # No dividimos por 100 aquí, se mantiene el valor para mostrarlo directamente como porcentaje
-            # si el Excel ya lo entrega como 80.00 en lugar de 0.80.
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-        # Verificar si quedan NaNs después de la conversión
-        if df[col].isnull().sum() > 0:
-            st.warning(f"⚠️ Se encontraron {df[col].isnull().sum()} valores no numéricos en la columna '{col}' después de la conversión. Estos se tratarán como nulos y no afectarán los promedios.")
-    else:
-        st.warning(f"⚠️ La columna '{col}' esperada para conversión numérica no se encontró en los datos. Esto podría afectar el cálculo de métricas.")
-# --- FIN DE CAMBIOS PARA SOLUCIONAR TypeError ---
-
-
 # ===================================================
 # PASO 4: Función para mostrar métricas resumen
 # ===================================================
-def display_summary_metrics(df_to_display):
+def display_summary_metrics(df_to_display, anterior=None, etiqueta_anterior=None):
     st.markdown("## 📋 Resumen General de Métricas")
 
+    # `anterior`: promedios del periodo anterior de igual largo (cubos.resumen), para el delta de cada tarjeta
+    ayuda = f"Variación frente a {etiqueta_anterior}" if etiqueta_anterior else None
+
+    def delta(col_name, valor, formato):
+        if anterior is None or not anterior.get('llamadas'):
+            return None
+        diferencia = cubos.variacion(valor, anterior.get(col_name))
+        return None if diferencia is None else formato.format(diferencia)
+
     # Define las métricas exactas que quieres mostrar y sus nombres de columna correspondientes
     # Nombres de columna: 'Polarity', 'Subjectivity', 'Confianza'
     metrics_to_display_map = {
@@ -105,21 +129,11 @@ def display_summary_metrics(df_to_display):
         "Subjetividad promedio": "Subjectivity",
     }
 
-    # Verifica si el DataFrame contiene todas las columnas necesarias y si son numéricas
+    # Columnas faltantes, conversiones fallidas, etc. ya están en el informe de
+    # calidad (barra lateral); aquí solo se marca como no disponible lo que falta.
     for display_name, col_name in metrics_to_display_map.items():
-        if col_name is None: # Si ya se marcó como no disponible arriba
-            continue
         if col_name not in df_to_display.columns:
-            st.warning(f"⚠️ La columna '{col_name}' necesaria para '{display_name}' no se encontró en los datos. Por favor, verifica el nombre de la columna.")
-            metrics_to_display_map[display_name] = None # Marcar como no disponible
-            continue
-        if df_to_display[col_name].isnull().all():
-            st.warning(f"⚠️ La columna '{col_name}' para '{display_name}' contiene solo valores nulos. No se puede calcular el promedio.")
-            metrics_to_display_map[display_name] = None # Marcar como no disponible
-            continue
-        if not pd.api.types.is_numeric_dtype(df_to_display[col_name]):
-            st.error(f"❌ La columna '{col_name}' no es numérica. Por favor, verifica el preprocesamiento de datos. Esto afectará el cálculo de métricas.")
-            metrics_to_display_map[display_name] = None # Marcar como no disponible
+            metrics_to_display_map[display_name] = None
 
 
     # Crea las columnas en Streamlit para mostrar las métricas
@@ -127,51 +141,48 @@ def display_summary_metrics(df_to_display):
 
     # Muestra el Puntaje promedio
     with cols[0]:
-        if metrics_to_display_map["Puntaje promedio"]:
-            promedio_puntaje = df_to_display[metrics_to_display_map["Puntaje promedio"]].mean()
-            st.metric("Puntaje promedio", f"{promedio_puntaje:.2f}%")
+        # Sin columna o sin valores en la selección: N/A (el promedio queda en NaN)
+        promedio_puntaje = df_to_display[metrics_to_display_map["Puntaje promedio"]].mean() if metrics_to_display_map["Puntaje promedio"] else None
+        if pd.notna(promedio_puntaje):
+            st.metric("Puntaje promedio", f"{promedio_puntaje:.2f}%", delta(metrics_to_display_map["Puntaje promedio"], promedio_puntaje, "{:+.2f}%"), help=ayuda)
         else:
             st.metric("Puntaje promedio", "N/A")
 
     # Muestra la Confianza promedio
     with cols[1]:
-        if metrics_to_display_map["Confianza promedio"]:
-            promedio_confianza = df_to_display[metrics_to_display_map["Confianza promedio"]].mean()
-            st.metric("Confianza promedio", f"{promedio_confianza:.2f}%")
+        promedio_confianza = df_to_display[metrics_to_display_map["Confianza promedio"]].mean() if metrics_to_display_map["Confianza promedio"] else None
+        if pd.notna(promedio_confianza):
+            st.metric("Confianza promedio", f"{promedio_confianza:.2f}%", delta(metrics_to_display_map["Confianza promedio"], promedio_confianza, "{:+.2f}%"), help=ayuda)
         else:
             st.metric("Confianza promedio", "N/A")
 
     # Muestra la Polaridad promedio (como porcentaje si quieres escalarla, si no, déjala tal cual)
     with cols[2]:
-        if metrics_to_display_map["Polaridad promedio"]:
-            promedio_polaridad = df_to_display[metrics_to_display_map["Polaridad promedio"]].mean()
+        promedio_polaridad = df_to_display[metrics_to_display_map["Polaridad promedio"]].mean() if metrics_to_display_map["Polaridad promedio"] else None
+        if pd.notna(promedio_polaridad):
             # La polaridad va de -1 a 1. Mostrarla como % podría ser confuso si no se escala.
             # Se muestra como decimal por defecto, puedes ajustar el formato si lo prefieres como % de 0 a 100.
-            st.metric("Polaridad promedio", f"{promedio_polaridad:.2f}")
+            st.metric("Polaridad promedio", f"{promedio_polaridad:.2f}", delta(metrics_to_display_map["Polaridad promedio"], promedio_polaridad, "{:+.2f}"), help=ayuda)
         else:
             st.metric("Polaridad promedio", "N/A")
 
     # Muestra la Subjetividad promedio (como porcentaje si quieres escalarla, si no, déjala tal cual)
     with cols[3]:
-        if metrics_to_display_map["Subjetividad promedio"]:
-            promedio_subjetividad = df_to_display[metrics_to_display_map["Subjetividad promedio"]].mean()
+        promedio_subjetividad = df_to_display[metrics_to_display_map["Subjetividad promedio"]].mean() if metrics_to_display_map["Subjetividad promedio"] else None
+        if pd.notna(promedio_subjetividad):
             # La subjetividad va de 0 a 1. Se muestra como decimal.
-            st.metric("Subjetividad promedio", f"{promedio_subjetividad:.2f}")
+            st.metric("Subjetividad promedio", f"{promedio_subjetividad:.2f}", delta(metrics_to_display_map["Subjetividad promedio"], promedio_subjetividad, "{:+.2f}"), help=ayuda)
         else:
             st.metric("Subjetividad promedio", "N/A")
 
     # Muestra el Conteo de llamadas
     with cols[4]:
         conteo_llamadas = len(df_to_display) # El número de filas es el conteo de llamadas
-        st.metric("Conteo llamadas", f"{conteo_llamadas}")
+        st.metric("Conteo llamadas", f"{conteo_llamadas}", delta("llamadas", conteo_llamadas, "{:+.0f}"), help=ayuda)
 
 # ===================================================
 # PASO 5: Función para gráfico de puntaje total por Agente
 # ===================================================
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-
 def graficar_puntaje_total(df_to_graph):
     st.markdown("### 🎯 Promedio Total por Agente", unsafe_allow_html=True)
 
@@ -191,27 +202,8 @@ def graficar_puntaje_total(df_to_graph):
         st.warning("⚠️ No hay datos para graficar el promedio total por Agente después de agrupar. Revisa tus filtros.")
         return
 
-    # Gráfico de barras con Plotly
-    fig = px.bar(
-        df_agrupado_por_agente.sort_values("Puntaje_Total_%", ascending=False),
-        x="Agente",
-        y="Puntaje_Total_%",
-        text="Puntaje_Total_%",
-        color="Puntaje_Total_%",
-        color_continuous_scale="Greens",
-        title="Promedio Total por Agente",
-        labels={"Puntaje_Total_%": "Promedio de Puntaje (%)", "Agente": "Agente"}
-    )
-
-    fig.update_traces(texttemplate='%{y:.2f}%', textposition='outside')
-    fig.update_layout(
-        height=600,
-        xaxis_tickangle=-45,
-        plot_bgcolor="white",
-        font=dict(family="Arial", size=14),
-        title_x=0.5,
-        margin=dict(l=40, r=40, t=80, b=40)
-    )
+    # Gráfico de barras con Plotly (ver tablero/graficos.py)
+    fig = graficos.figura_puntaje_por_agente(df_agrupado_por_agente)
 
     # Centrar usando columnas en Streamlit
     col1, col2, col3 = st.columns([1, 5, 1])
@@ -239,27 +231,7 @@ def graficar_polaridad_asesor_total(df_to_graph):
         st.warning("⚠️ No hay datos para graficar el promedio de polaridad por Agente después de agrupar. Revisa tus filtros.")
         return
 
-    fig = px.bar(
-        df_agrupado_por_agente.sort_values("Polarity", ascending=False),
-        x="Agente",
-        y="Polarity",
-        text="Polarity",
-        color="Polarity",
-        color_continuous_scale="Greens",
-        title="Polaridad Promedio por Agente",
-        labels={"Polarity": "Promedio de Polaridad", "Agente": "Agente"}
-    )
-
-    fig.update_traces(texttemplate='%{y:.2f}', textposition='outside')
-    fig.update_layout(
-        height=600,
-        width=max(800, 50 * len(df_agrupado_por_agente)),
-        xaxis_tickangle=-45,
-        plot_bgcolor="white",
-        font=dict(family="Arial", size=14),
-        title_x=0.5,
-        margin=dict(b=150)
-    )
+    fig = graficos.figura_polaridad_por_agente(df_agrupado_por_agente)
 
     # 🔵 Centrado visual del gráfico
     col1, col2, col3 = st.columns([1, 5, 1])
@@ -269,21 +241,13 @@ def graficar_polaridad_asesor_total(df_to_graph):
 # ===================================================
 # PASO 6: Función para heatmap de métricas por Agente
 # ===================================================
-def graficar_asesores_metricas_heatmap(df_to_graph):
+def graficar_asesores_metricas_heatmap(df_to_graph, marcados=None):
     st.markdown("### 🗺️ Heatmap: Agente vs. Métricas de Conteo (Promedio)")
 
     if df_to_graph is None or df_to_graph.empty or 'Agente' not in df_to_graph.columns:
         return
 
-    metric_cols = [
-        "Conteo_saludo_inicial",
-        "Conteo_identificacion_cliente",
-        "Conteo_comprension_problema",
-        "Conteo_ofrecimiento_solucion",
-        "Conteo_manejo_inquietudes",
-        "Conteo_cierre_servicio",
-        "Conteo_proximo_paso"
-    ]
+    metric_cols = datos.COLUMNAS_CONTEO_SERVICIO
 
     existing_metric_cols = []
     for col in metric_cols:
@@ -303,21 +267,11 @@ def graficar_asesores_metricas_heatmap(df_to_graph):
         return
 
     df_heatmap = df_grouped.set_index("Agente")[existing_metric_cols]
+    # Agentes con días atípicos en el periodo (ver tablero/anomalias.py)
+    if marcados is not None and not marcados.empty:
+        df_heatmap = anomalias.marcar_agentes(df_heatmap, marcados)
 
-    fig2 = px.imshow(
-        df_heatmap,
-        labels=dict(x="Métrica", y="Agente", color="Valor promedio"),
-        color_continuous_scale='Greens',
-        aspect="auto",
-        title="Heatmap: Agente vs. Métricas de Conteo (Promedio)"
-    )
-
-    fig2.update_layout(
-        font=dict(family="Arial", size=12),
-        height=700,
-        title_x=0.5,
-        plot_bgcolor='white'
-    )
+    fig2 = graficos.figura_heatmap_conteos(df_heatmap)
 
     # 🔵 Centrado visual del gráfico
     col1, col2, col3 = st.columns([1, 5, 1])
@@ -342,32 +296,7 @@ def graficar_polaridad_subjetividad_gauges(df_to_graph):
         if 'Polarity' in df_to_graph.columns and not df_to_graph['Polarity'].isnull().all() and pd.api.types.is_numeric_dtype(df_to_graph['Polarity']):
             polaridad_total = df_to_graph['Polarity'].mean()
 
-            fig_gauge = go.Figure(go.Indicator(
-                mode="gauge+number+delta",
-                value=polaridad_total,
-                delta={'reference': 0},
-                gauge={
-                    'axis': {'range': [-1, 1]},
-                    'bar': {'color': 'green'},
-                    'steps': [
-                        {'range': [-1, -0.3], 'color': '#c7e9c0'},
-                        {'range': [-0.3, 0.3], 'color': '#a1d99b'},
-                        {'range': [0.3, 1], 'color': '#31a354'}
-                    ],
-                    'threshold': {
-                        'line': {'color': "black", 'width': 2},
-                        'thickness': 0.75,
-                        'value': polaridad_total
-                    }
-                },
-                title={'text': "Polaridad Promedio General"}
-            ))
-
-            fig_gauge.update_layout(
-                font=dict(family="Arial", size=16),
-                width=400,
-                height=300
-            )
+            fig_gauge = graficos.figura_gauge_polaridad(polaridad_total)
             st.plotly_chart(fig_gauge, use_container_width=False)
         else:
             st.info("No hay datos de 'Polarity' para mostrar el indicador de Polaridad o la columna no es numérica.")
@@ -379,32 +308,7 @@ def graficar_polaridad_subjetividad_gauges(df_to_graph):
         if 'Subjectivity' in df_to_graph.columns and not df_to_graph['Subjectivity'].isnull().all() and pd.api.types.is_numeric_dtype(df_to_graph['Subjectivity']):
             subjectividad_total = df_to_graph['Subjectivity'].mean()
 
-            fig_gauge2 = go.Figure(go.Indicator(
-                mode="gauge+number+delta",
-                value=subjectividad_total,
-                delta={'reference': 0.5},
-                gauge={
-                    'axis': {'range': [0, 1]},
-                    'bar': {'color': 'green'},
-                    'steps': [
-                        {'range': [0.0, 0.3], 'color': '#e5f5e0'},
-                        {'range': [0.3, 0.7], 'color': '#a1d99b'},
-                        {'range': [0.7, 1.0], 'color': '#31a354'}
-                    ],
-                    'threshold': {
-                        'line': {'color': "black", 'width': 2},
-                        'thickness': 0.75,
-                        'value': subjectividad_total
-                    }
-                },
-                title={'text': "Subjectividad Promedio General"}
-            ))
-
-            fig_gauge2.update_layout(
-                font=dict(family="Arial", size=16),
-                width=400,
-                height=300
-            )
+            fig_gauge2 = graficos.figura_gauge_subjetividad(subjectividad_total)
             st.plotly_chart(fig_gauge2, use_container_width=False)
         else:
             st.info("No hay datos de 'Subjectivity' para mostrar el indicador de Subjetividad o la columna no es numérica.")
@@ -444,43 +348,8 @@ def graficar_polaridad_confianza_asesor_burbujas(df_to_graph):
         st.warning("⚠️ No hay datos para graficar la Polaridad Promedio vs. Confianza Promedio por Agente después de agrupar. Revisa tus filtros.")
         return
 
-    # Crear el gráfico de burbujas
-    fig = px.scatter(
-        df_agrupado_por_agente,
-        x="promedio_polaridad",
-        y="promedio_confianza",
-        size="numero_llamadas", # El tamaño de la burbuja representa el número de llamadas
-        # Ya no usamos 'color="Agente"' aquí para un solo color uniforme
-        # Eliminamos 'color_continuous_scale' también, ya que no estamos usando una escala continua
-        hover_name="Agente",
-        hover_data={
-            "promedio_polaridad": ":.2f",
-            "promedio_confianza": ":.2f",
-            "numero_llamadas": True
-        },
-        title="Polaridad Promedio vs. Confianza Promedio por Agente",
-        labels={
-            "promedio_polaridad": "Polaridad Promedio",
-            "promedio_confianza": "Confianza Promedio (%)",
-            "numero_llamadas": "Número de Llamadas"
-        }
-    )
-
-    # >>> ¡CORRECCIÓN CLAVE AQUÍ! <<<
-    # Establecer el color de las burbujas a un verde sólido y uniforme para TODAS.
-    fig.update_traces(marker=dict(color='green', line=dict(width=1, color='DarkSlateGrey')))
-    # Puedes usar un código hexadecimal específico si quieres un tono exacto de verde, por ejemplo:
-    # fig.update_traces(marker=dict(color='#31a354', line=dict(width=1, color='DarkSlateGrey')))
-
-
-    fig.update_layout(
-        xaxis_title="Polaridad Promedio",
-        yaxis_title="Confianza Promedio (%)",
-        height=600,
-        plot_bgcolor="white",
-        font=dict(family="Arial", size=14),
-        title_x=0.5
-    )
+    # Crear el gráfico de burbujas (ver tablero/graficos.py)
+    fig = graficos.figura_burbujas(df_agrupado_por_agente)
     st.plotly_chart(fig, use_container_width=True)
 
 # ===================================================
@@ -496,48 +365,16 @@ def mostrar_acordeones(df_to_display):
         st.error("❌ El DataFrame no contiene la columna 'Agente'.")
         return
 
-    # Asegurar que la columna 'Agente' sea de tipo string.
-    df_to_display['Agente'] = df_to_display['Agente'].astype(str)
+    # 'Agente' ya es string desde la carga (cargar_datos_servicio); no se modifica
+    # aquí porque df_to_display es una selección de solo lectura del DataFrame base.
     unique_agentes = df_to_display['Agente'].dropna().unique()
 
     if unique_agentes.size == 0:
         st.info("No hay agentes disponibles para mostrar en los acordeones con los filtros actuales.")
         return
 
-    # Columnas a excluir, ajustadas a los nombres exactos de tu DataFrame
-    cols_to_exclude_from_accordion = [
-        "Identificador único",
-        "Telefono",
-        "Puntaje_Total_%",
-        "Polarity",
-        "Subjectivity",
-        "Confianza",
-        "Palabras",
-        "Oraciones",
-        "asesor_corto", # Se mantiene si existe, si no, no genera error
-        "fecha_convertida",
-        "NombreAudios",
-        "NombreAudios_Normalizado",
-        "Coincidencia_Excel",
-        "Archivo_Vacio",
-        "Estado_Llamada",
-        "Sentimiento",
-        "Direccion grabacion",
-        "Evento",
-        "Nombre de Opción",
-        "Codigo Entrante",
-        "Troncal",
-        "Grupo de Colas",
-        "Cola", # ¡Esta columna está en tu lista!
-        "Contacto",
-        "Identificacion",
-        "Tiempo de Espera",
-        "Tiempo de Llamada",
-        "Posicion de Entrada",
-        "Tiempo de Timbrado",
-        "Comentario",
-        "audio"
-    ]
+    # Columnas a excluir, ajustadas a los nombres exactos de tu DataFrame (ver tablero/datos.py)
+    cols_to_exclude_from_accordion = datos.COLUMNAS_OCULTAS_DETALLE_SERVICIO
 
     for nombre_agente in unique_agentes:
         df_agente = df_to_display[df_to_display['Agente'] == nombre_agente]
@@ -551,6 +388,10 @@ def mostrar_acordeones(df_to_display):
                 archivo = row.get("Archivo_Analizado", "Archivo desconocido")
                 st.write(f"📄 Analizando: **{archivo}**")
 
+                # COLUMNA: 'audio' (ruta relativa a data/audios). Solo se lee del disco al pulsar "Escuchar".
+                if pd.notna(row.get("audio")):
+                    reproductor.mostrar_reproductor(row["audio"], clave=f"servicio_{index}")
+
                 for col in df_agente.columns: # Iterar sobre las columnas del sub-DataFrame del agente
                     # Asegurarse de que la columna no esté en la lista de exclusión o sea 'Agente'/'Archivo_Analizado'
                     if col in cols_to_exclude_from_accordion or col in ['Agente', 'Archivo_Analizado']:
@@ -590,15 +431,27 @@ def mostrar_acordeones(df_to_display):
 def main():
     st.sidebar.header("Filtros de Datos")
 
+    # Los filtros NO copian el DataFrame: cada uno produce una máscara booleana
+    # sobre el DataFrame base (compartido entre sesiones) y al final se combinan.
+    mascara_fecha = None
+    mascara_agente = None
+    mascara_estado = None
+    mascara_cola = None
+    mascara_texto = None
+    fecha_desde, fecha_hasta = None, None
+    selected_agents = []
+    # Valores elegidos en los filtros de selección múltiple, para el periodo anterior (cubo por filtros)
+    selecciones = {}
+
     # --- FILTRO POR FECHA ---
     # Asegúrate de que 'Fecha' exista y tenga datos válidos antes de intentar crear el filtro de fechas.
     if 'Fecha' in df.columns and not df['Fecha'].isnull().all():
-        # Convertir a fecha directamente para el rango min/max de la UI
-        temp_fecha_convertida_para_filtro = pd.to_datetime(df['Fecha'], errors='coerce').dropna()
+        # 'fecha_convertida' ya viene parseada desde la carga; no se vuelve a convertir en cada rerun
+        fechas_validas = df['fecha_convertida'].dropna()
 
-        if not temp_fecha_convertida_para_filtro.empty:
-            min_date = temp_fecha_convertida_para_filtro.min().date()
-            max_date = temp_fecha_convertida_para_filtro.max().date()
+        if not fechas_validas.empty:
+            min_date = fechas_validas.min().date()
+            max_date = fechas_validas.max().date()
 
             date_range = st.sidebar.date_input(
                 "Selecciona rango de fechas:",
@@ -607,36 +460,30 @@ def main():
                 max_value=max_date
             )
 
-            df_filtrado_fecha = df.copy() # Start with a copy
             # Asegurarse de que date_range sea una tupla de dos elementos para el filtro
             if len(date_range) == 2:
                 start_date, end_date = date_range
-                df_filtrado_fecha = df_filtrado_fecha[
-                    (df_filtrado_fecha['fecha_convertida'].dt.date >= start_date) &
-                    (df_filtrado_fecha['fecha_convertida'].dt.date <= end_date)
-                ].copy() # Asegurar copia después del filtro
+                fecha_desde, fecha_hasta = start_date, end_date
+                mascara_fecha = filtros.mascara_rango_fechas(df['fecha_convertida'], start_date, end_date)
             elif len(date_range) == 1: # Si solo se selecciona una fecha
                 start_date = date_range[0]
-                df_filtrado_fecha = df_filtrado_fecha[
-                    (df_filtrado_fecha['fecha_convertida'].dt.date >= start_date)
-                ].copy() # Asegurar copia
-            else: # Si no se selecciona nada, usar el DataFrame completo (ya es una copia)
+                fecha_desde = start_date
+                mascara_fecha = filtros.mascara_rango_fechas(df['fecha_convertida'], start_date)
+            else: # Si no se selecciona nada, no se filtra por fecha
                 pass
         else:
             st.sidebar.warning("⚠️ No hay fechas válidas en los datos para mostrar el filtro de fecha.")
-            df_filtrado_fecha = df.copy() # Si no hay fechas válidas, no se filtra por fecha
     else:
         st.sidebar.warning("❌ La columna 'Fecha' no existe o está vacía. No se podrá filtrar por fecha.")
-        df_filtrado_fecha = df.copy() # Si no hay columna 'Fecha', se pasa el DF completo
 
     st.sidebar.markdown("---") # Separador visual para el filtro de agente
 
     # --- FILTRO POR AGENTE ---
+    # Las opciones de agente se calculan sobre las filas que pasan el filtro de fecha,
+    # contando por código en el índice en lugar de buscar únicos entre cadenas.
+    all_agents = indices['Agente'].valores_presentes(mascara_fecha) if 'Agente' in indices else []
     # Verificar si 'Agente' existe y no está completamente vacío antes de intentar obtener únicos.
-    if 'Agente' in df_filtrado_fecha.columns and not df_filtrado_fecha['Agente'].dropna().empty:
-        # Asegurarse de que la columna 'Agente' sea de tipo string antes de obtener únicos
-        df_filtrado_fecha['Agente'] = df_filtrado_fecha['Agente'].astype(str)
-        all_agents = sorted(df_filtrado_fecha['Agente'].dropna().unique().tolist())
+    if all_agents:
         selected_agents = st.sidebar.multiselect(
             "👤 Selecciona Agentes:",
             options=all_agents,
@@ -644,16 +491,52 @@ def main():
         )
         # Aplicar filtro de agente
         if selected_agents:
-            df_final_filtered = df_filtrado_fecha[df_filtrado_fecha['Agente'].isin(selected_agents)].copy()
+            mascara_agente = indices['Agente'].mascara(selected_agents)
+            # Las opciones son los agentes de la ventana actual: el periodo anterior
+            # solo se restringe si el usuario quitó alguno
+            if len(selected_agents) < len(all_agents):
+                selecciones['Agente'] = selected_agents
         else:
             st.warning("Por favor, selecciona al menos un agente para ver los datos.")
-            df_final_filtered = pd.DataFrame() # DataFrame vacío si no hay agentes seleccionados
+            mascara_agente = filtros.mascara_vacia(df) # Ningún agente seleccionado: ninguna fila
     else:
         st.sidebar.warning("❌ La columna 'Agente' no existe o está vacía en los datos filtrados por fecha. No se podrá filtrar por Agente.")
-        df_final_filtered = df_filtrado_fecha.copy() # Continúa con el DataFrame filtrado por fecha si no hay columna de agente
+
+    # --- FILTROS POR ESTADO DE LA LLAMADA Y COLA ---
+    # Solo se aplican si el usuario quita alguna opción; por defecto están todas.
+    if 'Estado_Llamada' in indices:
+        estados = list(indices['Estado_Llamada'].valores)
+        estados_sel = st.sidebar.multiselect("📞 Estado de la llamada:", options=estados, default=estados)
+        if len(estados_sel) < len(estados):
+            mascara_estado = indices['Estado_Llamada'].mascara(estados_sel)
+            selecciones['Estado_Llamada'] = estados_sel
+
+    if 'Cola' in indices:
+        colas = list(indices['Cola'].valores)
+        colas_sel = st.sidebar.multiselect("📂 Cola:", options=colas, default=colas)
+        if len(colas_sel) < len(colas):
+            mascara_cola = indices['Cola'].mascara(colas_sel)
+            selecciones['Cola'] = colas_sel
+
+    # --- BÚSQUEDA POR PALABRAS (índice invertido, sin tildes ni mayúsculas) ---
+    consulta = st.sidebar.text_input("🔎 Buscar en textos:", placeholder="p. ej. ambulancia soluciones",
+                                     help="Llamadas que contienen todas las palabras (también como inicio de palabra) "
+                                     "en la transcripción o en los datos de la llamada.")
+    if consulta.strip():
+        mascara_texto = cargar_busqueda_servicio(
+            archivo_principal, datos.version_conjunto("servicio", archivo_principal)
+        ).mascara(consulta)
 
     st.sidebar.markdown("---") # Separador final para los filtros
 
+    # Informe de calidad de esta versión del Excel, ya calculado al preprocesarla
+    calidad.mostrar_informe(informe_calidad)
+
+    # Una sola selección de filas del DataFrame base con la máscara combinada
+    mascara_final = filtros.combinar_mascaras(mascara_fecha, mascara_agente, mascara_estado, mascara_cola,
+                                              mascara_texto)
+    df_final_filtered = filtros.seleccionar(df, mascara_final)
+
 
     # ===================================================
     # PASO 11: Mostrar gráficos y métricas
@@ -666,8 +549,19 @@ def main():
         st.warning("🚨 ¡Atención! No hay datos para mostrar con los filtros seleccionados. Ajusta tus selecciones.")
         return
 
+    # Periodo anterior de igual largo, resuelto sobre el cubo diario (días × combinaciones de filtros)
+    cubo_filtros = cargar_cubo_filtros_servicio(archivo_principal, datos.version_conjunto("servicio", archivo_principal))
+    anterior, etiqueta_anterior = None, None
+    # El cubo no conoce las palabras de cada llamada: con búsqueda no hay comparación
+    if not cubo_filtros.empty and mascara_texto is None:
+        desde = fecha_desde or cubo_filtros['dia'].min().date()
+        hasta = fecha_hasta or cubo_filtros['dia'].max().date()
+        desde_anterior, hasta_anterior = cubos.periodo_anterior(desde, hasta)
+        anterior = cubos.resumen(cubo_filtros, desde_anterior, hasta_anterior, selecciones)
+        etiqueta_anterior = f"{desde_anterior:%d/%m/%Y} – {hasta_anterior:%d/%m/%Y}"
+
     # Muestra las métricas resumen
-    display_summary_metrics(df_final_filtered)
+    display_summary_metrics(df_final_filtered, anterior, etiqueta_anterior)
     st.markdown("---")
 
     st.header("📈 Gráficos Resumen")
@@ -675,13 +569,29 @@ def main():
     graficar_puntaje_total(df_final_filtered)
     st.markdown("---")
 
+    ranking.mostrar_ranking(
+        cargar_ranking_servicio(archivo_principal, datos.version_conjunto("servicio", archivo_principal)),
+        datos.METRICAS_GENERALES, fecha_desde, fecha_hasta, selected_agents, clave="ranking_servicio"
+    )
+    st.markdown("---")
+
     graficar_polaridad_asesor_total(df_final_filtered)
     st.markdown("---")
-    #Visualizaciones-main\Visualizaciones-main\pages\5_cl_tiene_servicio.py
-    #st.write("📌 DEBUG: Entrando a heatmap con", len(df_final_filtered), "filas")
-    #st.write("📌 Columnas del DataFrame en ese momento:", df_final_filtered.columns.tolist())
 
-    graficar_asesores_metricas_heatmap(df_final_filtered)
+    # Caídas atípicas por agente, desde las marcas que dejó la precarga
+    marcados = None
+    try:
+        marcados = anomalias.agentes_marcados(
+            cargar_anomalias_servicio(archivo_principal, datos.version_conjunto("servicio", archivo_principal)),
+            fecha_desde, fecha_hasta, selected_agents
+        )
+    except FileNotFoundError:
+        pass
+
+    graficar_asesores_metricas_heatmap(df_final_filtered, marcados)
+
+    anomalias.mostrar_marcados(marcados)
+    st.markdown("---")
 
 
     graficar_polaridad_subjetividad_gauges(df_final_filtered)
@@ -690,10 +600,24 @@ def main():
     graficar_polaridad_confianza_asesor_burbujas(df_final_filtered)
     st.markdown("---")
 
+    # Tendencia por agente servida desde las series precalculadas (no recorre llamadas)
+    tendencias.mostrar_tendencias(
+        cargar_tendencias_servicio(archivo_principal, datos.version_conjunto("servicio", archivo_principal)),
+        selected_agents, fecha_desde, fecha_hasta, clave="tendencias_servicio"
+    )
+    st.markdown("---")
+
     # ¡La función mostrar_acordeones está de vuelta aquí, con las columnas corregidas!
     mostrar_acordeones(df_final_filtered)
     st.markdown("---") # Añadir un separador final para el acordeón
 
+    # Exportación por bloques desde el DataFrame base con la máscara de filtros
+    exportar.mostrar_exportacion(
+        df, mascara_final,
+        datos.METRICAS_GENERALES + datos.COLUMNAS_CONTEO_SERVICIO,
+        nombre_base="servicio", clave="exportar_servicio"
+    )
+
 # ===================================================
 # PASO 12: Punto de entrada de la app
 # ===================================================
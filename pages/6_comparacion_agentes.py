@@ -0,0 +1,155 @@
+# ===================================================
+# PASO 1: Importación de librerías necesarias
+# ===================================================
+import streamlit as st
+import pandas as pd
+from tablero import comparacion, datos, graficos, monitor, precarga  # cubos precalculados, índice de agentes y figuras
+
+
+# ===================================================
+# PASO 2: Configuración inicial de la app
+# ===================================================
+st.set_page_config(layout="wide")
+monitor.registrar_sesion("comparacion")
+
+# Si la página se abre sin pasar por la portada, también lanza la precarga
+precarga.iniciar()
+
+# ===================================================
+# PASO 3: Carga de los agregados de ambos conjuntos
+# ===================================================
+# La comparación no abre las llamadas: usa los cubos diarios por agente de
+# ventas y servicio (tablero/cubos.py) y el índice de agentes que cruza los
+# nombres de ambos Excel (tablero/comparacion.py), todos ya publicados en el
+# almacén por el precálculo. `version` solo forma parte de la clave de caché.
+@monitor.cache_recurso("agregados", show_spinner="Cargando agregados de ventas y servicio...", max_entries=1)
+def cargar_agregados(ruta_servicio, ruta_ventas, version):
+    cubo_servicio = datos.cubo_servicio(ruta_servicio)
+    cubo_ventas = datos.cubo_ventas(ruta_ventas)
+    indice = datos.indice_agentes(ruta_servicio, ruta_ventas)
+    return cubo_servicio, cubo_ventas, indice
+
+
+try:
+    cubo_servicio, cubo_ventas, indice_agentes = cargar_agregados(
+        datos.ARCHIVO_SERVICIO, datos.ARCHIVO_VENTAS,
+        (datos.version_conjunto("servicio", datos.ARCHIVO_SERVICIO), datos.version_conjunto("ventas", datos.ARCHIVO_VENTAS))
+    )
+except Exception as e:
+    st.error(f"❌ Error al cargar los datos de ventas y servicio: {e}")
+    st.stop()
+
+# Columnas de la tabla comparativa (ver comparacion.comparar)
+COLUMNAS_PASOS_SERVICIO = [f"{c} (servicio)" for c in datos.COLUMNAS_CONTEO_SERVICIO]
+COLUMNAS_PASOS_VENTAS = [f"{c} (ventas)" for c in datos.METRICAS_VENTAS]
+COLUMNAS_RESUMEN = ["Agente", "llamadas (servicio)", "llamadas (ventas)"] + [
+    f"{m} ({conjunto})" for m in datos.METRICAS_GENERALES for conjunto in comparacion.CONJUNTOS
+]
+
+
+# ===================================================
+# PASO 4: Tabla resumen lado a lado
+# ===================================================
+def mostrar_tabla_resumen(tabla):
+    st.markdown("### 📋 Resumen por Agente")
+    columnas = [c for c in COLUMNAS_RESUMEN if c in tabla.columns]
+    formatos = {c: "{:.2f}" for c in columnas if c not in ("Agente", "llamadas (servicio)", "llamadas (ventas)")}
+    st.dataframe(tabla[columnas].style.format(formatos, na_rep="N/A"), hide_index=True, use_container_width=True)
+
+
+# ===================================================
+# PASO 5: Gráficos comparativos
+# ===================================================
+def graficar_puntaje(tabla):
+    st.markdown("### 🎯 Puntaje promedio por conjunto")
+    st.plotly_chart(graficos.figura_comparacion_puntaje(tabla), use_container_width=True)
+
+
+def graficar_pasos(tabla):
+    st.markdown("### 🗺️ Pasos del guion")
+    col_servicio, col_ventas = st.columns(2)
+
+    with col_servicio:
+        pasos = tabla.set_index("Agente")[[c for c in COLUMNAS_PASOS_SERVICIO if c in tabla.columns]].dropna(how="all")
+        if pasos.empty:
+            st.info("No hay llamadas de servicio para los agentes seleccionados.")
+        else:
+            pasos.columns = [c.replace(" (servicio)", "").replace("Conteo_", "") for c in pasos.columns]
+            st.plotly_chart(graficos.figura_heatmap_pasos(
+                pasos, "Servicio: conteo promedio por paso", "Conteo promedio"
+            ), use_container_width=True)
+
+    with col_ventas:
+        pasos = tabla.set_index("Agente")[[c for c in COLUMNAS_PASOS_VENTAS if c in tabla.columns]].dropna(how="all")
+        if pasos.empty:
+            st.info("No hay llamadas de ventas para los agentes seleccionados.")
+        else:
+            pasos.columns = [c.replace(" (ventas)", "") for c in pasos.columns]
+            st.plotly_chart(graficos.figura_heatmap_pasos(
+                pasos, "Ventas: % de llamadas que cumplen el paso", "% de llamadas"
+            ), use_container_width=True)
+
+
+# ===================================================
+# PASO 6: Lógica principal de la aplicación (main)
+# ===================================================
+def main():
+    st.sidebar.header("Filtros de Datos")
+
+    # --- FILTRO POR FECHA (sobre los días de ambos cubos) ---
+    dias = pd.concat([cubo_servicio['dia'], cubo_ventas['dia']]).dropna()
+    fecha_desde, fecha_hasta = None, None
+    if not dias.empty:
+        min_date, max_date = dias.min().date(), dias.max().date()
+        date_range = st.sidebar.date_input(
+            "Selecciona rango de fechas:",
+            value=(min_date, max_date),
+            min_value=min_date,
+            max_value=max_date
+        )
+        if len(date_range) == 2:
+            fecha_desde, fecha_hasta = date_range
+        elif len(date_range) == 1:
+            fecha_desde = date_range[0]
+
+    st.sidebar.markdown("---")
+
+    # --- FILTRO POR AGENTE ---
+    solo_ambos = st.sidebar.checkbox("Solo agentes presentes en ventas y servicio", value=False)
+
+    # Unión por clave de agente sobre los agregados de la ventana
+    tabla = comparacion.comparar(cubo_servicio, cubo_ventas, indice_agentes, datos.METRICAS_VENTAS,
+                                 fecha_desde, fecha_hasta)
+    if solo_ambos:
+        tabla = tabla[(tabla["llamadas (servicio)"] > 0) & (tabla["llamadas (ventas)"] > 0)]
+
+    agentes = tabla["Agente"].tolist()
+    agentes_sel = st.sidebar.multiselect("👤 Selecciona Agentes:", options=agentes, default=agentes)
+    tabla = tabla[tabla["Agente"].isin(agentes_sel)]
+
+    st.sidebar.markdown("---")
+
+    # ===================================================
+    # PASO 7: Mostrar comparación
+    # ===================================================
+    st.title("🤝 Comparación de Agentes: Ventas y Servicio")
+    st.markdown("Métricas por agente de ambos conjuntos lado a lado. Los agentes se cruzan por nombre sin tildes ni mayúsculas.")
+
+    if tabla.empty:
+        st.warning("🚨 ¡Atención! No hay datos para mostrar con los filtros seleccionados. Ajusta tus selecciones.")
+        return
+
+    mostrar_tabla_resumen(tabla)
+    st.markdown("---")
+
+    graficar_puntaje(tabla)
+    st.markdown("---")
+
+    graficar_pasos(tabla)
+
+
+# ===================================================
+# PASO 8: Punto de entrada de la app
+# ===================================================
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+# ===================================================
+# PASO 1: Importación de librerías necesarias
+# ===================================================
+import json
+
+import streamlit as st
+import pandas as pd
+from tablero import monitor, precarga  # métricas de sesiones y cachés del proceso
+
+# ===================================================
+# PASO 2: Configuración inicial de la app
+# ===================================================
+st.set_page_config(layout="wide")
+monitor.registrar_sesion("monitor")
+
+# Si la página se abre sin pasar por la portada, también lanza la precarga
+precarga.iniciar()
+
+
+def megas(valor):
+    return valor / 1024 ** 2
+
+
+# ===================================================
+# PASO 3: Memoria del proceso frente al presupuesto
+# ===================================================
+def mostrar_memoria(metricas):
+    st.markdown("### 🧠 Memoria")
+    col1, col2, col3, col4 = st.columns(4)
+    memoria = metricas['memoria_proceso_bytes']
+    col1.metric("Memoria del proceso", "N/D" if memoria is None else f"{megas(memoria):,.0f} MB")
+    col2.metric("Cachés (estimado)", f"{megas(metricas['bytes_caches']):,.0f} MB")
+    col3.metric("Presupuesto de cachés", f"{megas(metricas['presupuesto_caches_bytes']):,.0f} MB")
+    col4.metric("Desalojos por presupuesto", metricas['desalojos_por_presupuesto'])
+    uso = metricas['bytes_caches'] / metricas['presupuesto_caches_bytes'] if metricas['presupuesto_caches_bytes'] else 0.0
+    st.progress(min(uso, 1.0), text=f"{uso:.0%} del presupuesto de cachés en uso")
+    st.caption("El presupuesto se ajusta con la variable de entorno TABLERO_MEMORIA_CACHES_MB; "
+               "al superarlo se desalojan las entradas usadas hace más tiempo.")
+
+
+# ===================================================
+# PASO 4: Sesiones activas
+# ===================================================
+def mostrar_sesiones(metricas):
+    st.markdown(f"### 👥 Sesiones activas ({metricas['sesiones_activas']})")
+    if not metricas['sesiones']:
+        st.info("No hay sesiones activas.")
+        return
+    sesiones = pd.DataFrame(metricas['sesiones'])
+    sesiones['MB de estado'] = sesiones['bytes_estado'].map(megas)
+    for columna in ('inicio', 'ultima_actividad'):
+        sesiones[columna] = pd.to_datetime(sesiones[columna], unit='s').dt.strftime('%d/%m/%Y %H:%M:%S')
+    st.dataframe(
+        sesiones[['sesion', 'pagina', 'MB de estado', 'inicio', 'ultima_actividad']].rename(columns={
+            'sesion': 'Sesión', 'pagina': 'Página', 'inicio': 'Inicio', 'ultima_actividad': 'Última actividad',
+        }).style.format({'MB de estado': "{:.3f}"}),
+        hide_index=True, use_container_width=True
+    )
+
+
+# ===================================================
+# PASO 5: Cachés
+# ===================================================
+def mostrar_caches(metricas):
+    st.markdown("### 🗄️ Cachés")
+    if not metricas['caches']:
+        st.info("Todavía no se usó ninguna caché en este proceso.")
+        return
+    caches = pd.DataFrame(metricas['caches'])
+    caches['MB'] = caches['bytes'].map(megas)
+    caches = caches.sort_values('bytes', ascending=False)
+    st.dataframe(
+        caches[['categoria', 'cache', 'entradas', 'MB', 'llamadas', 'aciertos', 'fallos', 'tasa_aciertos', 'desalojos']].rename(columns={
+            'categoria': 'Categoría', 'cache': 'Caché', 'entradas': 'Entradas', 'llamadas': 'Llamadas',
+            'aciertos': 'Aciertos', 'fallos': 'Fallos', 'tasa_aciertos': 'Tasa de aciertos', 'desalojos': 'Desalojos',
+        }).style.format({'MB': "{:.1f}", 'Tasa de aciertos': "{:.0%}"}, na_rep="N/A"),
+        hide_index=True, use_container_width=True
+    )
+
+
+# ===================================================
+# PASO 6: Lógica principal de la aplicación (main)
+# ===================================================
+def main():
+    st.title("🖥️ Monitor de recursos")
+    st.markdown("Sesiones, cachés y memoria de este proceso del tablero.")
+
+    # Vaciar cachés afecta a todas las sesiones: solo con el token de administración
+    if monitor.TOKEN_ADMIN is not None:
+        st.sidebar.header("Acciones")
+        token = st.sidebar.text_input("🔑 Token de administración", type="password")
+        if monitor.es_admin(token):
+            if st.sidebar.button("🧹 Vaciar cachés", help="Libera todas las cachés de TODAS las sesiones; "
+                                                         "las páginas vuelven a abrir el almacén."):
+                monitor.MONITOR.vaciar()
+                st.sidebar.success("✅ Cachés vaciadas.")
+        elif token:
+            st.sidebar.error("❌ Token incorrecto.")
+
+    metricas = monitor.MONITOR.metricas()
+    mostrar_memoria(metricas)
+    st.markdown("---")
+    mostrar_sesiones(metricas)
+    st.markdown("---")
+    mostrar_caches(metricas)
+    st.markdown("---")
+
+    st.markdown("### 📄 Volcado")
+    try:
+        monitor.MONITOR.volcar(forzar=True)
+        st.caption(f"También guardado en data/almacen/{monitor.ARCHIVO_VOLCADO} (`python -m tablero.monitor`).")
+    except OSError as e:
+        st.warning(f"⚠️ No se pudo guardar el volcado: {e}")
+    st.download_button(
+        "⬇️ Descargar métricas (JSON)",
+        data=json.dumps(metricas, ensure_ascii=False, indent=2),
+        file_name="monitor.json",
+        mime="application/json"
+    )
+    with st.expander("Ver métricas en JSON", expanded=False):
+        st.json(metricas)
+
+
+# ===================================================
+# PASO 7: Punto de entrada de la app
+# ===================================================
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+# ===================================================
+# Utilidades compartidas por las páginas del tablero
+# ===================================================
+# Este paquete vive en la raíz del proyecto (y no dentro de /pages) para que
+# Streamlit no lo muestre como una página más en la barra lateral.
@@ -0,0 +1,190 @@
+# ===================================================
+# Almacén compartido de datos (Arrow mapeado en memoria)
+# ===================================================
+# Cuando corren varios procesos de Streamlit, cada uno leía y preprocesaba su
+# propia copia del Excel. Aquí el conjunto ya preprocesado se publica UNA vez
+# como archivo Arrow (formato IPC, sin compresión) y cada proceso lo abre con
+# `pa.memory_map`: las columnas quedan respaldadas por el mismo archivo en la
+# caché de páginas del sistema operativo, así que la RAM total casi no crece al
+# agregar procesos.
+#
+# Estructura en disco (carpeta data/almacen):
+#   servicio-<version>.arrow   -> datos publicados de una versión
+#   servicio.actual            -> puntero con el nombre del archivo vigente
+#
+# La publicación escribe primero un archivo temporal y luego lo renombra con
+# os.replace (atómico), y lo mismo con el puntero. Un lector nunca ve un
+# archivo a medio escribir: o ve la versión anterior o la nueva.
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+from filelock import FileLock
+
+CARPETA_ALMACEN = Path(__file__).resolve().parent.parent / "data" / "almacen"
+
+# Clave de los metadatos propios dentro del esquema Arrow
+_CLAVE_METADATOS = b"tablero"
+
+# Cuántas versiones anteriores se conservan en disco. No se borran de inmediato
+# porque otros procesos pueden seguir teniéndolas mapeadas.
+VERSIONES_CONSERVADAS = 2
+
+
+def version_origen(ruta_origen):
+    """Versión de un archivo fuente: cambia cada vez que el archivo se reemplaza.
+
+    Es solo un `stat`, así que se puede llamar en cada rerun para detectar datos nuevos.
+    """
+    info = Path(ruta_origen).stat()
+    return f"{info.st_mtime_ns}-{info.st_size}"
+
+
+def _ruta_puntero(nombre, carpeta):
+    return Path(carpeta) / f"{nombre}.actual"
+
+
+def _ruta_datos(nombre, version, carpeta):
+    return Path(carpeta) / f"{nombre}-{version}.arrow"
+
+
+def version_publicada(nombre, carpeta=CARPETA_ALMACEN):
+    """Versión vigente de `nombre` en el almacén, o None si nunca se publicó."""
+    try:
+        archivo = _ruta_puntero(nombre, carpeta).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    # El puntero guarda "<nombre>-<version>.arrow"
+    return archivo[len(nombre) + 1:-len(".arrow")]
+
+
+def _escribir_atomico(ruta, escribir):
+    """Escribe `ruta` a través de un temporal en la misma carpeta y luego lo renombra."""
+    temporal = ruta.with_name(f".{ruta.name}.{os.getpid()}.tmp")
+    try:
+        escribir(temporal)
+        os.replace(temporal, ruta)
+    finally:
+        if temporal.exists():
+            temporal.unlink()
+
+
+def escribir_json(nombre_archivo, contenido, carpeta=CARPETA_ALMACEN):
+    """Guarda `contenido` como JSON en el almacén, de forma atómica."""
+    carpeta = Path(carpeta)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    texto = json.dumps(contenido, ensure_ascii=False, indent=2, default=str)
+    _escribir_atomico(carpeta / nombre_archivo, lambda temporal: temporal.write_text(texto, encoding="utf-8"))
+
+
+def leer_json(nombre_archivo, carpeta=CARPETA_ALMACEN):
+    """Lee un JSON guardado con `escribir_json`, o None si no existe."""
+    try:
+        return json.loads((Path(carpeta) / nombre_archivo).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+
+def _a_tabla_arrow(df):
+    """Convierte el DataFrame a tabla Arrow.
+
+    Las columnas de texto del Excel a veces mezclan números y cadenas (p. ej.
+    'Telefono'); Arrow no admite tipos mixtos, así que esas columnas se guardan
+    como texto conservando los nulos.
+    """
+    columnas = {}
+    for col in df.columns:
+        serie = df[col]
+        if serie.dtype == "object":
+            try:
+                columnas[col] = pa.array(serie, from_pandas=True)
+                continue
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                serie = serie.where(serie.isna(), serie.astype(str))
+        columnas[col] = pa.array(serie, from_pandas=True)
+    return pa.table(columnas)
+
+
+def publicar(df, nombre, version, metadatos=None, carpeta=CARPETA_ALMACEN):
+    """Publica `df` como la versión `version` de `nombre` y la marca como vigente.
+
+    `metadatos` es cualquier objeto serializable a JSON (p. ej. el informe de
+    calidad del preprocesamiento) y se guarda dentro del esquema del archivo.
+    """
+    carpeta = Path(carpeta)
+    carpeta.mkdir(parents=True, exist_ok=True)
+
+    tabla = _a_tabla_arrow(df)
+    tabla = tabla.replace_schema_metadata({
+        _CLAVE_METADATOS: json.dumps(metadatos if metadatos is not None else {}, ensure_ascii=False).encode("utf-8")
+    })
+
+    def escribir_datos(temporal):
+        with pa.OSFile(str(temporal), "wb") as salida:
+            with pa.ipc.new_file(salida, tabla.schema) as escritor:
+                escritor.write_table(tabla)
+
+    ruta_datos = _ruta_datos(nombre, version, carpeta)
+    _escribir_atomico(ruta_datos, escribir_datos)
+    # El cambio de versión es el renombrado del puntero
+    _escribir_atomico(_ruta_puntero(nombre, carpeta),
+                      lambda temporal: temporal.write_text(ruta_datos.name, encoding="utf-8"))
+    _limpiar_versiones(nombre, carpeta)
+    return ruta_datos
+
+
+def _limpiar_versiones(nombre, carpeta):
+    """Borra las versiones más antiguas, dejando las `VERSIONES_CONSERVADAS` más recientes."""
+    versiones = sorted(Path(carpeta).glob(f"{nombre}-*.arrow"), key=lambda p: p.stat().st_mtime_ns)
+    for antigua in versiones[:-VERSIONES_CONSERVADAS]:
+        try:
+            antigua.unlink()
+        except OSError:
+            # En Windows no se puede borrar un archivo mapeado; se reintenta en la próxima publicación
+            pass
+
+
+def abrir(nombre, version=None, carpeta=CARPETA_ALMACEN):
+    """Abre una versión publicada sin copiarla a memoria.
+
+    Devuelve `(df, metadatos)`. Las columnas del DataFrame usan tipos respaldados
+    por Arrow (`pd.ArrowDtype`), que apuntan directamente al archivo mapeado.
+    """
+    if version is None:
+        version = version_publicada(nombre, carpeta)
+        if version is None:
+            raise FileNotFoundError(f"No hay datos publicados para '{nombre}' en {carpeta}")
+    fuente = pa.memory_map(str(_ruta_datos(nombre, version, carpeta)), "r")
+    tabla = pa.ipc.open_file(fuente).read_all()
+    metadatos = json.loads((tabla.schema.metadata or {}).get(_CLAVE_METADATOS, b"{}").decode("utf-8"))
+    df = tabla.to_pandas(types_mapper=pd.ArrowDtype)
+    return df, metadatos
+
+
+def obtener_artefacto(nombre, version, construir, carpeta=CARPETA_ALMACEN):
+    """Devuelve `(df, metadatos)` de la versión `version` del artefacto `nombre`.
+
+    Si esa versión no está publicada, `construir()` debe devolver
+    `(df, metadatos)`; el resultado se publica y todos los procesos pasan a
+    mapearlo. Un candado de archivo evita que varios procesos construyan la
+    misma versión a la vez.
+    """
+    if version_publicada(nombre, carpeta) != version:
+        Path(carpeta).mkdir(parents=True, exist_ok=True)
+        with FileLock(str(Path(carpeta) / f"{nombre}.lock")):
+            # Otro proceso pudo haberla publicado mientras se esperaba el candado
+            if version_publicada(nombre, carpeta) != version:
+                df, metadatos = construir()
+                publicar(df, nombre, version, metadatos, carpeta)
+    return abrir(nombre, version, carpeta)
+
+
+def obtener(nombre, ruta_origen, preparar, carpeta=CARPETA_ALMACEN):
+    """Devuelve `(df, metadatos)` de la versión vigente de `ruta_origen`.
+
+    Si el archivo fuente cambió (o nunca se publicó), `preparar(ruta_origen)`
+    debe devolver `(df, metadatos)` y se publica como nueva versión.
+    """
+    return obtener_artefacto(nombre, version_origen(ruta_origen), lambda: preparar(ruta_origen), carpeta)
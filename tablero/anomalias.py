@@ -0,0 +1,148 @@
+# ===================================================
+# Detección de caídas atípicas por agente y día
+# ===================================================
+# Busca días en que el perfil de un agente (puntaje, polaridad, pasos del guion)
+# cae de golpe respecto a su propio historial. Parte del cubo diario
+# (tablero/cubos.py), no de las llamadas:
+#   1. Promedio de cada métrica por agente y día (solo días con suficientes llamadas).
+#   2. Desvío de cada día frente a los días anteriores del MISMO agente (z).
+#   3. Un IsolationForest sobre los desvíos marca los días con un perfil atípico.
+#   4. Se marcan solo los atípicos en los que alguna métrica cae (z muy negativo):
+#      un día excepcionalmente bueno no es una alerta.
+# Se calcula una vez por versión del Excel en el precálculo / la precarga y se
+# publica en el almacén; las páginas solo leen las marcas ya calculadas.
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from tablero import cubos
+
+# Días con menos llamadas no se evalúan (un promedio de una o dos llamadas es ruido)
+MIN_LLAMADAS = 3
+# Días anteriores del agente que forman su línea base (y mínimo para evaluar)
+VENTANA_BASE = 14
+MIN_HISTORIA = 3
+# Fracción esperada de días atípicos para el IsolationForest
+CONTAMINACION = 0.05
+# Desvío (en desviaciones estándar) a partir del cual una métrica "cae"
+UMBRAL_CAIDA = 2.0
+# Marca junto al nombre de los agentes con días atípicos en los heatmaps
+MARCA = "🚩"
+
+
+def perfiles_diarios(cubo, metricas):
+    """Promedio de cada métrica por (día, Agente), con su número de llamadas."""
+    metricas = [m for m in metricas if m in cubos.metricas_del_cubo(cubo)]
+    promedios = cubos.promedios(cubos.combinar(cubo, por=('dia', 'Agente')))
+    return promedios[['llamadas'] + metricas].reset_index().sort_values(['Agente', 'dia'], ignore_index=True)
+
+
+def desvios(perfiles, metricas):
+    """Desvío estandarizado de cada día frente a los `VENTANA_BASE` días previos del agente.
+
+    La desviación estándar de la línea base tiene un piso (un cuarto de la
+    desviación de la métrica en todos los agentes-día), para que un agente muy
+    estable no dispare alertas por diferencias mínimas. Sin historia suficiente
+    el desvío queda en NaN.
+    """
+    resultado = pd.DataFrame(index=perfiles.index)
+    grupos = perfiles.groupby('Agente', sort=False)
+    for metrica in metricas:
+        previos = grupos[metrica].shift(1)
+        base = previos.groupby(perfiles['Agente'], sort=False).rolling(VENTANA_BASE, min_periods=MIN_HISTORIA)
+        media = base.mean().reset_index(level=0, drop=True)
+        desviacion = base.std().reset_index(level=0, drop=True)
+        piso = 0.25 * perfiles[metrica].std()
+        if not piso > 0:
+            piso = 1.0
+        resultado[metrica] = (perfiles[metrica] - media) / np.maximum(desviacion.fillna(piso), piso)
+    return resultado
+
+
+def detectar(cubo, metricas):
+    """Agentes-día evaluados con su puntaje de anomalía y si quedaron marcados.
+
+    Columnas: 'dia', 'Agente', 'llamadas', 'puntaje_anomalia' (mayor = más
+    atípico), 'anomalia' (atípico Y con alguna métrica en caída) y 'caidas'
+    (métricas que cayeron, separadas por coma).
+    """
+    from sklearn.ensemble import IsolationForest
+
+    perfiles = perfiles_diarios(cubo, metricas)
+    metricas = [m for m in metricas if m in perfiles.columns]
+    perfiles = perfiles[perfiles['llamadas'] >= MIN_LLAMADAS].reset_index(drop=True)
+    z = desvios(perfiles, metricas)
+    evaluables = z.notna().any(axis=1).to_numpy()
+    if evaluables.sum() < 2 or not metricas:
+        # Mismos tipos que un resultado con filas: sin tipos, Arrow guarda columnas
+        # nulas y los filtros de `agentes_marcados` fallan al leerlas del almacén
+        return pd.DataFrame({
+            'dia': pd.Series(dtype='datetime64[ns]'),
+            'Agente': pd.Series(dtype='string[pyarrow]'),
+            'llamadas': pd.Series(dtype='int64'),
+            'puntaje_anomalia': pd.Series(dtype='float64'),
+            'anomalia': pd.Series(dtype='bool'),
+            'caidas': pd.Series(dtype='string[pyarrow]'),
+        })
+
+    perfiles, z = perfiles[evaluables].reset_index(drop=True), z[evaluables].reset_index(drop=True)
+    modelo = IsolationForest(n_estimators=200, contamination=CONTAMINACION, random_state=0)
+    atipicos = modelo.fit_predict(z.fillna(0.0).to_numpy()) == -1
+    en_caida = z <= -UMBRAL_CAIDA
+
+    return pd.DataFrame({
+        'dia': perfiles['dia'],
+        'Agente': perfiles['Agente'].astype(str),
+        'llamadas': perfiles['llamadas'].astype('int64'),
+        'puntaje_anomalia': -modelo.score_samples(z.fillna(0.0).to_numpy()),
+        'anomalia': atipicos & en_caida.any(axis=1).to_numpy(),
+        'caidas': [", ".join(z.columns[fila]) for fila in en_caida.to_numpy()],
+    })
+
+
+def agentes_marcados(anomalias, desde=None, hasta=None, agentes=None):
+    """Resumen por agente de los días marcados en la ventana (los más atípicos primero)."""
+    vacio = pd.DataFrame(columns=['Agente', 'dias_marcados', 'ultimo_dia', 'puntaje_maximo', 'caidas'])
+    # Sin filas no hay nada que filtrar (y un artefacto vacío publicado antes de
+    # tipar `detectar` trae columnas nulas que no admiten `isin`)
+    if anomalias.empty:
+        return vacio
+    marcados = cubos.ventana(anomalias, desde, hasta)
+    marcados = marcados[marcados['anomalia'].to_numpy(dtype=bool, na_value=False)]
+    if agentes is not None:
+        marcados = marcados[marcados['Agente'].isin(agentes)]
+    if marcados.empty:
+        return vacio
+    resumen = marcados.groupby('Agente').agg(
+        dias_marcados=('dia', 'size'),
+        ultimo_dia=('dia', 'max'),
+        puntaje_maximo=('puntaje_anomalia', 'max'),
+        caidas=('caidas', lambda valores: ", ".join(sorted({m for v in valores for m in v.split(", ") if m}))),
+    )
+    return resumen.sort_values('puntaje_maximo', ascending=False).reset_index()
+
+
+def marcar_agentes(df_heatmap, marcados):
+    """Copia de `df_heatmap` (Agente como índice) con la marca junto a los agentes marcados."""
+    nombres = set(marcados['Agente'])
+    return df_heatmap.rename(index=lambda agente: f"{MARCA} {agente}" if agente in nombres else agente)
+
+
+def mostrar_marcados(marcados):
+    """Panel de agentes con caídas atípicas (resultado de `agentes_marcados`)."""
+    st.markdown(f"### {MARCA} Agentes con caídas atípicas")
+    if marcados is None:
+        st.info("⏳ Los días atípicos se están calculando en segundo plano; estarán aquí en el próximo refresco.")
+        return
+    if marcados.empty:
+        st.success("✅ Ningún agente tuvo días con caídas atípicas en el periodo seleccionado.")
+        return
+    st.caption(f"Días en que el perfil del agente cayó frente a sus {VENTANA_BASE} días previos "
+               f"(solo días con al menos {MIN_LLAMADAS} llamadas).")
+    st.dataframe(
+        marcados.rename(columns={
+            'dias_marcados': 'Días marcados', 'ultimo_dia': 'Último día',
+            'puntaje_maximo': 'Puntaje de anomalía', 'caidas': 'Métricas en caída',
+        }).style.format({'Puntaje de anomalía': "{:.2f}", 'Último día': lambda d: f"{d:%d/%m/%Y}"}),
+        hide_index=True, use_container_width=True
+    )
@@ -0,0 +1,120 @@
+# ===================================================
+# Búsqueda de texto en las llamadas (índice invertido)
+# ===================================================
+# El índice se construye una vez por versión del Excel, junto con los demás
+# artefactos: cada palabra de las columnas de texto (comentarios, evento,
+# opción, transcripciones...) apunta a las posiciones de las llamadas donde
+# aparece. Las palabras se guardan sin tildes y en minúsculas, así que buscar
+# "gestion" encuentra "Gestión".
+#
+# En el almacén se guarda como pares (código de palabra, posición) ordenados por
+# palabra, y el vocabulario ordenado en los metadatos. Al cargarlo, las
+# posiciones de cada palabra quedan contiguas: buscar es un `searchsorted` sobre
+# el vocabulario y un corte del arreglo, sin recorrer las llamadas. El resultado
+# es una máscara más para combinar con los filtros (tablero/filtros.py).
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+_PALABRA = re.compile(r"\w+")
+
+
+def normalizar(texto):
+    """Texto sin tildes ni diéresis y en minúsculas ('Gestión' -> 'gestion')."""
+    texto = unicodedata.normalize("NFKD", str(texto))
+    return "".join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def palabras(texto):
+    """Palabras normalizadas de `texto`, sin repetir y en orden de aparición."""
+    return list(dict.fromkeys(_PALABRA.findall(normalizar(texto))))
+
+
+class IndiceTexto:
+    """Índice invertido palabra -> posiciones de llamadas.
+
+    `tokens` es el vocabulario ordenado y `posiciones` las posiciones de todas
+    las palabras, agrupadas por palabra en el mismo orden; las de `tokens[i]`
+    son `posiciones[inicios[i]:inicios[i + 1]]`.
+    """
+
+    def __init__(self, tokens, codigos, posiciones, filas):
+        self.tokens = np.asarray(tokens, dtype=str)
+        self.posiciones = np.asarray(posiciones, dtype=np.int32)
+        self.inicios = np.searchsorted(np.asarray(codigos), np.arange(len(self.tokens) + 1))
+        self.filas = filas
+
+    def _rango(self, termino):
+        """Posiciones de las palabras que empiezan por `termino` (ya normalizado)."""
+        desde = np.searchsorted(self.tokens, termino, side="left")
+        hasta = np.searchsorted(self.tokens, termino + "￿", side="left")
+        return np.unique(self.posiciones[self.inicios[desde]:self.inicios[hasta]])
+
+    def buscar(self, consulta):
+        """Posiciones de las llamadas que contienen TODAS las palabras de la consulta.
+
+        Cada palabra se busca como prefijo ('cancel' encuentra 'cancelacion').
+        Devuelve None si la consulta no tiene palabras.
+        """
+        terminos = palabras(consulta)
+        if not terminos:
+            return None
+        resultado = None
+        for termino in terminos:
+            encontradas = self._rango(termino)
+            resultado = encontradas if resultado is None else np.intersect1d(resultado, encontradas, assume_unique=True)
+            if resultado.size == 0:
+                break
+        return resultado
+
+    def mascara(self, consulta):
+        """Máscara booleana de las llamadas que cumplen la consulta (None si está vacía)."""
+        encontradas = self.buscar(consulta)
+        if encontradas is None:
+            return None
+        mascara = np.zeros(self.filas, dtype=bool)
+        mascara[encontradas] = True
+        return mascara
+
+
+def construir(df, columnas):
+    """Construye el índice sobre las `columnas` de texto presentes en `df`.
+
+    Cada valor distinto de una columna se tokeniza una sola vez; sus palabras se
+    asignan a todas las filas que tienen ese valor.
+    """
+    columnas = [c for c in columnas if c in df.columns]
+    pares_token, pares_posicion = [], []
+    for columna in columnas:
+        codigos, valores = pd.factorize(df[columna].astype("string"), use_na_sentinel=True)
+        filas_por_valor = pd.Series(np.arange(len(df))).groupby(codigos).indices
+        for codigo, valor in enumerate(valores):
+            posiciones = filas_por_valor.get(codigo)
+            if posiciones is None:
+                continue
+            for palabra in palabras(valor):
+                pares_token.append(np.full(len(posiciones), palabra, dtype=object))
+                pares_posicion.append(posiciones)
+
+    if not pares_token:
+        return pd.DataFrame({"codigo": pd.Series(dtype="int32"), "posicion": pd.Series(dtype="int32")}), \
+            {"tokens": [], "columnas": columnas, "filas": len(df)}
+
+    tokens = np.concatenate(pares_token)
+    posiciones = np.concatenate(pares_posicion).astype(np.int64)
+    vocabulario, codigos = np.unique(tokens.astype(str), return_inverse=True)
+    # Orden por (palabra, posición) y sin repetir la misma llamada en una palabra
+    claves = np.unique(codigos.astype(np.int64) << 32 | posiciones)
+    tabla = pd.DataFrame({
+        "codigo": (claves >> 32).astype(np.int32),
+        "posicion": (claves & 0xFFFFFFFF).astype(np.int32),
+    })
+    return tabla, {"tokens": vocabulario.tolist(), "columnas": columnas, "filas": len(df)}
+
+
+def indice_desde_tabla(tabla, metadatos):
+    """Reconstruye el `IndiceTexto` a partir de lo publicado por `construir`."""
+    return IndiceTexto(metadatos["tokens"], tabla["codigo"].to_numpy(dtype=np.int32),
+                       tabla["posicion"].to_numpy(dtype=np.int32), metadatos["filas"])
@@ -0,0 +1,127 @@
+# ===================================================
+# Informe de calidad de los datos
+# ===================================================
+# La validación se hace UNA vez por versión del Excel, dentro del
+# preprocesamiento (datos.preparar_datos_*), que es el único momento en que se
+# ven los valores originales: columnas esperadas que faltan, valores que no se
+# pudieron convertir a número, fechas ilegibles y llamadas repetidas por su
+# identificador. El informe se guarda como metadatos de la versión publicada en
+# el almacén, así que los reruns de las páginas solo lo leen y lo muestran
+# cuando alguien lo pide, sin volver a recorrer los datos.
+import pandas as pd
+
+# Valores de ejemplo que se guardan por hallazgo
+MAX_EJEMPLOS = 5
+
+
+def _ejemplos(valores):
+    return [str(v) for v in pd.unique(pd.Series(valores, dtype=object))[:MAX_EJEMPLOS]]
+
+
+def nuevo_informe(df, esperadas):
+    """Informe vacío de `df` con las columnas `esperadas` que no están."""
+    return {
+        "filas": len(df),
+        "columnas_faltantes": [c for c in esperadas if c not in df.columns],
+        "conversiones": {},
+        "fechas": None,
+        "duplicados": None,
+    }
+
+
+def convertir_numerica(df, columna, informe):
+    """Convierte `columna` a número (quitando '%') y anota en `informe` lo que no se pudo convertir."""
+    original = df[columna]
+    valores = original
+    con_porcentaje = 0
+    if not pd.api.types.is_numeric_dtype(original):
+        texto = original.astype("string").str.strip()
+        tiene_porcentaje = texto.str.endswith("%").fillna(False)
+        con_porcentaje = int(tiene_porcentaje.sum())
+        valores = texto.str.replace("%", "", regex=False)
+    convertida = pd.to_numeric(valores, errors="coerce")
+    fallidos = original.notna() & convertida.isna()
+    informe["conversiones"][columna] = {
+        "fallidos": int(fallidos.sum()),
+        "vacios": int(original.isna().sum()),
+        "con_porcentaje": con_porcentaje,
+        "ejemplos": _ejemplos(original[fallidos]),
+    }
+    df[columna] = convertida
+
+
+def convertir_fechas(df, columna, destino, informe):
+    """Convierte `columna` a fecha en `destino` y anota en `informe` las fechas ilegibles."""
+    original = df[columna]
+    df[destino] = pd.to_datetime(original, errors="coerce")
+    ilegibles = original.notna() & df[destino].isna()
+    informe["fechas"] = {
+        "columna": columna,
+        "ilegibles": int(ilegibles.sum()),
+        "vacias": int(original.isna().sum()),
+        "ejemplos": _ejemplos(original[ilegibles]),
+    }
+
+
+def revisar_duplicados(df, columna, informe):
+    """Anota en `informe` las filas cuyo identificador (`columna`) ya apareció antes."""
+    if columna not in df.columns:
+        return
+    identificadores = df[columna].dropna()
+    repetidos = identificadores.duplicated()
+    informe["duplicados"] = {
+        "columna": columna,
+        "filas": int(repetidos.sum()),
+        "ejemplos": _ejemplos(identificadores[repetidos]),
+    }
+
+
+def informe_de(metadatos):
+    """Informe guardado en los metadatos de una versión publicada (None en versiones anteriores a él)."""
+    return metadatos.get("calidad") if isinstance(metadatos, dict) else None
+
+
+def hallazgos(informe):
+    """Lista de (tipo, mensaje) para mostrar; 'error' si afecta a filtros o métricas."""
+    if not informe:
+        return []
+    resultado = []
+    for columna in informe["columnas_faltantes"]:
+        resultado.append(("error", f"❌ Falta la columna '{columna}'."))
+    for columna, conversion in informe["conversiones"].items():
+        if conversion["fallidos"]:
+            resultado.append(("warning", f"⚠️ '{columna}': {conversion['fallidos']} valores no numéricos quedaron "
+                                         f"como nulos (p. ej. {', '.join(conversion['ejemplos'])})."))
+        if conversion["con_porcentaje"]:
+            resultado.append(("info", f"ℹ️ '{columna}': se quitó el símbolo % a {conversion['con_porcentaje']} valores."))
+    fechas = informe["fechas"]
+    if fechas and fechas["ilegibles"]:
+        resultado.append(("warning", f"⚠️ '{fechas['columna']}': {fechas['ilegibles']} fechas ilegibles "
+                                     f"(p. ej. {', '.join(fechas['ejemplos'])}); esas llamadas no entran en el filtro por fecha."))
+    if fechas and fechas["vacias"]:
+        resultado.append(("info", f"ℹ️ '{fechas['columna']}': {fechas['vacias']} llamadas sin fecha."))
+    duplicados = informe["duplicados"]
+    if duplicados and duplicados["filas"]:
+        resultado.append(("warning", f"⚠️ '{duplicados['columna']}': {duplicados['filas']} filas repiten un "
+                                     f"identificador ya visto (p. ej. {', '.join(duplicados['ejemplos'])})."))
+    return resultado
+
+
+def mostrar_informe(informe, titulo="🩺 Calidad de los datos"):
+    """Informe en un desplegable cerrado de la barra lateral (solo lee lo ya calculado)."""
+    # Streamlit solo hace falta para mostrar: el preprocesamiento y el precálculo
+    # usan este módulo sin cargarlo
+    import streamlit as st
+
+    encontrados = hallazgos(informe)
+    problemas = sum(1 for tipo, _ in encontrados if tipo != "info")
+    etiqueta = f"{titulo} ({problemas} {'hallazgo' if problemas == 1 else 'hallazgos'})" if problemas else f"{titulo} ✅"
+    with st.sidebar.expander(etiqueta, expanded=False):
+        if not informe:
+            st.info("No hay informe de calidad para esta versión de los datos.")
+            return
+        st.caption(f"Revisado al cargar esta versión del Excel: {informe['filas']} filas.")
+        if not encontrados:
+            st.success("✅ Sin problemas detectados.")
+        for tipo, mensaje in encontrados:
+            getattr(st, tipo)(mensaje)
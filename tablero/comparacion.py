@@ -0,0 +1,75 @@
+# ===================================================
+# Comparación de agentes entre ventas y servicio
+# ===================================================
+# Un mismo agente puede aparecer en ambos conjuntos con el nombre escrito
+# distinto (tildes, mayúsculas, espacios). El índice de agentes asigna a cada
+# nombre una clave normalizada y guarda, por clave, el nombre tal como aparece en
+# cada conjunto. Se construye una vez por par de versiones de los Excel y se
+# publica en el almacén (ver datos.indice_agentes).
+#
+# La comparación no recorre llamadas: parte de los cubos diarios de cada
+# conjunto (tablero/cubos.py), los combina por agente en la ventana de fechas y
+# une ambos resultados por clave. El costo depende de días × agentes.
+import re
+import unicodedata
+
+import pandas as pd
+
+from tablero import cubos
+
+CONJUNTOS = ("servicio", "ventas")
+
+
+def clave_agente(nombre):
+    """Clave de cruce de un nombre de agente: sin tildes, minúsculas y espacios simples."""
+    texto = unicodedata.normalize("NFKD", str(nombre))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", texto.lower()).strip()
+
+
+def construir_indice_agentes(agentes_por_conjunto):
+    """Índice nombre -> clave de los agentes de cada conjunto.
+
+    `agentes_por_conjunto` es {'servicio': nombres, 'ventas': nombres}. Devuelve
+    un DataFrame con una fila por (conjunto, nombre): 'conjunto', 'nombre',
+    'clave' y 'Agente' (nombre a mostrar para la clave, el de servicio si existe).
+    """
+    partes = []
+    for conjunto in CONJUNTOS:
+        nombres = pd.Series(pd.unique(pd.Series(agentes_por_conjunto[conjunto]).dropna().astype(str)), dtype=object)
+        partes.append(pd.DataFrame({"conjunto": conjunto, "nombre": nombres, "clave": nombres.map(clave_agente)}))
+    indice = pd.concat(partes, ignore_index=True)
+    # Orden de CONJUNTOS: el primer nombre de cada clave es el de servicio, si lo hay
+    indice["Agente"] = indice.groupby("clave")["nombre"].transform("first")
+    return indice.sort_values(["Agente", "conjunto"], ignore_index=True)
+
+
+def promedios_por_agente(cubo, indice, conjunto, desde=None, hasta=None):
+    """Promedios por agente de un cubo en la ventana, indexados por clave de agente.
+
+    Si varias escrituras del mismo nombre caen en la misma clave, sus sumas y
+    conteos se combinan antes de promediar.
+    """
+    combinado = cubos.combinar(cubos.ventana(cubo, desde, hasta))
+    claves = indice[indice["conjunto"] == conjunto].set_index("nombre")["clave"]
+    combinado = combinado.groupby(combinado.index.astype(str).map(claves)).sum()
+    return cubos.promedios(combinado)
+
+
+def comparar(cubo_servicio, cubo_ventas, indice, pasos_ventas=(), desde=None, hasta=None):
+    """Tabla por agente con las métricas de ambos conjuntos lado a lado.
+
+    Las columnas llevan el sufijo ' (servicio)' o ' (ventas)'. Los `pasos_ventas`
+    (0/1 por llamada) quedan como porcentaje de llamadas que cumplen el paso.
+    """
+    servicio = promedios_por_agente(cubo_servicio, indice, "servicio", desde, hasta)
+    ventas = promedios_por_agente(cubo_ventas, indice, "ventas", desde, hasta)
+    pasos = [p for p in pasos_ventas if p in ventas.columns]
+    ventas[pasos] = ventas[pasos] * 100
+
+    tabla = indice.drop_duplicates("clave").set_index("clave")[["Agente"]]
+    tabla = tabla.join(servicio.add_suffix(" (servicio)")).join(ventas.add_suffix(" (ventas)"))
+    # Agentes sin llamadas en la ventana en ninguno de los dos conjuntos no se muestran
+    llamadas = ["llamadas (servicio)", "llamadas (ventas)"]
+    tabla[llamadas] = tabla[llamadas].fillna(0).astype("int64")
+    return tabla[tabla[llamadas].sum(axis=1) > 0].reset_index()
@@ -0,0 +1,210 @@
+# ===================================================
+# Conciliación de audios con los registros de llamadas
+# ===================================================
+# Cruza el inventario de grabaciones (archivos en disco o la salida del pipeline
+# de transcripción) con las filas del Excel de llamadas. El nombre de cada
+# archivo se normaliza UNA vez a una clave (minúsculas, sin extensión ni
+# carpetas, separadores como espacio) y el cruce se hace con un índice hash
+# sobre esas claves: construirlo y consultarlo es lineal en el número de
+# archivos y llamadas, sin comparar pares ni hacer coincidencias aproximadas.
+#
+# Las llamadas se indexan por el nombre del audio que referencian
+# ('audio'/'NombreAudios' en servicio, 'archivo' en ventas). En exportaciones de
+# la central donde 'Identificador único' guarda el identificador de la
+# grabación, los audios que no aparecen por nombre se buscan también por él. En
+# el Excel de servicio actual esa columna solo trae el evento de cuelgue
+# (COMPLETEAGENT / COMPLETECALLER): con tan pocos valores distintos no
+# identifica llamadas y el índice secundario no se construye.
+#
+# Uso (desde la raíz del proyecto):
+#   python -m tablero.conciliacion --conjunto servicio --audios data/audios
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from tablero import almacen, datos, transcripcion
+
+# Columnas de las llamadas con el nombre del audio, en orden de preferencia
+COLUMNAS_NOMBRE = {
+    "servicio": ["audio", "NombreAudios"],
+    "ventas": ["archivo"],
+}
+COLUMNA_IDENTIFICADOR = "Identificador único"
+# Mínimo de valores distintos por llamada para usar el identificador como clave
+# de cruce (los nombres de archivo son casi únicos; un código de evento no)
+CARDINALIDAD_MINIMA_IDENTIFICADOR = 0.2
+
+# Un WAV con solo el encabezado (44 bytes) no tiene audio
+PESO_MINIMO_BYTES = 44
+
+CARPETA_REPORTE = Path("reportes") / "conciliacion"
+
+
+def claves_normalizadas(nombres):
+    """Clave de cruce de cada nombre de archivo o identificador (serie de texto, nulos se conservan).
+
+    '9/2025/05/01/00/1746078448.360531.WAV', '1746078448.360531.TXT' y
+    '1746078448 360531 txt' dan la misma clave: '1746078448 360531'.
+    """
+    # Texto respaldado por Arrow: las expresiones regulares corren vectorizadas en C++
+    texto = pd.Series(nombres).astype("string[pyarrow]")
+    base = texto.str.replace(r"^.*[/\\]", "", regex=True)
+    # Extensión de archivo: punto + letra + hasta 3 caracteres ('.360531' no es extensión)
+    base = base.str.replace(r"[.\s][A-Za-z][A-Za-z0-9]{1,3}$", "", regex=True)
+    return base.str.lower().str.replace(r"[\s._\-]+", " ", regex=True).str.strip()
+
+
+class IndiceClaves:
+    """Índice hash de claves a filas: cada clave distinta recibe un código.
+
+    `codigos[i]` es el código de la fila i (-1 si no tiene clave) y
+    `buscar(claves)` devuelve el código de cada clave consultada (-1 si no está).
+    """
+
+    def __init__(self, claves):
+        self.codigos, unicas = pd.factorize(pd.Series(claves), use_na_sentinel=True)
+        self._unicas = pd.Index(unicas)
+
+    def __len__(self):
+        return len(self._unicas)
+
+    def buscar(self, claves):
+        return self._unicas.get_indexer(pd.Series(claves))
+
+
+def claves_llamadas(llamadas, conjunto):
+    """Clave por nombre de audio de cada llamada, tomando la primera columna con valor."""
+    claves = pd.Series(pd.NA, index=llamadas.index, dtype="string[pyarrow]")
+    for columna in COLUMNAS_NOMBRE[conjunto]:
+        if columna in llamadas.columns:
+            claves = claves.fillna(claves_normalizadas(llamadas[columna]))
+    return claves
+
+
+def identificador_util(llamadas):
+    """True si 'Identificador único' existe y tiene suficientes valores distintos para cruzar audios."""
+    if COLUMNA_IDENTIFICADOR not in llamadas.columns:
+        return False
+    valores = llamadas[COLUMNA_IDENTIFICADOR].dropna()
+    return len(valores) > 0 and valores.nunique() >= CARDINALIDAD_MINIMA_IDENTIFICADOR * len(valores)
+
+
+def inventario_disco(carpeta_audios):
+    """Audios encontrados en disco: 'audio' (ruta relativa), 'peso' y 'Archivo_Vacio'."""
+    archivos = transcripcion.buscar_audios(carpeta_audios)
+    pesos = [ruta.stat().st_size for ruta, _ in archivos]
+    return pd.DataFrame({
+        "audio": [relativa for _, relativa in archivos],
+        "peso": pd.Series(pesos, dtype="int64"),
+        "Archivo_Vacio": np.where(np.asarray(pesos, dtype="int64") <= PESO_MINIMO_BYTES, "Sí", "No"),
+    })
+
+
+def inventario_almacen(conjunto):
+    """Audios ya procesados por el pipeline de transcripción ('<conjunto>_audio' en el almacén)."""
+    procesados, _ = almacen.abrir(f"{conjunto}_audio")
+    return procesados
+
+
+def conciliar(llamadas, inventario, conjunto):
+    """Cruza `inventario` (columna 'audio' y opcionalmente 'Archivo_Vacio') con `llamadas`.
+
+    Devuelve `(coincidencia, reporte)`:
+      - `coincidencia`: serie 'Sí'/'No' alineada con `llamadas` (como 'Coincidencia_Excel').
+      - `reporte`: dict de DataFrames 'emparejados', 'audios_sin_llamada',
+        'llamadas_sin_audio', 'audios_vacios' y 'llamadas_vacias'.
+    """
+    claves_inventario = claves_normalizadas(inventario["audio"]).reset_index(drop=True)
+
+    # Índice principal por nombre de audio
+    por_nombre = IndiceClaves(claves_llamadas(llamadas, conjunto))
+    codigo = por_nombre.buscar(claves_inventario)
+    emparejado_por = np.where(codigo >= 0, "nombre", None).astype(object)
+
+    # Índice secundario por identificador único, solo para lo que no cruzó por
+    # nombre y solo si la columna realmente identifica llamadas
+    codigo_identificador = np.full(len(inventario), -1)
+    por_identificador = None
+    if identificador_util(llamadas):
+        por_identificador = IndiceClaves(claves_normalizadas(llamadas[COLUMNA_IDENTIFICADOR]))
+        faltantes = np.flatnonzero(codigo < 0)
+        codigo_identificador[faltantes] = por_identificador.buscar(claves_inventario.iloc[faltantes])
+        emparejado_por[codigo_identificador >= 0] = "identificador"
+
+    # Filas de llamadas alcanzadas por algún audio (lookup por código, lineal)
+    con_audio = np.zeros(len(llamadas), dtype=bool)
+    presentes = np.zeros(len(por_nombre) + 1, dtype=bool)
+    presentes[codigo[codigo >= 0]] = True
+    con_audio |= presentes[por_nombre.codigos] & (por_nombre.codigos >= 0)
+    if por_identificador is not None:
+        presentes = np.zeros(len(por_identificador) + 1, dtype=bool)
+        presentes[codigo_identificador[codigo_identificador >= 0]] = True
+        con_audio |= presentes[por_identificador.codigos] & (por_identificador.codigos >= 0)
+
+    # Pares (audio, fila de llamada) uniendo por código entero
+    inventario = inventario.reset_index(drop=True).assign(clave=claves_inventario, emparejado_por=emparejado_por)
+    pares = [
+        inventario.assign(_codigo=codigo)[codigo >= 0].merge(
+            pd.DataFrame({"_codigo": por_nombre.codigos, "fila_llamada": np.arange(len(llamadas))}), on="_codigo")
+    ]
+    if por_identificador is not None:
+        pares.append(inventario.assign(_codigo=codigo_identificador)[codigo_identificador >= 0].merge(
+            pd.DataFrame({"_codigo": por_identificador.codigos, "fila_llamada": np.arange(len(llamadas))}), on="_codigo"))
+    emparejados = pd.concat(pares, ignore_index=True).drop(columns="_codigo")
+
+    columnas_llamada = [c for c in ["Fecha", "Agente", COLUMNA_IDENTIFICADOR] + COLUMNAS_NOMBRE[conjunto]
+                        if c in llamadas.columns]
+    sin_cruce = pd.isna(emparejado_por)
+    vacio_inventario = (inventario["Archivo_Vacio"] == "Sí").to_numpy() if "Archivo_Vacio" in inventario.columns \
+        else np.zeros(len(inventario), dtype=bool)
+    vacio_llamadas = (llamadas["Archivo_Vacio"] == "Sí").to_numpy(dtype=bool, na_value=False) \
+        if "Archivo_Vacio" in llamadas.columns else np.zeros(len(llamadas), dtype=bool)
+
+    reporte = {
+        "emparejados": emparejados,
+        "audios_sin_llamada": inventario[sin_cruce].drop(columns="emparejado_por"),
+        "llamadas_sin_audio": llamadas.iloc[np.flatnonzero(~con_audio)][columnas_llamada],
+        "audios_vacios": inventario[vacio_inventario],
+        "llamadas_vacias": llamadas.iloc[np.flatnonzero(vacio_llamadas)][columnas_llamada],
+    }
+    coincidencia = pd.Series(np.where(con_audio, "Sí", "No"), index=llamadas.index, name="Coincidencia_Excel")
+    return coincidencia, reporte
+
+
+def escribir_reporte(reporte, carpeta=CARPETA_REPORTE):
+    """Guarda cada tabla del reporte como CSV (UTF-8 con BOM, para Excel) en `carpeta`."""
+    carpeta = Path(carpeta)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    for nombre, tabla in reporte.items():
+        tabla.to_csv(carpeta / f"{nombre}.csv", index=False, encoding="utf-8-sig")
+    return carpeta
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concilia las grabaciones con los registros de llamadas.")
+    parser.add_argument("--conjunto", choices=sorted(COLUMNAS_NOMBRE), required=True, help="Registros de llamadas a conciliar")
+    parser.add_argument("--audios", default=str(datos.CARPETA_AUDIOS), help="Carpeta con las grabaciones (se recorre completa)")
+    parser.add_argument("--procesados", action="store_true",
+                        help="Usar como inventario la salida de tablero.transcripcion en vez de recorrer la carpeta")
+    parser.add_argument("--salida", default=str(CARPETA_REPORTE), help=f"Carpeta del reporte (por defecto: {CARPETA_REPORTE})")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    cargar = datos.cargar_servicio if args.conjunto == "servicio" else datos.cargar_ventas
+    llamadas, _ = cargar()
+    inventario = inventario_almacen(args.conjunto) if args.procesados else inventario_disco(args.audios)
+    coincidencia, reporte = conciliar(llamadas, inventario, args.conjunto)
+    carpeta = escribir_reporte(reporte, args.salida)
+
+    print(f"✅ {args.conjunto}: {len(inventario)} audios, {len(llamadas)} llamadas "
+          f"({(coincidencia == 'Sí').sum()} con audio) en {time.perf_counter() - inicio:.2f} s")
+    for nombre, tabla in reporte.items():
+        print(f"  {nombre}: {len(tabla)}")
+    print(f"Reporte en '{carpeta}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# ===================================================
+# Cubos de agregados por día
+# ===================================================
+# Un cubo guarda, por cada día y cada combinación de dimensiones (por defecto
+# el Agente), la SUMA y el CONTEO de cada métrica más el número de llamadas.
+# Con sumas y conteos (y no promedios) cualquier ventana de fechas se resuelve
+# sumando las filas del cubo y dividiendo al final, sin volver a recorrer las
+# llamadas: el costo depende del número de días × agentes, no de filas.
+import numpy as np
+import pandas as pd
+
+SUFIJO_SUMA = "__suma"
+SUFIJO_CONTEO = "__n"
+
+
+def cubo_diario(df, metricas, dimensiones=('Agente',), columna_fecha='fecha_convertida'):
+    """Construye el cubo diario de `df`.
+
+    Columnas del resultado: 'dia', las dimensiones, 'llamadas' y, por cada
+    métrica, '<métrica>__suma' y '<métrica>__n'. Las llamadas sin fecha
+    válida no entran al cubo.
+    """
+    dimensiones = [d for d in dimensiones if d in df.columns]
+    metricas = [m for m in metricas if m in df.columns]
+    base = df[dimensiones + metricas].assign(dia=df[columna_fecha].dt.floor('D'))
+    base = base[base['dia'].notna()]
+
+    grupos = base.groupby(['dia'] + dimensiones, observed=True, sort=True)
+    sumas = grupos[metricas].sum().astype('float64').add_suffix(SUFIJO_SUMA)
+    conteos = grupos[metricas].count().astype('int64').add_suffix(SUFIJO_CONTEO)
+    cubo = pd.concat([grupos.size().rename('llamadas').astype('int64'), sumas, conteos], axis=1)
+    return cubo.reset_index()
+
+
+def metricas_del_cubo(cubo):
+    """Nombres de las métricas presentes en el cubo."""
+    return [c[:-len(SUFIJO_SUMA)] for c in cubo.columns if c.endswith(SUFIJO_SUMA)]
+
+
+def ventana(cubo, desde=None, hasta=None):
+    """Filas del cubo entre `desde` y `hasta` (fechas, ambas inclusive)."""
+    mascara = np.ones(len(cubo), dtype=bool)
+    if desde is not None:
+        mascara &= (cubo['dia'] >= pd.Timestamp(desde)).to_numpy(dtype=bool, na_value=False)
+    if hasta is not None:
+        mascara &= (cubo['dia'] <= pd.Timestamp(hasta)).to_numpy(dtype=bool, na_value=False)
+    return cubo[mascara]
+
+
+def combinar(cubo, por=('Agente',)):
+    """Suma las filas del cubo agrupando por `por` (lista vacía = total general)."""
+    columnas = [c for c in cubo.columns if c == 'llamadas' or c.endswith(SUFIJO_SUMA) or c.endswith(SUFIJO_CONTEO)]
+    por = list(por)
+    if not por:
+        return cubo[columnas].sum().to_frame().T
+    return cubo.groupby(por, observed=True)[columnas].sum()
+
+
+def promedios(combinado):
+    """Promedio de cada métrica a partir de sumas y conteos ya combinados.
+
+    Si una métrica no tiene valores en el grupo el promedio queda en NaN (igual
+    que `mean()` sobre las filas originales).
+    """
+    resultado = pd.DataFrame(index=combinado.index)
+    resultado['llamadas'] = combinado['llamadas'].astype('int64')
+    for metrica in metricas_del_cubo(combinado):
+        suma = combinado[metrica + SUFIJO_SUMA].astype('float64')
+        conteo = combinado[metrica + SUFIJO_CONTEO].astype('float64')
+        resultado[metrica] = suma / conteo.replace(0, np.nan)
+    return resultado
+
+
+def periodo_anterior(desde, hasta):
+    """Ventana del mismo largo inmediatamente anterior a [`desde`, `hasta`] (fechas inclusive)."""
+    desde, hasta = pd.Timestamp(desde), pd.Timestamp(hasta)
+    largo = hasta - desde + pd.Timedelta(days=1)
+    return (desde - largo).date(), (desde - pd.Timedelta(days=1)).date()
+
+
+def resumen(cubo, desde=None, hasta=None, selecciones=None):
+    """Promedios generales (y 'llamadas') del cubo en la ventana de fechas.
+
+    `selecciones` restringe las dimensiones: {'Agente': [...], 'Cola': [...]}.
+    Recorre solo las filas del cubo (días × combinaciones), nunca las llamadas.
+    Devuelve una serie con 'llamadas' y el promedio de cada métrica.
+    """
+    filas = ventana(cubo, desde, hasta)
+    for dimension, valores in (selecciones or {}).items():
+        if dimension in filas.columns:
+            filas = filas[filas[dimension].isin(list(valores)).to_numpy(dtype=bool, na_value=False)]
+    return promedios(combinar(filas, por=())).iloc[0]
+
+
+def variacion(actual, anterior):
+    """Diferencia `actual - anterior`, o None si alguno de los dos no tiene dato."""
+    if actual is None or anterior is None or pd.isna(actual) or pd.isna(anterior):
+        return None
+    return float(actual) - float(anterior)
@@ -0,0 +1,381 @@
+# ===================================================
+# Carga y preprocesamiento de los conjuntos de datos
+# ===================================================
+# Funciones sin Streamlit para que las usen tanto las páginas como los modos por
+# línea de comandos (reportes, precálculo). Las páginas las envuelven con
+# st.cache_resource; aquí solo se prepara y se publica en el almacén compartido.
+from pathlib import Path
+
+import pandas as pd
+
+from tablero import almacen, anomalias, busqueda, calidad, comparacion, cubos, filtros, ranking, tendencias
+
+CARPETA_DATOS = Path(__file__).resolve().parent.parent / "data"
+ARCHIVO_SERVICIO = CARPETA_DATOS / "final_servicio_cltiene.xlsx"
+ARCHIVO_VENTAS = CARPETA_DATOS / "Ventas se le tiene_hoy.xlsx"
+# Grabaciones de las llamadas; la columna 'audio' guarda rutas relativas a esta carpeta
+CARPETA_AUDIOS = CARPETA_DATOS / "audios"
+
+# Columna de estado de la llamada en el Excel de ventas (ojo con la doble L mayúscula)
+ESTADO_COL_VENTAS = "Estado de la LLamada"
+
+# Métricas de conteo por paso del guion de servicio
+COLUMNAS_CONTEO_SERVICIO = [
+    "Conteo_saludo_inicial",
+    "Conteo_identificacion_cliente",
+    "Conteo_comprension_problema",
+    "Conteo_ofrecimiento_solucion",
+    "Conteo_manejo_inquietudes",
+    "Conteo_cierre_servicio",
+    "Conteo_proximo_paso"
+]
+
+# Pasos del guion de ventas (valores 0/1 por llamada)
+METRICAS_VENTAS = ['apertura', 'presentacion_beneficio', 'creacion_necesidad',
+                   'manejo_objeciones', 'cierre', 'confirmacion_bienvenida', 'consejos_cierre']
+
+# Métricas generales de ambos conjuntos
+METRICAS_GENERALES = ['Puntaje_Total_%', 'Confianza', 'Polarity', 'Subjectivity']
+
+# Columnas con índice por valor para los filtros de cada conjunto
+COLUMNAS_INDEXADAS_SERVICIO = ['Agente', 'Estado_Llamada', 'Cola']
+COLUMNAS_INDEXADAS_VENTAS = ['Agente', ESTADO_COL_VENTAS, 'Cola']
+
+# Texto transcrito de la llamada (lo agrega el pipeline de audio, tablero/transcripcion.py)
+COLUMNA_TRANSCRIPCION = 'Transcripcion'
+
+# Columnas de texto que entran en el índice de búsqueda (las que no existan en el
+# Excel se ignoran). La transcripción permite buscar frases dichas en la llamada;
+# solo existe en las llamadas con su audio ya procesado.
+COLUMNAS_TEXTO_SERVICIO = [COLUMNA_TRANSCRIPCION, 'Comentario', 'Evento', 'Nombre de Opción', 'Cola', 'Agente',
+                           'Telefono', 'Archivo_Analizado', 'Sentimiento']
+COLUMNAS_TEXTO_VENTAS = [COLUMNA_TRANSCRIPCION, 'Comentario', 'Agente', 'Agente#', ESTADO_COL_VENTAS,
+                         'clasificacion', 'archivo']
+
+# Métricas cuyo perfil diario por agente se vigila en busca de caídas atípicas
+METRICAS_ANOMALIA_SERVICIO = ['Puntaje_Total_%', 'Polarity'] + COLUMNAS_CONTEO_SERVICIO
+METRICAS_ANOMALIA_VENTAS = ['Puntaje_Total_%', 'Polarity'] + METRICAS_VENTAS
+
+
+# Columnas que no se muestran en el detalle por llamada (acordeones de la página 5
+# y reportes HTML): identificadores, métricas ya graficadas y datos de la central.
+COLUMNAS_OCULTAS_DETALLE_SERVICIO = [
+    "Identificador único",
+    "Telefono",
+    "Puntaje_Total_%",
+    "Polarity",
+    "Subjectivity",
+    "Confianza",
+    "Palabras",
+    "Oraciones",
+    "asesor_corto", # Se mantiene si existe, si no, no genera error
+    "fecha_convertida",
+    "NombreAudios",
+    "NombreAudios_Normalizado",
+    "Coincidencia_Excel",
+    "Archivo_Vacio",
+    "Estado_Llamada",
+    "Sentimiento",
+    "Direccion grabacion",
+    "Evento",
+    "Nombre de Opción",
+    "Codigo Entrante",
+    "Troncal",
+    "Grupo de Colas",
+    "Cola", # ¡Esta columna está en tu lista!
+    "Contacto",
+    "Identificacion",
+    "Tiempo de Espera",
+    "Tiempo de Llamada",
+    "Posicion de Entrada",
+    "Tiempo de Timbrado",
+    "Comentario",
+    "audio"
+]
+
+# Columnas que no se muestran en el detalle por llamada de ventas (acordeones de la
+# página 4): las mismas que en servicio, con los nombres del Excel de ventas.
+COLUMNAS_OCULTAS_DETALLE_VENTAS = [
+    "Palabra" if col == "Palabras" else ESTADO_COL_VENTAS if col == "Estado_Llamada" else col
+    for col in COLUMNAS_OCULTAS_DETALLE_SERVICIO
+]
+
+
+# Columnas que cada Excel debe traer para que filtros y métricas funcionen
+COLUMNAS_ESPERADAS_SERVICIO = ['Fecha', 'Agente', 'Cola', 'Estado_Llamada'] + METRICAS_GENERALES + COLUMNAS_CONTEO_SERVICIO
+COLUMNAS_ESPERADAS_VENTAS = ['Fecha', 'Agente', ESTADO_COL_VENTAS] + METRICAS_GENERALES + METRICAS_VENTAS
+
+# Identificador de cada llamada (una fila repetida con el mismo valor es un duplicado).
+# En servicio 'audio' se repite legítimamente entre llamadas; el archivo analizado no
+ID_SERVICIO = 'Archivo_Analizado'
+ID_VENTAS = 'archivo'
+
+# Columnas que el pipeline de audio calcula y que reemplazan a las del Excel en
+# las llamadas que tienen su audio procesado
+COLUMNAS_AUDIO_SERVICIO = METRICAS_GENERALES + COLUMNAS_CONTEO_SERVICIO + [
+    'Estado_Llamada', 'Sentimiento', 'Archivo_Vacio', 'Palabras', 'Oraciones', COLUMNA_TRANSCRIPCION
+]
+COLUMNAS_AUDIO_VENTAS = METRICAS_GENERALES + METRICAS_VENTAS + [
+    'clasificacion', 'Palabra', 'Oraciones', COLUMNA_TRANSCRIPCION
+]
+
+
+def version_conjunto(conjunto, ruta_archivo):
+    """Versión de los datos de un conjunto: la del Excel y, si existen, la de los puntajes del pipeline de audio.
+
+    Todos los artefactos del conjunto (y las claves de caché de las páginas) usan
+    esta versión, así que se reconstruyen tanto si llega un Excel nuevo como si
+    el pipeline publica audios nuevos.
+    """
+    version = almacen.version_origen(ruta_archivo)
+    audio = almacen.version_publicada(f"{conjunto}_audio")
+    return version if audio is None else f"{version}_{audio}"
+
+
+def _unir_audio(df, conjunto, columnas):
+    """Reemplaza en `df` las `columnas` de las llamadas cuyo audio ya procesó el pipeline.
+
+    Las filas del pipeline ('<conjunto>_audio' en el almacén) se cruzan con las
+    llamadas por nombre de audio o identificador (tablero/conciliacion.py); las
+    llamadas conservan su Agente y Fecha del Excel. Devuelve el resumen que se
+    guarda en los metadatos, o None si el pipeline no publicó nada.
+    """
+    # Importado aquí: conciliacion importa este módulo
+    from tablero import conciliacion
+
+    try:
+        procesados, _ = almacen.abrir(f"{conjunto}_audio")
+    except FileNotFoundError:
+        return None
+    _, reporte = conciliacion.conciliar(df, procesados, conjunto)
+    # Si varios audios apuntan a la misma llamada queda el último
+    pares = reporte["emparejados"].drop_duplicates(subset="fila_llamada", keep="last")
+    filas = pares["fila_llamada"].to_numpy()
+    for col in columnas:
+        if col not in pares.columns:
+            continue
+        valores = df[col].astype(object) if col in df.columns else pd.Series(None, index=df.index, dtype=object)
+        valores.iloc[filas] = pares[col].to_numpy(dtype=object, na_value=None)
+        df[col] = valores
+    return {
+        "version": almacen.version_publicada(f"{conjunto}_audio"),
+        "audios": len(procesados),
+        "llamadas_calificadas": len(filas),
+        "audios_sin_llamada": len(reporte["audios_sin_llamada"]),
+    }
+
+
+def _preparar(df, esperadas, numericas, columna_id):
+    """Tipado común de ambos Excel; devuelve el informe de calidad (tablero/calidad.py)."""
+    informe = calidad.nuevo_informe(df, esperadas)
+
+    # Fecha como datetime; las ilegibles quedan en NaT y fuera del filtro por fecha
+    if 'Fecha' in df.columns:
+        calidad.convertir_fechas(df, 'Fecha', 'fecha_convertida', informe)
+
+    # 'Agente' como texto para agrupaciones y filtros
+    if 'Agente' in df.columns:
+        df['Agente'] = df['Agente'].astype(str)
+
+    # Métricas a numérico: el puntaje puede venir como texto con '%' ("80.00%"); se
+    # quita el símbolo sin dividir por 100. Lo que no se pueda convertir queda en NaN
+    # y no afecta a los promedios.
+    for col in numericas:
+        if col in df.columns:
+            calidad.convertir_numerica(df, col, informe)
+
+    calidad.revisar_duplicados(df, columna_id, informe)
+    return informe
+
+
+# Preprocesar el Excel de servicio. Solo se ejecuta cuando el archivo (o la salida
+# del pipeline de audio) cambia: el resultado se publica en el almacén Arrow
+# compartido (tablero/almacen.py) y los demás procesos lo mapean en memoria sin
+# volver a leer el Excel.
+# El informe de calidad se guarda en los metadatos de la versión publicada.
+def preparar_datos_servicio(ruta_archivo):
+    df = pd.read_excel(ruta_archivo)
+    audio = _unir_audio(df, "servicio", COLUMNAS_AUDIO_SERVICIO)
+    informe = _preparar(df, COLUMNAS_ESPERADAS_SERVICIO,
+                        METRICAS_GENERALES + ['Palabras', 'Oraciones'], ID_SERVICIO)
+    return df, {"calidad": informe, "audio": audio}
+
+
+# Preprocesamiento del Excel de ventas (mismo esquema de publicación que servicio).
+def preparar_datos_ventas(ruta_archivo):
+    df = pd.read_excel(ruta_archivo)
+    audio = _unir_audio(df, "ventas", COLUMNAS_AUDIO_VENTAS)
+    informe = _preparar(df, COLUMNAS_ESPERADAS_VENTAS, METRICAS_GENERALES, ID_VENTAS)
+    return df, {"calidad": informe, "audio": audio}
+
+
+def cargar_servicio(ruta_archivo=ARCHIVO_SERVICIO):
+    """Datos de servicio ya preprocesados: `(df, metadatos)` desde el almacén compartido.
+
+    `metadatos["calidad"]` es el informe de calidad de esa versión y
+    `metadatos["audio"]` cuántas llamadas tomaron sus puntajes del pipeline de audio.
+    """
+    return almacen.obtener_artefacto("servicio", version_conjunto("servicio", ruta_archivo),
+                                     lambda: preparar_datos_servicio(ruta_archivo))
+
+
+def cargar_ventas(ruta_archivo=ARCHIVO_VENTAS):
+    """Datos de ventas ya preprocesados: `(df, metadatos)` desde el almacén compartido.
+
+    `metadatos["calidad"]` es el informe de calidad de esa versión y
+    `metadatos["audio"]` cuántas llamadas tomaron sus puntajes del pipeline de audio.
+    """
+    return almacen.obtener_artefacto("ventas", version_conjunto("ventas", ruta_archivo),
+                                     lambda: preparar_datos_ventas(ruta_archivo))
+
+
+# ===================================================
+# Artefactos derivados (cubo diario e índices de filtros)
+# ===================================================
+# Se publican en el almacén con la MISMA versión que los datos de origen
+# (`version_conjunto`), así que quedan invalidados automáticamente cuando llegan
+# datos nuevos. Normalmente los
+# construye el precálculo (python -m tablero.precalculo); si no existen, se
+# construyen aquí la primera vez que se piden.
+def _conjunto(nombre):
+    """Conjunto de un artefacto: los nombres son '<conjunto>_<artefacto>'."""
+    return nombre.split("_", 1)[0]
+
+
+def _artefacto(nombre, ruta_archivo, cargar, construir):
+    version = version_conjunto(_conjunto(nombre), ruta_archivo)
+    return almacen.obtener_artefacto(nombre, version, lambda: construir(cargar(ruta_archivo)[0]))
+
+
+def cubo_servicio(ruta_archivo=ARCHIVO_SERVICIO):
+    """Cubo diario por agente de los datos de servicio (ver tablero/cubos.py)."""
+    df, _ = _artefacto("servicio_cubo", ruta_archivo, cargar_servicio,
+                       lambda df: (cubos.cubo_diario(df, METRICAS_GENERALES + COLUMNAS_CONTEO_SERVICIO), {}))
+    return df
+
+
+def cubo_ventas(ruta_archivo=ARCHIVO_VENTAS):
+    """Cubo diario por agente de los datos de ventas (ver tablero/cubos.py)."""
+    df, _ = _artefacto("ventas_cubo", ruta_archivo, cargar_ventas,
+                       lambda df: (cubos.cubo_diario(df, METRICAS_GENERALES + METRICAS_VENTAS), {}))
+    return df
+
+
+def cubo_filtros_servicio(ruta_archivo=ARCHIVO_SERVICIO):
+    """Cubo diario por Agente, estado y Cola: métricas del periodo anterior con los filtros de la página 5."""
+    df, _ = _artefacto("servicio_cubo_filtros", ruta_archivo, cargar_servicio,
+                       lambda df: (cubos.cubo_diario(df, METRICAS_GENERALES, COLUMNAS_INDEXADAS_SERVICIO), {}))
+    return df
+
+
+def cubo_filtros_ventas(ruta_archivo=ARCHIVO_VENTAS):
+    """Cubo diario por Agente, estado y Cola: métricas del periodo anterior con los filtros de la página 4."""
+    df, _ = _artefacto("ventas_cubo_filtros", ruta_archivo, cargar_ventas,
+                       lambda df: (cubos.cubo_diario(df, METRICAS_GENERALES, COLUMNAS_INDEXADAS_VENTAS), {}))
+    return df
+
+
+def indices_servicio(ruta_archivo=ARCHIVO_SERVICIO):
+    """Índices por valor (Agente, estado, Cola) de los datos de servicio."""
+    codigos, metadatos = _artefacto("servicio_indices", ruta_archivo, cargar_servicio,
+                                    lambda df: filtros.indices_a_tabla(filtros.construir_indices(df, COLUMNAS_INDEXADAS_SERVICIO)))
+    return filtros.indices_desde_tabla(codigos, metadatos)
+
+
+def indices_ventas(ruta_archivo=ARCHIVO_VENTAS):
+    """Índices por valor (Agente, estado, Cola) de los datos de ventas."""
+    codigos, metadatos = _artefacto("ventas_indices", ruta_archivo, cargar_ventas,
+                                    lambda df: filtros.indices_a_tabla(filtros.construir_indices(df, COLUMNAS_INDEXADAS_VENTAS)))
+    return filtros.indices_desde_tabla(codigos, metadatos)
+
+
+def busqueda_servicio(ruta_archivo=ARCHIVO_SERVICIO):
+    """Índice de búsqueda por palabras de los textos de servicio (ver tablero/busqueda.py)."""
+    tabla, metadatos = _artefacto("servicio_busqueda", ruta_archivo, cargar_servicio,
+                                  lambda df: busqueda.construir(df, COLUMNAS_TEXTO_SERVICIO))
+    return busqueda.indice_desde_tabla(tabla, metadatos)
+
+
+def busqueda_ventas(ruta_archivo=ARCHIVO_VENTAS):
+    """Índice de búsqueda por palabras de los textos de ventas (ver tablero/busqueda.py)."""
+    tabla, metadatos = _artefacto("ventas_busqueda", ruta_archivo, cargar_ventas,
+                                  lambda df: busqueda.construir(df, COLUMNAS_TEXTO_VENTAS))
+    return busqueda.indice_desde_tabla(tabla, metadatos)
+
+
+def _incremental(nombre, ruta_archivo, cubo, actualizar):
+    """Artefacto derivado del cubo que se actualiza de forma incremental desde la versión anterior.
+
+    `actualizar(cubo, previo, huellas_previas)` devuelve `(df, metadatos)` con
+    las huellas nuevas en `metadatos["huellas"]` (ver tendencias.actualizar).
+    """
+    def construir():
+        previo, huellas_previas = None, None
+        if almacen.version_publicada(nombre) is not None:
+            try:
+                previo, metadatos = almacen.abrir(nombre)
+                huellas_previas = metadatos.get("huellas")
+            except FileNotFoundError:
+                # La versión anterior ya fue limpiada: se reconstruye completa
+                pass
+        return actualizar(cubo(ruta_archivo), previo, huellas_previas)
+
+    df, _ = almacen.obtener_artefacto(nombre, version_conjunto(_conjunto(nombre), ruta_archivo), construir)
+    return df
+
+
+def tendencias_servicio(ruta_archivo=ARCHIVO_SERVICIO):
+    """Series de tendencia por agente de los datos de servicio (ver tablero/tendencias.py)."""
+    return _incremental("servicio_tendencias", ruta_archivo, cubo_servicio, tendencias.actualizar)
+
+
+def tendencias_ventas(ruta_archivo=ARCHIVO_VENTAS):
+    """Series de tendencia por agente de los datos de ventas (ver tablero/tendencias.py)."""
+    return _incremental("ventas_tendencias", ruta_archivo, cubo_ventas, tendencias.actualizar)
+
+
+def ranking_servicio(ruta_archivo=ARCHIVO_SERVICIO):
+    """Acumulados por agente y día para el ranking de servicio (ver tablero/ranking.py)."""
+    return ranking.Ranking(_incremental("servicio_ranking", ruta_archivo, cubo_servicio, ranking.actualizar))
+
+
+def ranking_ventas(ruta_archivo=ARCHIVO_VENTAS):
+    """Acumulados por agente y día para el ranking de ventas (ver tablero/ranking.py)."""
+    return ranking.Ranking(_incremental("ventas_ranking", ruta_archivo, cubo_ventas, ranking.actualizar))
+
+
+def _anomalias(nombre, ruta_archivo, cubo, metricas, calcular):
+    """Días atípicos por agente; con `calcular=False` solo abre lo ya publicado.
+
+    Las páginas usan `calcular=False` para no pagar el modelo al dibujar: si la
+    precarga o el precálculo todavía no lo publicaron para la versión vigente del
+    Excel, se lanza FileNotFoundError (igual que `almacen.abrir`).
+    """
+    version = version_conjunto(_conjunto(nombre), ruta_archivo)
+    if not calcular and almacen.version_publicada(nombre) != version:
+        raise FileNotFoundError(f"Las anomalías de '{nombre}' aún no se calcularon para la versión {version}")
+    df, _ = almacen.obtener_artefacto(nombre, version, lambda: (anomalias.detectar(cubo(ruta_archivo), metricas), {}))
+    return df
+
+
+def anomalias_servicio(ruta_archivo=ARCHIVO_SERVICIO, calcular=True):
+    """Agentes-día de servicio con su puntaje de anomalía y marca de caída (ver tablero/anomalias.py)."""
+    return _anomalias("servicio_anomalias", ruta_archivo, cubo_servicio, METRICAS_ANOMALIA_SERVICIO, calcular)
+
+
+def anomalias_ventas(ruta_archivo=ARCHIVO_VENTAS, calcular=True):
+    """Agentes-día de ventas con su puntaje de anomalía y marca de caída (ver tablero/anomalias.py)."""
+    return _anomalias("ventas_anomalias", ruta_archivo, cubo_ventas, METRICAS_ANOMALIA_VENTAS, calcular)
+
+
+def indice_agentes(ruta_servicio=ARCHIVO_SERVICIO, ruta_ventas=ARCHIVO_VENTAS):
+    """Índice de agentes comunes a ventas y servicio (ver tablero/comparacion.py).
+
+    Su versión combina las de ambos conjuntos: cambia si cualquiera de los dos cambia.
+    """
+    version = f"{version_conjunto('servicio', ruta_servicio)}_{version_conjunto('ventas', ruta_ventas)}"
+    indice, _ = almacen.obtener_artefacto("agentes_indice", version, lambda: (comparacion.construir_indice_agentes({
+        "servicio": cubo_servicio(ruta_servicio)['Agente'],
+        "ventas": cubo_ventas(ruta_ventas)['Agente'],
+    }), {}))
+    return indice
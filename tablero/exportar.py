@@ -0,0 +1,149 @@
+# ===================================================
+# Exportación por bloques de las llamadas filtradas
+# ===================================================
+# La exportación lee el DataFrame base por bloques de posiciones (las que deja
+# pasar la máscara de filtros) y va escribiendo cada bloque al archivo de
+# salida. Nunca se arma un segundo DataFrame con todas las filas filtradas:
+# en memoria solo hay un bloque a la vez, más el archivo resultante.
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+# Filas por bloque. Suficientemente grande para que pandas/Arrow trabajen
+# vectorizado, y suficientemente chico para acotar la memoria por exportación.
+TAMANO_BLOQUE = 50_000
+
+# Columnas internas que no forman parte de los datos originales
+COLUMNAS_INTERNAS = ['fecha_convertida']
+
+FORMATOS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def bloques(posiciones, tamano_bloque=TAMANO_BLOQUE):
+    """Parte el arreglo de posiciones en trozos de `tamano_bloque`."""
+    for inicio in range(0, len(posiciones), tamano_bloque):
+        yield posiciones[inicio:inicio + tamano_bloque]
+
+
+def _posiciones_columnas(df, columnas):
+    """Posiciones de `columnas` en `df`, para seleccionar bloque y columnas en un solo `iloc`."""
+    columnas = list(df.columns) if columnas is None else list(columnas)
+    return columnas, df.columns.get_indexer(columnas)
+
+
+def csv_por_bloques(df, posiciones, columnas=None, tamano_bloque=TAMANO_BLOQUE):
+    """Genera el CSV de las filas `posiciones` de `df`, un bloque de bytes a la vez.
+
+    Se codifica en UTF-8 con BOM para que Excel muestre bien las tildes.
+    """
+    columnas, cols = _posiciones_columnas(df, columnas)
+    encabezado = pd.DataFrame(columns=columnas).to_csv(index=False)
+    yield encabezado.encode("utf-8-sig")
+    for trozo in bloques(posiciones, tamano_bloque):
+        yield df.iloc[trozo, cols].to_csv(index=False, header=False).encode("utf-8")
+
+
+def parquet_por_bloques(df, posiciones, destino, columnas=None, tamano_bloque=TAMANO_BLOQUE):
+    """Escribe en `destino` un Parquet con las filas `posiciones` de `df`.
+
+    Cada bloque se escribe como un grupo de filas (row group) independiente.
+    """
+    # pyarrow.parquet solo se importa si alguien exporta a Parquet
+    import pyarrow.parquet as pq
+
+    columnas, cols = _posiciones_columnas(df, columnas)
+    esquema = pa.Schema.from_pandas(df.iloc[:0, cols], preserve_index=False)
+    with pq.ParquetWriter(destino, esquema) as escritor:
+        for trozo in bloques(posiciones, tamano_bloque):
+            tabla = pa.Table.from_pandas(df.iloc[trozo, cols], schema=esquema, preserve_index=False)
+            escritor.write_table(tabla)
+
+
+def agregados_por_agente(df, posiciones, columnas_metricas, columna_agente='Agente', tamano_bloque=TAMANO_BLOQUE):
+    """Promedio de cada métrica y número de llamadas por agente.
+
+    Se acumulan sumas y conteos parciales por bloque y se combinan al final,
+    así que el resultado es el mismo que un `groupby().mean()` sobre todas las
+    filas filtradas sin tener que seleccionarlas de una vez.
+    """
+    columnas_metricas = [c for c in columnas_metricas if c in df.columns]
+    _, cols = _posiciones_columnas(df, [columna_agente] + columnas_metricas)
+    sumas = []
+    conteos = []
+    llamadas = []
+    for trozo in bloques(posiciones, tamano_bloque):
+        parte = df.iloc[trozo, cols]
+        grupos = parte.groupby(columna_agente, observed=True)
+        sumas.append(grupos[columnas_metricas].sum(min_count=1))
+        conteos.append(grupos[columnas_metricas].count())
+        llamadas.append(grupos.size())
+
+    if not llamadas:
+        return pd.DataFrame(columns=[columna_agente, 'llamadas'] + columnas_metricas)
+
+    suma_total = pd.concat(sumas).groupby(level=0).sum(min_count=1)
+    conteo_total = pd.concat(conteos).groupby(level=0).sum()
+    promedios = (suma_total / conteo_total.replace(0, np.nan)).round(4)
+    promedios.insert(0, 'llamadas', pd.concat(llamadas).groupby(level=0).sum())
+    return promedios.reset_index()
+
+
+def generar_archivo(df, posiciones, formato, columnas=None, tamano_bloque=TAMANO_BLOQUE):
+    """Genera el archivo de exportación (bytes) en el formato indicado ("CSV" o "Parquet")."""
+    salida = io.BytesIO()
+    if formato == "CSV":
+        for parte in csv_por_bloques(df, posiciones, columnas, tamano_bloque):
+            salida.write(parte)
+    else:
+        parquet_por_bloques(df, posiciones, salida, columnas, tamano_bloque)
+    return salida.getvalue()
+
+
+def mostrar_exportacion(df, mascara, columnas_metricas, nombre_base, clave):
+    """Sección de descarga para las páginas del tablero.
+
+    `df` es el DataFrame base y `mascara` la combinación de filtros actual. El
+    archivo solo se genera cuando el usuario lo pide, no en cada rerun.
+    """
+    st.markdown("### ⬇️ Exportar datos filtrados")
+    posiciones = np.flatnonzero(mascara) if mascara is not None else np.arange(len(df))
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        contenido = st.radio(
+            "Contenido", ["Llamadas filtradas", "Agregados por agente"],
+            horizontal=True, key=f"{clave}_contenido"
+        )
+    with col2:
+        formato = st.radio("Formato", list(FORMATOS), horizontal=True, key=f"{clave}_formato")
+    with col3:
+        preparar = st.button("Preparar archivo", key=f"{clave}_preparar")
+
+    if not preparar:
+        st.caption(f"{len(posiciones)} llamadas con los filtros actuales.")
+        return
+
+    with st.spinner("Generando archivo..."):
+        if contenido == "Llamadas filtradas":
+            columnas = [c for c in df.columns if c not in COLUMNAS_INTERNAS]
+            datos = generar_archivo(df, posiciones, formato, columnas)
+            sufijo = "llamadas"
+        else:
+            agregados = agregados_por_agente(df, posiciones, columnas_metricas)
+            datos = generar_archivo(agregados, np.arange(len(agregados)), formato)
+            sufijo = "agentes"
+
+    extension, tipo_mime = FORMATOS[formato]
+    st.download_button(
+        f"Descargar {extension.upper()}",
+        data=datos,
+        file_name=f"{nombre_base}_{sufijo}.{extension}",
+        mime=tipo_mime,
+        key=f"{clave}_descargar"
+    )
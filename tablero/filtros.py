@@ -0,0 +1,142 @@
+# ===================================================
+# Filtros por máscara sobre el conjunto de datos base
+# ===================================================
+# El DataFrame base se carga una sola vez y NUNCA se modifica. Cada filtro de la
+# barra lateral produce una máscara booleana (un arreglo numpy del largo del
+# DataFrame) y las máscaras se combinan con AND. Solo al final se seleccionan
+# las filas que cumplen, en una única operación, en lugar de copiar el
+# DataFrame completo después de cada filtro.
+import numpy as np
+import pandas as pd
+
+
+def _a_numpy(serie_booleana):
+    """Convierte una serie booleana a arreglo numpy. Los nulos (columnas Arrow) cuentan como False."""
+    return serie_booleana.to_numpy(dtype=bool, na_value=False)
+
+
+def mascara_completa(df):
+    """Máscara que deja pasar todas las filas de `df`."""
+    return np.ones(len(df), dtype=bool)
+
+
+def mascara_vacia(df):
+    """Máscara que no deja pasar ninguna fila de `df`."""
+    return np.zeros(len(df), dtype=bool)
+
+
+def mascara_rango_fechas(fechas, fecha_inicio=None, fecha_fin=None):
+    """Filas cuya fecha está entre `fecha_inicio` y `fecha_fin` (ambas inclusive, por día).
+
+    `fechas` debe ser una serie datetime64. Se compara contra los límites como
+    Timestamp para evitar construir `.dt.date` (objetos Python) en cada rerun.
+    Las fechas nulas (NaT) nunca pasan el filtro.
+    """
+    mascara = fechas.notna().to_numpy()
+    if fecha_inicio is not None:
+        mascara &= _a_numpy(fechas >= pd.Timestamp(fecha_inicio))
+    if fecha_fin is not None:
+        # Fin inclusivo: todo lo anterior al inicio del día siguiente
+        mascara &= _a_numpy(fechas < pd.Timestamp(fecha_fin) + pd.Timedelta(days=1))
+    return mascara
+
+
+def mascara_valores(serie, valores):
+    """Filas cuyo valor en `serie` está dentro de `valores`."""
+    return _a_numpy(serie.isin(list(valores)))
+
+
+def combinar_mascaras(*mascaras):
+    """Combina con AND las máscaras recibidas. Las que sean `None` se ignoran."""
+    resultado = None
+    for mascara in mascaras:
+        if mascara is None:
+            continue
+        resultado = mascara.copy() if resultado is None else resultado & mascara
+    return resultado
+
+
+def posiciones(mascara):
+    """Posiciones (enteros) de las filas que cumplen la máscara."""
+    return np.flatnonzero(mascara)
+
+
+def seleccionar(df, mascara):
+    """Devuelve las filas de `df` que cumplen la máscara.
+
+    Es la única selección de filas por rerun: el DataFrame base queda intacto y
+    las funciones de visualización solo leen del resultado.
+    """
+    if mascara is None:
+        return df
+    return df.iloc[posiciones(mascara)]
+
+
+# ===================================================
+# Índices por valor para los filtros de selección múltiple
+# ===================================================
+class IndiceValores:
+    """Índice precalculado de una columna categórica (Agente, estado, Cola...).
+
+    Cada fila se guarda como un código entero (posición de su valor en la lista
+    ordenada de valores distintos; -1 si es nulo). Con eso, cualquier
+    combinación de valores seleccionados se resuelve con una tabla booleana de
+    tamaño "número de valores" indexada por los códigos, sin comparar cadenas
+    fila por fila como hace `isin`.
+    """
+
+    def __init__(self, serie=None, codigos=None, valores=None):
+        if serie is not None:
+            codigos, valores = pd.factorize(serie, sort=True)
+        self.codigos = np.asarray(codigos)
+        self.valores = list(valores)
+        self._posicion = {valor: i for i, valor in enumerate(self.valores)}
+
+    def tabla(self, seleccion):
+        """Tabla booleana por valor. La última casilla corresponde a los nulos (código -1)."""
+        tabla = np.zeros(len(self.valores) + 1, dtype=bool)
+        for valor in seleccion:
+            i = self._posicion.get(valor)
+            if i is not None:
+                tabla[i] = True
+        return tabla
+
+    def mascara(self, seleccion):
+        """Filas cuyo valor está en `seleccion`."""
+        return self.tabla(seleccion)[self.codigos]
+
+    def mascara_valor(self, valor):
+        """Filas con exactamente `valor` (equivale a `serie == valor`)."""
+        i = self._posicion.get(valor)
+        if i is None:
+            return np.zeros(len(self.codigos), dtype=bool)
+        return self.codigos == i
+
+    def conteos(self, mascara=None):
+        """Número de filas por valor, opcionalmente solo las que cumplen `mascara`."""
+        codigos = self.codigos if mascara is None else self.codigos[mascara]
+        return np.bincount(codigos[codigos >= 0], minlength=len(self.valores))
+
+    def valores_presentes(self, mascara=None):
+        """Valores (ordenados) que aparecen en al menos una fila de `mascara`."""
+        return [self.valores[i] for i in np.flatnonzero(self.conteos(mascara))]
+
+
+def construir_indices(df, columnas):
+    """Construye un `IndiceValores` por cada columna de `columnas` presente en `df`."""
+    return {col: IndiceValores(df[col]) for col in columnas if col in df.columns}
+
+
+def indices_a_tabla(indices):
+    """Convierte los índices a `(DataFrame de códigos, metadatos)` para publicarlos en el almacén."""
+    codigos = pd.DataFrame({col: indice.codigos.astype('int32') for col, indice in indices.items()})
+    valores = {col: [str(v) for v in indice.valores] for col, indice in indices.items()}
+    return codigos, {"valores": valores}
+
+
+def indices_desde_tabla(codigos, metadatos):
+    """Reconstruye los índices publicados por `indices_a_tabla` sin volver a factorizar."""
+    return {
+        col: IndiceValores(codigos=codigos[col].to_numpy(dtype='int32'), valores=valores)
+        for col, valores in metadatos["valores"].items()
+    }
@@ -0,0 +1,275 @@
+# ===================================================
+# Construcción de figuras del tablero
+# ===================================================
+# Cada función recibe datos YA agregados y devuelve la figura de Plotly, sin
+# llamar a Streamlit. Así la misma figura se usa en las páginas 4 a 6 (que
+# deciden dónde y cómo mostrarla) y en los reportes HTML por lotes
+# (tablero/reportes.py).
+#
+# Plotly se importa dentro de cada función: importar este módulo es inmediato y
+# el costo de plotly.express (~0.3 s en frío) se paga recién al construir la
+# primera figura, no al abrir una página o al cargar los datos.
+
+
+def figura_puntaje_por_agente(df_agrupado_por_agente):
+    """Barras del promedio de 'Puntaje_Total_%' por agente (columnas 'Agente' y 'Puntaje_Total_%')."""
+    import plotly.express as px
+
+    fig = px.bar(
+        df_agrupado_por_agente.sort_values("Puntaje_Total_%", ascending=False),
+        x="Agente",
+        y="Puntaje_Total_%",
+        text="Puntaje_Total_%",
+        color="Puntaje_Total_%",
+        color_continuous_scale="Greens",
+        title="Promedio Total por Agente",
+        labels={"Puntaje_Total_%": "Promedio de Puntaje (%)", "Agente": "Agente"}
+    )
+
+    fig.update_traces(texttemplate='%{y:.2f}%', textposition='outside')
+    fig.update_layout(
+        height=600,
+        xaxis_tickangle=-45,
+        plot_bgcolor="white",
+        font=dict(family="Arial", size=14),
+        title_x=0.5,
+        margin=dict(l=40, r=40, t=80, b=40)
+    )
+    return fig
+
+
+def figura_polaridad_por_agente(df_agrupado_por_agente):
+    """Barras del promedio de 'Polarity' por agente (columnas 'Agente' y 'Polarity')."""
+    import plotly.express as px
+
+    fig = px.bar(
+        df_agrupado_por_agente.sort_values("Polarity", ascending=False),
+        x="Agente",
+        y="Polarity",
+        text="Polarity",
+        color="Polarity",
+        color_continuous_scale="Greens",
+        title="Polaridad Promedio por Agente",
+        labels={"Polarity": "Promedio de Polaridad", "Agente": "Agente"}
+    )
+
+    fig.update_traces(texttemplate='%{y:.2f}', textposition='outside')
+    fig.update_layout(
+        height=600,
+        width=max(800, 50 * len(df_agrupado_por_agente)),
+        xaxis_tickangle=-45,
+        plot_bgcolor="white",
+        font=dict(family="Arial", size=14),
+        title_x=0.5,
+        margin=dict(b=150)
+    )
+    return fig
+
+
+def figura_heatmap_conteos(df_heatmap):
+    """Heatmap Agente vs. métricas de conteo. `df_heatmap` tiene a 'Agente' como índice."""
+    import plotly.express as px
+
+    fig2 = px.imshow(
+        df_heatmap,
+        labels=dict(x="Métrica", y="Agente", color="Valor promedio"),
+        color_continuous_scale='Greens',
+        aspect="auto",
+        title="Heatmap: Agente vs. Métricas de Conteo (Promedio)"
+    )
+
+    fig2.update_layout(
+        font=dict(family="Arial", size=12),
+        height=700,
+        title_x=0.5,
+        plot_bgcolor='white'
+    )
+    return fig2
+
+
+def figura_gauge_polaridad(polaridad_total):
+    """Indicador tipo gauge de la polaridad promedio (rango -1 a 1)."""
+    import plotly.graph_objects as go
+
+    fig_gauge = go.Figure(go.Indicator(
+        mode="gauge+number+delta",
+        value=polaridad_total,
+        delta={'reference': 0},
+        gauge={
+            'axis': {'range': [-1, 1]},
+            'bar': {'color': 'green'},
+            'steps': [
+                {'range': [-1, -0.3], 'color': '#c7e9c0'},
+                {'range': [-0.3, 0.3], 'color': '#a1d99b'},
+                {'range': [0.3, 1], 'color': '#31a354'}
+            ],
+            'threshold': {
+                'line': {'color': "black", 'width': 2},
+                'thickness': 0.75,
+                'value': polaridad_total
+            }
+        },
+        title={'text': "Polaridad Promedio General"}
+    ))
+
+    fig_gauge.update_layout(
+        font=dict(family="Arial", size=16),
+        width=400,
+        height=300
+    )
+    return fig_gauge
+
+
+def figura_gauge_subjetividad(subjectividad_total):
+    """Indicador tipo gauge de la subjetividad promedio (rango 0 a 1)."""
+    import plotly.graph_objects as go
+
+    fig_gauge2 = go.Figure(go.Indicator(
+        mode="gauge+number+delta",
+        value=subjectividad_total,
+        delta={'reference': 0.5},
+        gauge={
+            'axis': {'range': [0, 1]},
+            'bar': {'color': 'green'},
+            'steps': [
+                {'range': [0.0, 0.3], 'color': '#e5f5e0'},
+                {'range': [0.3, 0.7], 'color': '#a1d99b'},
+                {'range': [0.7, 1.0], 'color': '#31a354'}
+            ],
+            'threshold': {
+                'line': {'color': "black", 'width': 2},
+                'thickness': 0.75,
+                'value': subjectividad_total
+            }
+        },
+        title={'text': "Subjectividad Promedio General"}
+    ))
+
+    fig_gauge2.update_layout(
+        font=dict(family="Arial", size=16),
+        width=400,
+        height=300
+    )
+    return fig_gauge2
+
+
+def figura_burbujas(df_agrupado_por_agente):
+    """Burbujas de polaridad vs. confianza promedio por agente.
+
+    Columnas esperadas: 'Agente', 'promedio_polaridad', 'promedio_confianza', 'numero_llamadas'.
+    """
+    import plotly.express as px
+
+    fig = px.scatter(
+        df_agrupado_por_agente,
+        x="promedio_polaridad",
+        y="promedio_confianza",
+        size="numero_llamadas", # El tamaño de la burbuja representa el número de llamadas
+        hover_name="Agente",
+        hover_data={
+            "promedio_polaridad": ":.2f",
+            "promedio_confianza": ":.2f",
+            "numero_llamadas": True
+        },
+        title="Polaridad Promedio vs. Confianza Promedio por Agente",
+        labels={
+            "promedio_polaridad": "Polaridad Promedio",
+            "promedio_confianza": "Confianza Promedio (%)",
+            "numero_llamadas": "Número de Llamadas"
+        }
+    )
+
+    # Color verde sólido y uniforme para TODAS las burbujas
+    fig.update_traces(marker=dict(color='green', line=dict(width=1, color='DarkSlateGrey')))
+
+    fig.update_layout(
+        xaxis_title="Polaridad Promedio",
+        yaxis_title="Confianza Promedio (%)",
+        height=600,
+        plot_bgcolor="white",
+        font=dict(family="Arial", size=14),
+        title_x=0.5
+    )
+    return fig
+
+
+def figura_tendencia(serie, metricas):
+    """Líneas por métrica: media de cada periodo (puntos) y media móvil (línea).
+
+    `serie` es el resultado de `tablero.tendencias.serie`; cada métrica va en su
+    propia fila con eje Y independiente porque sus escalas son distintas.
+    """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    metricas = [m for m in metricas if m in serie.columns]
+    fig = make_subplots(rows=len(metricas), cols=1, shared_xaxes=True,
+                        subplot_titles=metricas, vertical_spacing=0.08)
+    for fila, metrica in enumerate(metricas, start=1):
+        fig.add_trace(go.Scatter(
+            x=serie.index, y=serie[metrica], mode="markers", name=f"{metrica} (periodo)",
+            marker=dict(color="#a1d99b", size=6), showlegend=(fila == 1), legendgroup="periodo"
+        ), row=fila, col=1)
+        fig.add_trace(go.Scatter(
+            x=serie.index, y=serie[f"{metrica} (media móvil)"], mode="lines", name=f"{metrica} (media móvil)",
+            line=dict(color="#31a354", width=3), showlegend=(fila == 1), legendgroup="movil"
+        ), row=fila, col=1)
+
+    fig.update_layout(
+        height=250 * len(metricas) + 100,
+        plot_bgcolor="white",
+        font=dict(family="Arial", size=14),
+        margin=dict(l=40, r=40, t=60, b=40)
+    )
+    return fig
+
+
+def figura_comparacion_puntaje(tabla):
+    """Barras agrupadas del puntaje promedio de cada agente en servicio y en ventas.
+
+    `tabla` es el resultado de `tablero.comparacion.comparar`.
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for conjunto, color in (("servicio", "#31a354"), ("ventas", "#a1d99b")):
+        columna = f"Puntaje_Total_% ({conjunto})"
+        fig.add_trace(go.Bar(
+            x=tabla["Agente"], y=tabla[columna], name=conjunto.capitalize(), marker_color=color,
+            text=tabla[columna], texttemplate='%{y:.2f}%', textposition='outside'
+        ))
+
+    fig.update_layout(
+        barmode="group",
+        title="Puntaje promedio: servicio vs. ventas",
+        yaxis_title="Promedio de Puntaje (%)",
+        height=600,
+        xaxis_tickangle=-45,
+        plot_bgcolor="white",
+        font=dict(family="Arial", size=14),
+        title_x=0.5,
+        margin=dict(l=40, r=40, t=80, b=40)
+    )
+    return fig
+
+
+def figura_heatmap_pasos(df_heatmap, titulo, etiqueta_color):
+    """Heatmap Agente vs. pasos del guion. `df_heatmap` tiene a 'Agente' como índice."""
+    import plotly.express as px
+
+    fig = px.imshow(
+        df_heatmap,
+        labels=dict(x="Paso", y="Agente", color=etiqueta_color),
+        color_continuous_scale='Greens',
+        aspect="auto",
+        text_auto=".1f",
+        title=titulo
+    )
+
+    fig.update_layout(
+        font=dict(family="Arial", size=12),
+        height=max(400, 60 * len(df_heatmap) + 200),
+        title_x=0.5,
+        plot_bgcolor='white'
+    )
+    return fig
@@ -0,0 +1,368 @@
+# ===================================================
+# Monitor de sesiones y cachés con presupuesto de memoria
+# ===================================================
+# Las páginas cachean sus datos con `cache_recurso` / `cache_datos` en lugar de
+# st.cache_resource / st.cache_data directamente. Son los mismos decoradores de
+# Streamlit, pero además llevan la cuenta, por caché, de:
+#   - aciertos y fallos (el cuerpo de la función solo corre en un fallo),
+#   - tamaño estimado de cada entrada (se mide una vez, al crearla),
+#   - último uso de cada entrada y desalojos.
+# Con eso se aplica un presupuesto GLOBAL de memoria para todas las cachés del
+# proceso: cuando una entrada nueva lo supera, se desalojan las entradas usadas
+# hace más tiempo (LRU) de cualquier caché hasta volver a entrar en él, antes de
+# que el sistema mate el proceso por falta de memoria.
+#
+# Cada página llama a `registrar_sesion()`: así se sabe qué sesiones están
+# activas y cuánto ocupa su st.session_state. Las métricas se ven en la página
+# "Monitor de recursos" y se vuelcan como JSON en data/almacen/monitor.json.
+#
+# Presupuesto: variable de entorno TABLERO_MEMORIA_CACHES_MB (por defecto 1024).
+#
+# Vaciar las cachés afecta a TODAS las sesiones del proceso, así que la página
+# solo ofrece el botón a quien ingrese el token de la variable de entorno
+# TABLERO_ADMIN_TOKEN; sin esa variable el monitor es de solo lectura.
+#
+# Uso (desde la raíz del proyecto, con el tablero corriendo):
+#   python -m tablero.monitor            # último volcado, en texto
+#   python -m tablero.monitor --json     # último volcado, tal cual
+import argparse
+import functools
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+
+import streamlit as st
+
+PRESUPUESTO_BYTES = int(float(os.environ.get("TABLERO_MEMORIA_CACHES_MB", "1024")) * 1024 ** 2)
+ARCHIVO_VOLCADO = "monitor.json"
+# Token para las acciones que afectan a todo el proceso (None: nadie las ve)
+TOKEN_ADMIN = os.environ.get("TABLERO_ADMIN_TOKEN") or None
+# Segundos mínimos entre volcados a disco
+INTERVALO_VOLCADO = 30
+
+
+# ---------------------------------------------------
+# Tamaño estimado de un objeto
+# ---------------------------------------------------
+def tamano(valor, _vistos=None):
+    """Bytes aproximados de `valor`, recorriendo contenedores y atributos.
+
+    Los DataFrame mapeados desde el almacén cuentan por el tamaño de sus
+    buffers aunque el sistema operativo los comparta entre procesos.
+    """
+    vistos = set() if _vistos is None else _vistos
+    if id(valor) in vistos:
+        return 0
+    vistos.add(id(valor))
+    # pandas y numpy solo se consultan si ya están importados (la portada no los carga)
+    pd, np = sys.modules.get("pandas"), sys.modules.get("numpy")
+    if pd is not None and isinstance(valor, (pd.DataFrame, pd.Series, pd.Index)):
+        uso = valor.memory_usage(deep=True)
+        return int(uso.sum() if isinstance(valor, pd.DataFrame) else uso)
+    if np is not None and isinstance(valor, np.ndarray):
+        return int(valor.nbytes)
+    if isinstance(valor, (str, bytes, bytearray, int, float, bool)) or valor is None:
+        return sys.getsizeof(valor)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamano(k, vistos) + tamano(v, vistos) for k, v in valor.items())
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        return sys.getsizeof(valor) + sum(tamano(v, vistos) for v in valor)
+    if hasattr(valor, "__dict__"):
+        return sys.getsizeof(valor) + tamano(vars(valor), vistos)
+    return sys.getsizeof(valor)
+
+
+def memoria_proceso():
+    """Memoria residente actual del proceso en bytes (pico si no se puede leer la actual).
+
+    None si no se puede medir (Windows, donde no hay /proc ni `resource`).
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as estado:
+            for linea in estado:
+                if linea.startswith("VmRSS:"):
+                    return int(linea.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KiB y macOS en bytes
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+# ---------------------------------------------------
+# Registro de cachés
+# ---------------------------------------------------
+class RegistroCache:
+    """Contadores y entradas vivas de una función cacheada."""
+
+    def __init__(self, nombre, categoria, max_entradas):
+        self.nombre = nombre
+        self.categoria = categoria
+        self.max_entradas = max_entradas
+        self.llamadas = 0
+        self.fallos = 0
+        self.desalojos = 0
+        # clave -> {"args", "kwargs", "bytes", "ultimo_uso"}
+        self.entradas = {}
+        # Última versión decorada (las páginas se vuelven a ejecutar en cada rerun)
+        self.cacheada = None
+
+    @property
+    def bytes(self):
+        return sum(e["bytes"] for e in self.entradas.values())
+
+    def resumen(self):
+        aciertos = self.llamadas - self.fallos
+        return {
+            "cache": self.nombre,
+            "categoria": self.categoria,
+            "entradas": len(self.entradas),
+            "bytes": self.bytes,
+            "llamadas": self.llamadas,
+            "aciertos": aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": round(aciertos / self.llamadas, 4) if self.llamadas else None,
+            "desalojos": self.desalojos,
+        }
+
+
+class Monitor:
+    """Estado del proceso: cachés registradas y sesiones vistas."""
+
+    def __init__(self, presupuesto):
+        self.presupuesto = presupuesto
+        self.desalojos_presupuesto = 0
+        self._candado = threading.RLock()
+        self._caches = {}
+        self._sesiones = {}
+        self._ultimo_volcado = 0.0
+        self.inicio = time.time()
+
+    # --- cachés ---
+    def registro(self, nombre, categoria, max_entradas):
+        with self._candado:
+            if nombre not in self._caches:
+                self._caches[nombre] = RegistroCache(nombre, categoria, max_entradas)
+            return self._caches[nombre]
+
+    def usar(self, registro, clave):
+        with self._candado:
+            registro.llamadas += 1
+            if clave in registro.entradas:
+                registro.entradas[clave]["ultimo_uso"] = time.monotonic()
+
+    def agregar(self, registro, clave, args, kwargs, valor):
+        """Anota una entrada nueva (un fallo) y hace espacio si hace falta."""
+        entrada = {"args": args, "kwargs": kwargs, "bytes": tamano(valor), "ultimo_uso": time.monotonic()}
+        with self._candado:
+            registro.fallos += 1
+            registro.entradas[clave] = entrada
+            # Streamlit ya descartó las que exceden max_entries: se dejan de contar
+            while registro.max_entradas and len(registro.entradas) > registro.max_entradas:
+                mas_vieja = min(registro.entradas, key=lambda c: registro.entradas[c]["ultimo_uso"])
+                del registro.entradas[mas_vieja]
+                registro.desalojos += 1
+            desalojadas = self._elegir_desalojos(excepto=(registro.nombre, clave))
+        # Fuera del candado: limpiar una caché de Streamlit toma sus propios candados
+        for otro, desalojada in desalojadas:
+            if otro.cacheada is not None:
+                otro.cacheada.clear(*desalojada["args"], **desalojada["kwargs"])
+
+    def _elegir_desalojos(self, excepto):
+        """Saca del registro las entradas LRU de cualquier caché hasta entrar en el presupuesto."""
+        desalojadas = []
+        while self.bytes_caches() > self.presupuesto:
+            candidatas = [(e["ultimo_uso"], registro, clave)
+                          for registro in self._caches.values()
+                          for clave, e in registro.entradas.items()
+                          if (registro.nombre, clave) != excepto]
+            if not candidatas:
+                break
+            _, registro, clave = min(candidatas, key=lambda c: c[0])
+            desalojadas.append((registro, registro.entradas.pop(clave)))
+            registro.desalojos += 1
+            self.desalojos_presupuesto += 1
+        return desalojadas
+
+    def olvidar(self, registro, clave=None):
+        """Deja de contar una entrada (o todas) tras limpiarla a mano con `.clear()`."""
+        with self._candado:
+            if clave is None:
+                registro.entradas.clear()
+            else:
+                registro.entradas.pop(clave, None)
+
+    def bytes_caches(self):
+        with self._candado:
+            return sum(registro.bytes for registro in self._caches.values())
+
+    def vaciar(self):
+        """Vacía todas las cachés registradas."""
+        with self._candado:
+            registros = list(self._caches.values())
+            for registro in registros:
+                registro.desalojos += len(registro.entradas)
+                registro.entradas.clear()
+        # Fuera del candado, igual que en `agregar`
+        for registro in registros:
+            if registro.cacheada is not None:
+                registro.cacheada.clear()
+
+    # --- sesiones ---
+    def anotar_sesion(self, id_sesion, pagina, bytes_estado):
+        with self._candado:
+            sesion = self._sesiones.setdefault(id_sesion, {"inicio": time.time()})
+            sesion.update(pagina=pagina, bytes_estado=bytes_estado, ultima_actividad=time.time())
+
+    def sesiones_activas(self):
+        """Sesiones vistas que Streamlit todavía tiene abiertas (las demás se olvidan)."""
+        from streamlit.runtime import Runtime
+
+        with self._candado:
+            if Runtime.exists():
+                runtime = Runtime.instance()
+                for id_sesion in [s for s in self._sesiones if not runtime.is_active_session(s)]:
+                    del self._sesiones[id_sesion]
+            return {id_sesion: dict(datos) for id_sesion, datos in self._sesiones.items()}
+
+    # --- métricas ---
+    def metricas(self):
+        """Volcado estructurado de sesiones, cachés y memoria."""
+        sesiones = self.sesiones_activas()
+        with self._candado:
+            caches = [registro.resumen() for registro in self._caches.values()]
+        return {
+            "generado": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "pid": os.getpid(),
+            "segundos_activo": round(time.time() - self.inicio),
+            "memoria_proceso_bytes": memoria_proceso(),
+            "presupuesto_caches_bytes": self.presupuesto,
+            "bytes_caches": sum(c["bytes"] for c in caches),
+            "desalojos_por_presupuesto": self.desalojos_presupuesto,
+            "sesiones_activas": len(sesiones),
+            "sesiones": [{"sesion": id_sesion[:8], **datos} for id_sesion, datos in sesiones.items()],
+            "caches": caches,
+        }
+
+    def volcar(self, forzar=False):
+        """Escribe las métricas en el almacén (como mucho cada INTERVALO_VOLCADO segundos)."""
+        ahora = time.monotonic()
+        if not forzar and ahora - self._ultimo_volcado < INTERVALO_VOLCADO:
+            return
+        self._ultimo_volcado = ahora
+        from tablero import almacen
+
+        almacen.escribir_json(ARCHIVO_VOLCADO, self.metricas())
+
+
+MONITOR = Monitor(PRESUPUESTO_BYTES)
+
+
+# ---------------------------------------------------
+# Decoradores de caché
+# ---------------------------------------------------
+def _clave(args, kwargs):
+    return repr(args) + repr(sorted(kwargs.items()))
+
+
+def _envolver(decorador_streamlit, categoria, opciones):
+    def decorar(funcion):
+        registro = MONITOR.registro(funcion.__qualname__, categoria, opciones.get("max_entries"))
+
+        @functools.wraps(funcion)
+        def construir(*args, **kwargs):
+            valor = funcion(*args, **kwargs)
+            MONITOR.agregar(registro, _clave(args, kwargs), args, kwargs, valor)
+            return valor
+
+        cacheada = decorador_streamlit(**opciones)(construir)
+        registro.cacheada = cacheada
+
+        @functools.wraps(funcion)
+        def llamar(*args, **kwargs):
+            MONITOR.usar(registro, _clave(args, kwargs))
+            return cacheada(*args, **kwargs)
+
+        def limpiar(*args, **kwargs):
+            cacheada.clear(*args, **kwargs)
+            MONITOR.olvidar(registro, _clave(args, kwargs) if args or kwargs else None)
+
+        llamar.clear = limpiar
+        return llamar
+
+    return decorar
+
+
+def cache_recurso(categoria, **opciones):
+    """`st.cache_resource(**opciones)` con métricas y presupuesto de memoria.
+
+    `categoria` agrupa las cachés en el monitor ('datos', 'agregados', ...).
+    """
+    return _envolver(st.cache_resource, categoria, opciones)
+
+
+def cache_datos(categoria, **opciones):
+    """`st.cache_data(**opciones)` con métricas y presupuesto de memoria."""
+    return _envolver(st.cache_data, categoria, opciones)
+
+
+# ---------------------------------------------------
+# Sesiones
+# ---------------------------------------------------
+def registrar_sesion(pagina):
+    """Anota la sesión actual (página y tamaño de su session_state) y vuelca métricas si toca."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    contexto = get_script_run_ctx()
+    if contexto is None:
+        return
+    bytes_estado = sum(tamano(st.session_state[clave]) for clave in list(st.session_state.keys()))
+    MONITOR.anotar_sesion(contexto.session_id, pagina, bytes_estado)
+    try:
+        MONITOR.volcar()
+    except OSError:
+        # Sin permiso de escritura en data/almacen: las métricas siguen en la página del monitor
+        pass
+
+
+def es_admin(token):
+    """True si `token` coincide con TABLERO_ADMIN_TOKEN (siempre False si no está definido)."""
+    return TOKEN_ADMIN is not None and bool(token) and hmac.compare_digest(str(token), TOKEN_ADMIN)
+
+
+def _megas(valor):
+    return "N/D" if valor is None else f"{valor / 1024 ** 2:,.1f} MB"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Muestra el último volcado de métricas de sesiones y cachés.")
+    parser.add_argument("--json", action="store_true", help="Imprimir el volcado tal cual")
+    args = parser.parse_args(argv)
+
+    from tablero import almacen
+
+    volcado = almacen.leer_json(ARCHIVO_VOLCADO)
+    if volcado is None:
+        print("No hay volcado todavía: se escribe mientras el tablero recibe visitas.")
+        return
+    if args.json:
+        print(json.dumps(volcado, ensure_ascii=False, indent=2))
+        return
+    print(f"🖥️ {volcado['generado']} · pid {volcado['pid']} · memoria {_megas(volcado['memoria_proceso_bytes'])} · "
+          f"cachés {_megas(volcado['bytes_caches'])} de {_megas(volcado['presupuesto_caches_bytes'])} · "
+          f"{volcado['sesiones_activas']} sesiones activas")
+    for cache in volcado["caches"]:
+        tasa = "-" if cache["tasa_aciertos"] is None else f"{cache['tasa_aciertos']:.0%}"
+        print(f"   {cache['categoria']:<10} {cache['cache']:<32} {cache['entradas']:>3} entradas "
+              f"{_megas(cache['bytes']):>10}  aciertos {tasa:>4}  desalojos {cache['desalojos']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# ===================================================
+# Perfil de arranque de las páginas
+# ===================================================
+# Mide, para cada página, cuánto tarda un proceso en frío en importar lo que la
+# página necesita y en dibujarla por primera vez, y cuánto tarda un rerun ya
+# caliente. Cada página corre en un proceso Python nuevo (como un servidor recién
+# iniciado) con `-X importtime`, usando el ejecutor de pruebas de Streamlit para
+# correr el script sin navegador.
+#
+# Streamlit se importa ANTES de empezar a medir, porque el servidor ya lo tiene
+# cargado; lo que se reporta es lo que la página agrega.
+#
+# Uso (desde la raíz del proyecto):
+#   python -m tablero.perfil_arranque                       # app.py y todas las páginas
+#   python -m tablero.perfil_arranque pages/4_cl_tiene_ventas.py --top 10
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+CARPETA_PROYECTO = Path(__file__).resolve().parent.parent
+
+# Separa en stderr las importaciones del arranque de las de la página
+_MARCA = "--- inicio de la página ---"
+
+_EJECUTOR = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+sys.stderr.write({marca!r} + "\\n")
+sys.stderr.flush()
+inicio = time.perf_counter()
+prueba = AppTest.from_file({pagina!r}, default_timeout={limite}).run()
+primer_dibujo = time.perf_counter() - inicio
+inicio = time.perf_counter()
+prueba.run()
+rerun = time.perf_counter() - inicio
+print(json.dumps({{"primer_dibujo": primer_dibujo, "rerun": rerun,
+                  "errores": [str(e.value) for e in prueba.exception]}}))
+"""
+
+
+def paginas_del_proyecto():
+    """app.py más los scripts de pages/, en el orden del menú."""
+    return [CARPETA_PROYECTO / "app.py"] + sorted((CARPETA_PROYECTO / "pages").glob("*.py"))
+
+
+def importaciones(stderr):
+    """Tiempos de `-X importtime` después de la marca: {paquete raíz: segundos acumulados}."""
+    lineas = stderr.splitlines()
+    if _MARCA in lineas:
+        lineas = lineas[lineas.index(_MARCA) + 1:]
+    por_paquete = {}
+    for linea in lineas:
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        # Solo las importaciones de primer nivel; las anidadas ya están en su acumulado
+        if nombre.startswith("  "):
+            continue
+        raiz = nombre.strip().split(".")[0]
+        por_paquete[raiz] = por_paquete.get(raiz, 0.0) + int(acumulado) / 1e6
+    return por_paquete
+
+
+def perfilar(pagina, limite=300):
+    """Corre `pagina` en un proceso nuevo y devuelve sus tiempos de arranque."""
+    codigo = _EJECUTOR.format(marca=_MARCA, pagina=str(Path(pagina).resolve()), limite=limite)
+    resultado = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], cwd=CARPETA_PROYECTO,
+                               capture_output=True, text=True)
+    if resultado.returncode != 0 or not resultado.stdout.strip():
+        raise RuntimeError(f"No se pudo perfilar {pagina}:\n{resultado.stderr[-2000:]}")
+    tiempos = json.loads(resultado.stdout.strip().splitlines()[-1])
+    por_paquete = importaciones(resultado.stderr)
+    tiempos["importaciones"] = sum(por_paquete.values())
+    tiempos["paquetes"] = sorted(por_paquete.items(), key=lambda par: par[1], reverse=True)
+    return tiempos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide importaciones y primer dibujo de cada página en un proceso en frío.")
+    parser.add_argument("paginas", nargs="*", help="Scripts a medir (por defecto: app.py y pages/*.py)")
+    parser.add_argument("--top", type=int, default=5, help="Paquetes más costosos a listar por página")
+    args = parser.parse_args(argv)
+
+    for pagina in args.paginas or paginas_del_proyecto():
+        tiempos = perfilar(pagina)
+        print(f"📄 {Path(pagina).name}: importaciones {tiempos['importaciones']:.2f} s · "
+              f"primer dibujo {tiempos['primer_dibujo']:.2f} s (incluye importaciones) · rerun {tiempos['rerun']:.2f} s")
+        for paquete, segundos in tiempos["paquetes"][:args.top]:
+            print(f"     {paquete:<24} {segundos:.3f} s")
+        for error in tiempos["errores"]:
+            print(f"  ⚠️ {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# ===================================================
+# Precálculo de artefactos del tablero
+# ===================================================
+# Ejecuta como paso previo (fuera del navegador) todo el trabajo pesado que antes
+# ocurría en la primera visita a cada página:
+#   1. Lectura del Excel y tipado (fechas, numéricos, agentes como texto).
+#   2. Índices por valor para los filtros (Agente, estado, Cola).
+#   3. Cubos diarios por agente (sumas y conteos por métrica) y por todas las
+#      dimensiones de los filtros (para comparar con el periodo anterior).
+#   4. Series de tendencia por día/semana/mes y acumulados del ranking de
+#      agentes (ambos incrementales).
+#   5. Índice de búsqueda por palabras sobre las columnas de texto.
+#   6. Días atípicos por agente (caídas de puntaje, polaridad o pasos del guion).
+#   7. Informe de calidad por conjunto (hecho al preprocesar; aquí se copia al manifiesto).
+#   8. Índice de agentes comunes a ambos conjuntos (página de comparación).
+# Todo queda versionado en data/almacen con la versión de los datos de origen
+# (Excel y, si existe, salida del pipeline de audio);
+# las páginas solo abren los archivos ya construidos.
+#
+# Uso (desde la raíz del proyecto):
+#   python -m tablero.precalculo                # ambos conjuntos
+#   python -m tablero.precalculo --solo servicio
+import argparse
+import datetime
+import time
+
+from tablero import almacen, calidad, datos
+
+ARCHIVO_MANIFIESTO = "manifiesto.json"
+
+# nombre -> (archivo de origen, cargar, cubo, cubo por filtros, índices, tendencias, ranking, búsqueda, anomalías)
+CONJUNTOS = {
+    "servicio": (datos.ARCHIVO_SERVICIO, datos.cargar_servicio, datos.cubo_servicio, datos.cubo_filtros_servicio,
+                 datos.indices_servicio, datos.tendencias_servicio, datos.ranking_servicio, datos.busqueda_servicio,
+                 datos.anomalias_servicio),
+    "ventas": (datos.ARCHIVO_VENTAS, datos.cargar_ventas, datos.cubo_ventas, datos.cubo_filtros_ventas,
+               datos.indices_ventas, datos.tendencias_ventas, datos.ranking_ventas, datos.busqueda_ventas,
+               datos.anomalias_ventas),
+}
+
+
+def precalcular(nombre):
+    """Construye (o reutiliza si ya existen) todos los artefactos de un conjunto."""
+    ruta, cargar, cubo, cubo_filtros, indices, series, ranking, busqueda, anomalias = CONJUNTOS[nombre]
+    inicio = time.perf_counter()
+    df, metadatos = cargar(ruta)
+    tabla_cubo = cubo(ruta)
+    tabla_cubo_filtros = cubo_filtros(ruta)
+    indices_construidos = indices(ruta)
+    tabla_series = series(ruta)
+    ranking_agentes = ranking(ruta)
+    indice_texto = busqueda(ruta)
+    tabla_anomalias = anomalias(ruta)
+    return {
+        "origen": ruta.name,
+        "version": datos.version_conjunto(nombre, ruta),
+        "filas": len(df),
+        "filas_cubo": len(tabla_cubo),
+        "filas_cubo_filtros": len(tabla_cubo_filtros),
+        "filas_tendencias": len(tabla_series),
+        "agentes_ranking": len(ranking_agentes.agentes),
+        "palabras_busqueda": len(indice_texto.tokens),
+        "dias_atipicos": int(tabla_anomalias['anomalia'].sum()),
+        "indices": {col: len(indice.valores) for col, indice in indices_construidos.items()},
+        "calidad": calidad.informe_de(metadatos),
+        "audio": metadatos.get("audio"),
+        "segundos": round(time.perf_counter() - inicio, 2),
+    }
+
+
+def precalcular_comunes():
+    """Artefactos que combinan ambos conjuntos."""
+    return {"agentes_indice": len(datos.indice_agentes())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precalcula los artefactos del tablero en data/almacen.")
+    parser.add_argument("--solo", choices=sorted(CONJUNTOS), help="Precalcular solo este conjunto")
+    args = parser.parse_args(argv)
+
+    nombres = [args.solo] if args.solo else list(CONJUNTOS)
+    manifiesto = almacen.leer_json(ARCHIVO_MANIFIESTO) or {}
+    for nombre in nombres:
+        resultado = precalcular(nombre)
+        manifiesto[nombre] = resultado
+        encontrados = calidad.hallazgos(resultado["calidad"])
+        print(f"✅ {nombre}: {resultado['filas']} filas, {resultado['filas_cubo']} filas de cubo, "
+              f"{sum(1 for tipo, _ in encontrados if tipo != 'info')} hallazgos de calidad "
+              f"({resultado['segundos']} s)")
+        for _, mensaje in encontrados:
+            print(f"     {mensaje}")
+        if resultado["audio"]:
+            print(f"     🎧 {resultado['audio']['llamadas_calificadas']} llamadas con puntajes del pipeline de audio "
+                  f"({resultado['audio']['audios_sin_llamada']} audios sin llamada)")
+    if not args.solo:
+        manifiesto["comunes"] = precalcular_comunes()
+    manifiesto["generado"] = datetime.datetime.now().isoformat(timespec="seconds")
+    almacen.escribir_json(ARCHIVO_MANIFIESTO, manifiesto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# ===================================================
+# Precarga de los datos al arrancar el servidor
+# ===================================================
+# La primera visita después de un despliegue o reinicio pagaba la lectura del
+# Excel y todo el preprocesamiento de las páginas 4 y 5. `iniciar()` se llama
+# desde app.py y desde cada página, así que la primera visita a CUALQUIER página
+# lanza, una sola vez en el proceso, un hilo en segundo plano que hace el mismo
+# trabajo que el precálculo (datos, índices, cubos diarios, series de tendencia,
+# búsqueda y días atípicos de ambos conjuntos) y publica todo en el almacén.
+#
+# Limitación: Streamlit no ofrece un gancho al arrancar el servidor, así que la
+# precarga empieza con la primera visita y no antes; ese primer visitante ve
+# "Preparando datos..." mientras el hilo comprueba o construye los artefactos.
+# Para que los datos ya estén listos antes de la primera visita, correr
+# `python -m tablero.precalculo` como paso del despliegue: la precarga entonces
+# solo encuentra los artefactos ya publicados y termina en segundos.
+#
+# Las llamadas siguientes (otras sesiones, reruns) devuelven el mismo estado
+# sin lanzar nada nuevo. Si una página se abre antes de que termine, su carga
+# espera el candado del almacén del artefacto que se está construyendo y luego
+# lo abre ya publicado: el trabajo no se repite.
+import threading
+import time
+
+import streamlit as st
+
+# Mismos nombres que tablero.precalculo.CONJUNTOS. precalculo (y con él pandas,
+# pyarrow y la carga de datos) se importa dentro del hilo, así app.py no paga
+# esas importaciones antes de dibujar la portada.
+CONJUNTOS = ("servicio", "ventas")
+
+
+class EstadoPrecarga:
+    """Estado de la precarga por conjunto, seguro para leer desde cualquier sesión.
+
+    Cada conjunto pasa por 'pendiente' -> 'cargando' -> 'listo' (o 'error').
+    """
+
+    def __init__(self, conjuntos):
+        self._candado = threading.Lock()
+        self._estados = {nombre: {"estado": "pendiente", "segundos": None, "error": None} for nombre in conjuntos}
+        self.inicio = time.time()
+
+    def _marcar(self, nombre, **valores):
+        with self._candado:
+            self._estados[nombre].update(valores)
+
+    def conjuntos(self):
+        """Copia del estado de cada conjunto."""
+        with self._candado:
+            return {nombre: dict(estado) for nombre, estado in self._estados.items()}
+
+    @property
+    def listo(self):
+        """True cuando todos los conjuntos terminaron (bien o con error)."""
+        return all(e["estado"] in ("listo", "error") for e in self.conjuntos().values())
+
+
+def _precargar(estado):
+    from tablero import precalculo
+
+    for nombre in CONJUNTOS:
+        estado._marcar(nombre, estado="cargando")
+        inicio = time.perf_counter()
+        try:
+            precalculo.precalcular(nombre)
+        except Exception as error:  # el tablero sigue funcionando; la página cargará por su cuenta
+            estado._marcar(nombre, estado="error", error=str(error), segundos=round(time.perf_counter() - inicio, 2))
+        else:
+            estado._marcar(nombre, estado="listo", segundos=round(time.perf_counter() - inicio, 2))
+    try:
+        precalculo.precalcular_comunes()
+    except Exception:
+        # Solo afecta a la página de comparación, que lo construye al abrirse
+        pass
+
+
+@st.cache_resource(show_spinner=False)
+def iniciar():
+    """Lanza la precarga una sola vez por proceso y devuelve su `EstadoPrecarga`."""
+    estado = EstadoPrecarga(CONJUNTOS)
+    threading.Thread(target=_precargar, args=(estado,), name="precarga-tablero", daemon=True).start()
+    return estado
+
+
+def mostrar_estado(estado):
+    """Indicador en la barra lateral: qué conjuntos ya están listos."""
+    if estado.listo:
+        errores = {n: e["error"] for n, e in estado.conjuntos().items() if e["estado"] == "error"}
+        if errores:
+            for nombre, error in errores.items():
+                st.sidebar.warning(f"⚠️ No se pudieron precargar los datos de {nombre}: {error}")
+        else:
+            st.sidebar.success("✅ Datos listos")
+        return
+    pendientes = [n for n, e in estado.conjuntos().items() if e["estado"] not in ("listo", "error")]
+    st.sidebar.info(f"⏳ Preparando datos ({', '.join(pendientes)})...")
@@ -0,0 +1,163 @@
+# ===================================================
+# Ranking de agentes (mejores y peores K) por ventana de fechas
+# ===================================================
+# Se guarda, por agente y por cada día con llamadas, el ACUMULADO desde el primer
+# día de las sumas y conteos del cubo diario (tablero/cubos.py). El agregado de
+# cualquier ventana [desde, hasta] es acumulado(hasta) - acumulado(desde - 1):
+# dos búsquedas binarias por agente, sin recorrer días ni llamadas. Con los
+# agregados de la ventana, los K mejores y peores salen de una selección parcial
+# (nlargest / nsmallest) sobre una fila por agente.
+#
+# Se mantiene de forma incremental como las tendencias: con las huellas por día
+# del cubo se busca el primer día que cambió; los acumulados anteriores se
+# copian de la versión previa y solo se recalculan desde ese día en adelante
+# (lo normal es que lleguen días nuevos al final).
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from tablero import cubos, tendencias
+
+ETIQUETAS = {
+    'Puntaje_Total_%': "Puntaje",
+    'Confianza': "Confianza",
+    'Polarity': "Polaridad",
+    'Subjectivity': "Subjetividad",
+}
+
+
+def _columnas(tabla):
+    """Columnas acumulables: 'llamadas' y las sumas y conteos de cada métrica."""
+    return [c for c in tabla.columns if c == 'llamadas' or c.endswith(cubos.SUFIJO_SUMA) or c.endswith(cubos.SUFIJO_CONTEO)]
+
+
+def _dias(valores):
+    return pd.DatetimeIndex(pd.to_datetime(np.asarray(valores, dtype="datetime64[ns]")))
+
+
+def _acumular(cubo, base=None):
+    """Acumulados por agente y día de las filas del cubo, partiendo de `base` (por agente) si se da."""
+    columnas = _columnas(cubo)
+    por_dia = cubo.assign(dia=_dias(cubo['dia'])).groupby(['Agente', 'dia'], observed=True)[columnas].sum()
+    acumulado = por_dia.astype('float64').groupby(level='Agente', observed=True).cumsum()
+    if base is not None and not base.empty:
+        inicial = base[columnas].reindex(acumulado.index.get_level_values('Agente')).fillna(0.0)
+        acumulado = acumulado + inicial.to_numpy(dtype='float64')
+    return acumulado.reset_index()
+
+
+def actualizar(cubo, previo=None, huellas_previas=None):
+    """Construye los acumulados del ranking a partir del cubo diario.
+
+    `previo` y `huellas_previas` son los de la versión anterior (o None). Devuelve
+    `(acumulados, metadatos)`; los metadatos guardan las huellas nuevas y desde
+    qué día se recalculó.
+    """
+    huellas = tendencias.huellas_por_dia(cubo)
+    desde = None
+    if previo is not None and huellas_previas is not None and set(_columnas(previo)) == set(_columnas(cubo)):
+        cambiados = {d for d, h in huellas.items() if huellas_previas.get(d) != h}
+        cambiados |= set(huellas_previas) - set(huellas)  # días que desaparecieron
+        if not cambiados:
+            return previo, {"huellas": huellas, "recalculado_desde": None}
+        desde = pd.Timestamp(min(cambiados))
+
+    if desde is None:
+        acumulado = _acumular(cubo)
+    else:
+        previo = previo.assign(dia=_dias(previo['dia']))
+        conservado = previo[previo['dia'] < desde]
+        # Último acumulado de cada agente antes del primer día que cambió
+        base = conservado.sort_values('dia').groupby('Agente', observed=True).last()
+        nuevo = _acumular(cubo[np.asarray(_dias(cubo['dia']) >= desde)], base)
+        acumulado = pd.concat([conservado, nuevo], ignore_index=True)
+
+    acumulado = acumulado.sort_values(['Agente', 'dia'], ignore_index=True)
+    return acumulado, {"huellas": huellas, "recalculado_desde": None if desde is None else f"{desde:%Y-%m-%d}"}
+
+
+class Ranking:
+    """Acumulados listos para consultar ventanas con búsqueda binaria.
+
+    Las filas se ordenan por (agente, día) y se codifican en una sola clave
+    entera, así "el último acumulado de cada agente hasta una fecha" es un
+    `searchsorted` vectorizado sobre todos los agentes a la vez.
+    """
+
+    def __init__(self, acumulados):
+        self.columnas = _columnas(acumulados)
+        codigos, self.agentes = pd.factorize(acumulados['Agente'].astype(str), sort=True)
+        dias = _dias(acumulados['dia']).to_numpy(dtype="datetime64[D]").astype(np.int64)
+        self._desplazamiento = int(dias.min()) if len(dias) else 0
+        self._ancho = int(dias.max()) - self._desplazamiento + 2 if len(dias) else 1
+        claves = codigos.astype(np.int64) * self._ancho + (dias - self._desplazamiento)
+        orden = np.argsort(claves, kind="stable")
+        self._claves = claves[orden]
+        self._codigos = codigos[orden]
+        self._valores = acumulados[self.columnas].to_numpy(dtype="float64")[orden]
+        self.primer_dia = None if not len(dias) else pd.Timestamp(int(dias.min()), unit="D")
+        self.ultimo_dia = None if not len(dias) else pd.Timestamp(int(dias.max()), unit="D")
+
+    def _hasta(self, fecha):
+        """Acumulado de cada agente hasta `fecha` inclusive (ceros si aún no tenía llamadas)."""
+        resultado = np.zeros((len(self.agentes), len(self.columnas)))
+        if not len(self._claves):
+            return resultado
+        dia = int(np.datetime64(pd.Timestamp(fecha).date(), "D").astype(np.int64)) - self._desplazamiento
+        dia = min(max(dia, -1), self._ancho - 2)
+        codigos = np.arange(len(self.agentes), dtype=np.int64)
+        posiciones = np.searchsorted(self._claves, codigos * self._ancho + dia, side="right") - 1
+        validas = (posiciones >= 0) & (self._codigos[np.clip(posiciones, 0, None)] == codigos)
+        resultado[validas] = self._valores[posiciones[validas]]
+        return resultado
+
+    def ventana(self, desde=None, hasta=None):
+        """Sumas y conteos por agente en [`desde`, `hasta`] (como `cubos.combinar`)."""
+        fin = self._hasta(hasta if hasta is not None else self.ultimo_dia)
+        inicio = self._hasta(pd.Timestamp(desde) - pd.Timedelta(days=1)) if desde is not None else 0.0
+        return pd.DataFrame(fin - inicio, index=pd.Index(self.agentes, name='Agente'), columns=self.columnas)
+
+    def mejores_y_peores(self, metrica, k=5, desde=None, hasta=None, agentes=None, min_llamadas=1):
+        """Los `k` agentes con mayor y menor promedio de `metrica` en la ventana.
+
+        Solo entran agentes con al menos `min_llamadas` llamadas (y con la métrica)
+        en la ventana. Devuelve `(mejores, peores)` con 'Agente', 'llamadas' y la métrica.
+        """
+        promedios = cubos.promedios(self.ventana(desde, hasta))
+        if agentes is not None:
+            promedios = promedios[promedios.index.isin(list(agentes))]
+        promedios = promedios[(promedios['llamadas'] >= min_llamadas) & promedios[metrica].notna()]
+        columnas = ['llamadas', metrica]
+        return (promedios.nlargest(k, metrica)[columnas].reset_index(),
+                promedios.nsmallest(k, metrica)[columnas].reset_index())
+
+
+def mostrar_ranking(ranking, metricas, desde=None, hasta=None, agentes=None, clave="ranking"):
+    """Sección de mejores y peores agentes para las páginas del tablero."""
+    st.markdown("### 🏆 Mejores y peores agentes")
+    st.caption("Promedios por agente en el periodo y agentes seleccionados (no aplica los demás filtros).")
+    metricas = [m for m in metricas if m + cubos.SUFIJO_SUMA in ranking.columnas]
+    if not metricas:
+        st.info("No hay métricas para el ranking.")
+        return
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        metrica = st.selectbox("Métrica", metricas, format_func=lambda m: ETIQUETAS.get(m, m), key=f"{clave}_metrica")
+    with col2:
+        k = st.slider("Agentes por lista", min_value=1, max_value=20, value=5, key=f"{clave}_k")
+    with col3:
+        min_llamadas = st.number_input("Mín. llamadas", min_value=1, value=1, key=f"{clave}_min")
+
+    mejores, peores = ranking.mejores_y_peores(metrica, k, desde, hasta, agentes, int(min_llamadas))
+    if mejores.empty:
+        st.info("No hay agentes con llamadas suficientes en el periodo seleccionado.")
+        return
+    etiqueta = ETIQUETAS.get(metrica, metrica)
+    formato = {metrica: "{:.2f}"}
+    col_mejores, col_peores = st.columns(2)
+    with col_mejores:
+        st.markdown(f"**🔝 Mejores por {etiqueta}**")
+        st.dataframe(mejores.style.format(formato), hide_index=True, use_container_width=True)
+    with col_peores:
+        st.markdown(f"**🔻 Peores por {etiqueta}**")
+        st.dataframe(peores.style.format(formato), hide_index=True, use_container_width=True)
@@ -0,0 +1,283 @@
+# ===================================================
+# Reportes HTML por lotes (por agente y del equipo)
+# ===================================================
+# Genera, sin abrir el tablero, un reporte HTML independiente por agente y uno
+# del equipo completo con las mismas métricas y figuras de la página 5.
+#
+# Uso (desde la raíz del proyecto):
+#   python -m tablero.reportes --salida reportes --desde 2025-05-01 --hasta 2025-05-07
+#
+# - Las agregaciones del equipo (promedios por agente) se calculan UNA vez y las
+#   figuras compartidas (barras, burbujas) se convierten a HTML una sola vez.
+# - Los reportes por agente se generan en paralelo en procesos separados; cada
+#   proceso recibe el contexto compartido al iniciar, no con cada reporte.
+# - Cada reporte es un HTML independiente (se puede enviar o mover solo): lleva
+#   incrustado plotly.js UNA vez, en la cabecera, y sus figuras lo comparten. El
+#   bundle se lee una sola vez y llega a cada proceso trabajador al iniciar.
+# - Las llamadas sin agente en el Excel se agrupan bajo SIN_AGENTE, con su propio
+#   reporte, en lugar de aparecer como un agente llamado 'nan'.
+import argparse
+import datetime
+import html
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from tablero import datos, filtros, graficos
+
+
+# Etiqueta de las llamadas sin agente ('Agente' vacío llega como el texto 'nan')
+SIN_AGENTE = "(Sin agente)"
+
+# Métricas resumen: (título, columna, formato)
+METRICAS_RESUMEN = [
+    ("Puntaje promedio", "Puntaje_Total_%", "{:.2f}%"),
+    ("Confianza promedio", "Confianza", "{:.2f}%"),
+    ("Polaridad promedio", "Polarity", "{:.2f}"),
+    ("Subjetividad promedio", "Subjectivity", "{:.2f}"),
+]
+
+PLANTILLA = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>{titulo}</title>
+<script>{plotly}</script>
+<style>
+  body {{ font-family: Arial, sans-serif; margin: 24px; color: #222; }}
+  h1 {{ color: #31A354; }}
+  .metricas {{ display: flex; gap: 16px; flex-wrap: wrap; }}
+  .metrica {{ background: #f9f9f9; border-radius: 10px; padding: 12px 18px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); }}
+  .metrica .valor {{ font-size: 1.8rem; font-weight: 700; }}
+  .gauges {{ display: flex; gap: 16px; flex-wrap: wrap; }}
+  table {{ border-collapse: collapse; font-size: 0.85rem; }}
+  th, td {{ border: 1px solid #ddd; padding: 4px 8px; }}
+  th {{ background: #e5f5e0; }}
+</style>
+</head>
+<body>
+<h1>{titulo}</h1>
+<p>{subtitulo}</p>
+{contenido}
+</body>
+</html>
+"""
+
+# Contexto compartido de cada proceso trabajador (lo fija _iniciar_trabajador)
+_CONTEXTO = {}
+
+
+# ===================================================
+# Agregación compartida
+# ===================================================
+def agregar_por_agente(df):
+    """Una sola pasada de agrupación con todo lo que necesitan los reportes."""
+    columnas = [c for _, c, _ in METRICAS_RESUMEN if c in df.columns]
+    conteos = [c for c in datos.COLUMNAS_CONTEO_SERVICIO if c in df.columns]
+    agregados = df.groupby('Agente')[columnas + conteos].mean()
+    agregados['numero_llamadas'] = df.groupby('Agente').size()
+    return agregados, columnas, conteos
+
+
+def _figura_html(fig):
+    return fig.to_html(full_html=False, include_plotlyjs=False)
+
+
+def _metricas_html(valores, numero_llamadas):
+    tarjetas = []
+    for titulo, columna, formato in METRICAS_RESUMEN:
+        valor = valores.get(columna)
+        texto = "N/A" if valor is None or pd.isna(valor) else formato.format(valor)
+        tarjetas.append(f"<div class='metrica'><div>{titulo}</div><div class='valor'>{texto}</div></div>")
+    tarjetas.append(f"<div class='metrica'><div>Conteo llamadas</div><div class='valor'>{numero_llamadas}</div></div>")
+    return "<div class='metricas'>" + "".join(tarjetas) + "</div>"
+
+
+def _gauges_html(polaridad, subjetividad):
+    partes = []
+    if not pd.isna(polaridad):
+        partes.append(_figura_html(graficos.figura_gauge_polaridad(polaridad)))
+    if not pd.isna(subjetividad):
+        partes.append(_figura_html(graficos.figura_gauge_subjetividad(subjetividad)))
+    return "<div class='gauges'>" + "".join(partes) + "</div>"
+
+
+def construir_contexto(df):
+    """Agregaciones y fragmentos HTML compartidos por todos los reportes."""
+    agregados, columnas, conteos = agregar_por_agente(df)
+    por_agente = agregados.reset_index()
+
+    figuras_equipo = {}
+    if 'Puntaje_Total_%' in columnas:
+        figuras_equipo['puntaje'] = _figura_html(graficos.figura_puntaje_por_agente(por_agente[['Agente', 'Puntaje_Total_%']]))
+    if 'Polarity' in columnas:
+        figuras_equipo['polaridad'] = _figura_html(graficos.figura_polaridad_por_agente(por_agente[['Agente', 'Polarity']]))
+    if 'Polarity' in columnas and 'Confianza' in columnas:
+        burbujas = por_agente.rename(columns={
+            'Polarity': 'promedio_polaridad', 'Confianza': 'promedio_confianza'
+        })[['Agente', 'promedio_polaridad', 'promedio_confianza', 'numero_llamadas']]
+        figuras_equipo['burbujas'] = _figura_html(graficos.figura_burbujas(burbujas))
+
+    return {
+        "agregados": agregados,
+        "conteos": conteos,
+        "figuras_equipo": figuras_equipo,
+        "generado": datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
+    }
+
+
+# ===================================================
+# Reportes
+# ===================================================
+def nombre_archivo(agente):
+    """Nombre de archivo seguro para el reporte de un agente."""
+    base = re.sub(r"[^\w\-]+", "_", agente, flags=re.UNICODE).strip("_")
+    return f"agente_{base or 'sin_nombre'}.html"
+
+
+def nombres_archivos(agentes):
+    """Nombre de archivo de cada agente, sin repetir.
+
+    Dos nombres que quedan iguales al limpiarlos (o que solo difieren en
+    mayúsculas, lo mismo para Windows) reciben un sufijo numérico en vez de
+    sobrescribirse: 'agente_Ana_Perez.html', 'agente_Ana_Perez_2.html'.
+    """
+    nombres, usados = {}, set()
+    for agente in agentes:
+        nombre = nombre_archivo(agente)
+        base, numero = nombre[:-len(".html")], 2
+        while nombre.lower() in usados:
+            nombre = f"{base}_{numero}.html"
+            numero += 1
+        usados.add(nombre.lower())
+        nombres[agente] = nombre
+    return nombres
+
+
+def etiquetar_sin_agente(df):
+    """Copia de `df` con las llamadas sin agente bajo SIN_AGENTE."""
+    agentes = df['Agente'].astype(str).str.strip()
+    sin_agente = df['Agente'].isna() | agentes.isin(["", "nan", "None", "<NA>"])
+    return df.assign(Agente=agentes.where(~sin_agente, SIN_AGENTE))
+
+
+def _iniciar_trabajador(contexto, carpeta):
+    _CONTEXTO.update(contexto)
+    _CONTEXTO["carpeta"] = Path(carpeta)
+
+
+def _reporte_agente(trabajo):
+    """Escribe el reporte de un agente. Corre dentro de un proceso trabajador."""
+    agente, filas, nombre = trabajo
+    contexto = _CONTEXTO
+    valores = contexto["agregados"].loc[agente]
+
+    secciones = [
+        "<h2>📋 Resumen de métricas</h2>",
+        _metricas_html(valores, int(valores['numero_llamadas'])),
+        "<h2>🎯 Posición frente al equipo</h2>",
+        contexto["figuras_equipo"].get('puntaje', ""),
+        contexto["figuras_equipo"].get('polaridad', ""),
+    ]
+    if contexto["conteos"]:
+        secciones += [
+            "<h2>🗺️ Métricas de conteo (promedio)</h2>",
+            _figura_html(graficos.figura_heatmap_conteos(contexto["agregados"].loc[[agente], contexto["conteos"]])),
+        ]
+    secciones += [
+        "<h2>🔍 Polaridad y subjetividad</h2>",
+        _gauges_html(valores.get('Polarity', float('nan')), valores.get('Subjectivity', float('nan'))),
+        "<h2>🔍 Detalle de llamadas</h2>",
+        filas[[c for c in filas.columns if c not in datos.COLUMNAS_OCULTAS_DETALLE_SERVICIO and c != 'Agente']]
+        .to_html(index=False, na_rep="N/A", border=0),
+    ]
+
+    archivo = contexto["carpeta"] / nombre
+    archivo.write_text(PLANTILLA.format(
+        titulo=html.escape(f"Reporte de {agente}"),
+        subtitulo=html.escape(f"{len(filas)} llamadas · generado {contexto['generado']}"),
+        plotly=contexto["plotly"],
+        contenido="\n".join(secciones),
+    ), encoding="utf-8")
+    return agente, archivo.name
+
+
+def _reporte_equipo(df, contexto, carpeta, archivos_agentes):
+    """Reporte del equipo completo, con enlaces a los reportes por agente."""
+    agregados = contexto["agregados"]
+    totales = {col: df[col].mean() for _, col, _ in METRICAS_RESUMEN if col in df.columns}
+    enlaces = "".join(
+        f"<li><a href='{html.escape(archivo)}'>{html.escape(agente)}</a></li>"
+        for agente, archivo in sorted(archivos_agentes)
+    )
+    secciones = [
+        "<h2>📋 Resumen general de métricas</h2>",
+        _metricas_html(totales, len(df)),
+        "<h2>📈 Gráficos resumen</h2>",
+        *contexto["figuras_equipo"].values(),
+    ]
+    if contexto["conteos"]:
+        secciones.append(_figura_html(graficos.figura_heatmap_conteos(agregados[contexto["conteos"]])))
+    secciones += [
+        _gauges_html(totales.get('Polarity', float('nan')), totales.get('Subjectivity', float('nan'))),
+        "<h2>🧑 Reportes por agente</h2>",
+        f"<ul>{enlaces}</ul>",
+    ]
+    archivo = Path(carpeta) / "equipo.html"
+    archivo.write_text(PLANTILLA.format(
+        titulo="Reporte del equipo",
+        subtitulo=html.escape(f"{len(df)} llamadas · {len(agregados)} agentes · generado {contexto['generado']}"),
+        plotly=contexto["plotly"],
+        contenido="\n".join(secciones),
+    ), encoding="utf-8")
+    return archivo
+
+
+def generar_reportes(df, carpeta, procesos=None):
+    """Genera `equipo.html` y un reporte por agente en `carpeta`. Devuelve la lista de archivos."""
+    import plotly.offline
+
+    carpeta = Path(carpeta)
+    carpeta.mkdir(parents=True, exist_ok=True)
+
+    df = etiquetar_sin_agente(df)
+    contexto = construir_contexto(df)
+    # Bundle de Plotly que cada reporte incrusta en su cabecera
+    contexto["plotly"] = plotly.offline.get_plotlyjs()
+    grupos = list(df.groupby('Agente', sort=True))
+    nombres = nombres_archivos([agente for agente, _ in grupos])
+    trabajos = [(agente, filas, nombres[agente]) for agente, filas in grupos]
+
+    with ProcessPoolExecutor(max_workers=procesos or os.cpu_count(),
+                             initializer=_iniciar_trabajador,
+                             initargs=(contexto, str(carpeta))) as ejecutor:
+        archivos_agentes = list(ejecutor.map(_reporte_agente, trabajos, chunksize=4))
+
+    equipo = _reporte_equipo(df, contexto, carpeta, archivos_agentes)
+    return [equipo] + [carpeta / archivo for _, archivo in archivos_agentes]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera reportes HTML por agente y del equipo (datos de servicio).")
+    parser.add_argument("--salida", default="reportes", help="Carpeta de salida (por defecto: reportes)")
+    parser.add_argument("--desde", type=datetime.date.fromisoformat, help="Fecha inicial AAAA-MM-DD (inclusive)")
+    parser.add_argument("--hasta", type=datetime.date.fromisoformat, help="Fecha final AAAA-MM-DD (inclusive)")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos en paralelo (por defecto: núcleos disponibles)")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    df, _ = datos.cargar_servicio()
+    if args.desde or args.hasta:
+        df = filtros.seleccionar(df, filtros.mascara_rango_fechas(df['fecha_convertida'], args.desde, args.hasta))
+
+    archivos = generar_reportes(df, args.salida, args.procesos)
+    print(f"{len(archivos)} reportes independientes (con plotly.js incrustado) generados en '{args.salida}' "
+          f"en {time.perf_counter() - inicio:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
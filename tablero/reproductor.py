@@ -0,0 +1,124 @@
+# ===================================================
+# Reproducción bajo demanda de las grabaciones
+# ===================================================
+# El detalle por agente muestra un botón "Escuchar" por llamada. Nada se lee
+# del disco al dibujar la página: el archivo referenciado en la columna 'audio'
+# solo se lee cuando se pulsa el botón, por bloques, y el clip resultante queda
+# en una caché pequeña (pocos clips, versionada por fecha y tamaño del archivo).
+#
+# Los WAV de la central suelen venir en GSM o mu-law, que los navegadores no
+# reproducen; esos se decodifican a PCM de 16 bits una sola vez y lo que se
+# guarda en caché es el clip ya decodificado. Streamlit sirve el clip por su
+# endpoint de medios, que atiende peticiones por rangos (HTTP Range), así que el
+# navegador descarga solo lo que va reproduciendo.
+import io
+import wave
+from pathlib import Path
+
+import streamlit as st
+
+from tablero import almacen, datos, monitor
+
+# Bytes por lectura del archivo de audio
+TAMANO_BLOQUE = 256 * 1024
+
+# Clips decodificados que se conservan en memoria (compartidos entre sesiones)
+CLIPS_EN_CACHE = 8
+
+FORMATOS_NAVEGADOR = {
+    ".wav": "audio/wav",
+    ".mp3": "audio/mpeg",
+    ".ogg": "audio/ogg",
+    ".m4a": "audio/mp4",
+    ".flac": "audio/flac",
+}
+
+# Frecuencia a la que se decodifican los formatos que el navegador no reproduce
+FRECUENCIA_DECODIFICADO = 16000
+
+
+def ruta_audio(relativa, carpeta=datos.CARPETA_AUDIOS):
+    """Ruta en disco de un valor de la columna 'audio'; nunca sale de `carpeta`."""
+    carpeta = Path(carpeta).resolve()
+    ruta = (carpeta / str(relativa).replace("\\", "/")).resolve()
+    if not ruta.is_relative_to(carpeta):
+        raise FileNotFoundError(f"Ruta de audio fuera de la carpeta de grabaciones: {relativa}")
+    if not ruta.is_file():
+        raise FileNotFoundError(f"No se encontró la grabación: {relativa}")
+    return ruta
+
+
+def leer_bloques(ruta, desde=0, hasta=None, tamano_bloque=TAMANO_BLOQUE):
+    """Lee el rango [`desde`, `hasta`) de `ruta`, un bloque de bytes a la vez."""
+    with open(ruta, "rb") as entrada:
+        entrada.seek(desde)
+        restante = None if hasta is None else hasta - desde
+        while restante is None or restante > 0:
+            bloque = entrada.read(tamano_bloque if restante is None else min(tamano_bloque, restante))
+            if not bloque:
+                break
+            if restante is not None:
+                restante -= len(bloque)
+            yield bloque
+
+
+def es_wav_pcm(ruta):
+    """True si `ruta` es un WAV PCM (formato 1) que el navegador reproduce directamente."""
+    encabezado = b"".join(leer_bloques(ruta, 0, 64))
+    if encabezado[:4] != b"RIFF" or encabezado[8:12] != b"WAVE":
+        return False
+    # Primer subbloque 'fmt ': el código de formato va justo después de su tamaño
+    posicion = encabezado.find(b"fmt ")
+    return posicion >= 0 and int.from_bytes(encabezado[posicion + 8:posicion + 10], "little") == 1
+
+
+def _decodificar(ruta):
+    """Decodifica a WAV PCM de 16 bits mono (con el mismo decodificador del pipeline de transcripción)."""
+    from faster_whisper import decode_audio
+
+    muestras = decode_audio(str(ruta), sampling_rate=FRECUENCIA_DECODIFICADO)
+    salida = io.BytesIO()
+    with wave.open(salida, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(FRECUENCIA_DECODIFICADO)
+        wav.writeframes((muestras.clip(-1, 1) * 32767).astype("<i2").tobytes())
+    return salida.getvalue()
+
+
+@monitor.cache_datos("audio", show_spinner="Cargando grabación...", max_entries=CLIPS_EN_CACHE)
+def clip(ruta, version):
+    """Clip reproducible de `ruta` como `(bytes, formato)`.
+
+    `version` (fecha y tamaño del archivo) invalida la caché si la grabación se reemplaza.
+    """
+    ruta = Path(ruta)
+    formato = FORMATOS_NAVEGADOR.get(ruta.suffix.lower())
+    if formato is not None and (formato != "audio/wav" or es_wav_pcm(ruta)):
+        return b"".join(leer_bloques(ruta)), formato
+    try:
+        return _decodificar(ruta), "audio/wav"
+    except ImportError:
+        # Sin decodificador se entrega tal cual; algunos navegadores igual lo reproducen
+        return b"".join(leer_bloques(ruta)), formato or "audio/wav"
+
+
+def mostrar_reproductor(relativa, clave):
+    """Botón "Escuchar" de una llamada; el audio se carga solo al pulsarlo.
+
+    `clave` identifica la llamada en la sesión, para que el reproductor siga
+    abierto en los reruns siguientes (p. ej. al mover otro filtro).
+    """
+    abiertos = st.session_state.setdefault("audios_abiertos", set())
+    if clave not in abiertos:
+        if not st.button("🔊 Escuchar grabación", key=f"escuchar_{clave}"):
+            return
+        abiertos.add(clave)
+
+    try:
+        ruta = ruta_audio(relativa)
+    except FileNotFoundError as error:
+        st.warning(f"⚠️ {error}")
+        return
+    contenido, formato = clip(str(ruta), almacen.version_origen(ruta))
+    st.audio(contenido, format=formato)
@@ -0,0 +1,152 @@
+# ===================================================
+# Tendencias en el tiempo por agente
+# ===================================================
+# Las series se guardan como sumas y conteos por periodo (día, semana, mes) y
+# por agente, más una fila "Todos los agentes" por periodo. Se derivan del cubo
+# diario (tablero/cubos.py) y se mantienen de forma incremental: cada día del
+# cubo tiene una huella (hash de sus filas) y al llegar datos nuevos solo se
+# recalculan los periodos que contienen días cuya huella cambió; el resto se
+# copia tal cual de la versión anterior.
+#
+# Las medias móviles se calculan al servir la serie sobre estos agregados por
+# periodo (a lo sumo unas centenas de filas por agente), no sobre las llamadas.
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from tablero import cubos, graficos
+
+METRICAS_TENDENCIA = ['Puntaje_Total_%', 'Polarity', 'Confianza']
+
+TODOS = "Todos los agentes"
+
+# Frecuencia -> (etiqueta, ventana por defecto de la media móvil en periodos)
+FRECUENCIAS = {
+    "D": ("Diaria", 7),
+    "W": ("Semanal", 4),
+    "M": ("Mensual", 3),
+}
+
+
+def inicio_periodo(dias, frecuencia):
+    """Fecha de inicio del periodo (día, semana desde el lunes, mes) de cada día."""
+    dias = pd.DatetimeIndex(pd.to_datetime(np.asarray(dias, dtype="datetime64[ns]")))
+    if frecuencia == "D":
+        return dias
+    if frecuencia == "W":
+        return dias - pd.to_timedelta(dias.weekday, unit="D")
+    if frecuencia == "M":
+        return dias.to_period("M").to_timestamp()
+    raise ValueError(f"Frecuencia no soportada: {frecuencia}")
+
+
+def huellas_por_dia(cubo):
+    """Hash de las filas del cubo de cada día, como {'AAAA-MM-DD': 'hash'}."""
+    if cubo.empty:
+        return {}
+    filas = pd.util.hash_pandas_object(cubo.astype(str), index=False).to_numpy(dtype="uint64")
+    dias = inicio_periodo(cubo['dia'], "D").strftime("%Y-%m-%d")
+    huellas = pd.Series(filas).groupby(np.asarray(dias)).agg(lambda h: int(np.bitwise_xor.reduce(h.to_numpy())))
+    return {dia: str(valor) for dia, valor in huellas.items()}
+
+
+def _agregar_periodos(cubo, frecuencia):
+    """Sumas y conteos por (periodo, Agente) y la fila general por periodo."""
+    columnas = [c for c in cubo.columns if c == 'llamadas' or c.endswith(cubos.SUFIJO_SUMA) or c.endswith(cubos.SUFIJO_CONTEO)]
+    base = cubo[['Agente'] + columnas].assign(periodo=inicio_periodo(cubo['dia'], frecuencia))
+    por_agente = base.groupby(['periodo', 'Agente'], observed=True)[columnas].sum().reset_index()
+    general = base.groupby('periodo')[columnas].sum().reset_index().assign(Agente=TODOS)
+    return pd.concat([por_agente, general], ignore_index=True).assign(frecuencia=frecuencia)
+
+
+def actualizar(cubo, previo=None, huellas_previas=None):
+    """Construye las series de tendencia a partir del cubo diario.
+
+    `previo` y `huellas_previas` son las series y huellas de la versión anterior
+    (o None la primera vez). Devuelve `(series, metadatos)`; los metadatos
+    guardan las huellas nuevas y cuántos periodos se recalcularon.
+    """
+    huellas = huellas_por_dia(cubo)
+    if previo is None or huellas_previas is None:
+        dias_cambiados = set(huellas)
+    else:
+        dias_cambiados = {d for d, h in huellas.items() if huellas_previas.get(d) != h}
+        dias_cambiados |= set(huellas_previas) - set(huellas)  # días que desaparecieron
+
+    partes = []
+    recalculados = {}
+    dias_cubo = inicio_periodo(cubo['dia'], "D")
+    for frecuencia in FRECUENCIAS:
+        afectados = set(inicio_periodo(pd.to_datetime(sorted(dias_cambiados)), frecuencia)) if dias_cambiados else set()
+        recalculados[frecuencia] = len(afectados)
+        if previo is not None:
+            anteriores = previo[previo['frecuencia'] == frecuencia]
+            periodos_previos = inicio_periodo(anteriores['periodo'], "D")
+            partes.append(anteriores[~periodos_previos.isin(list(afectados))])
+        if afectados:
+            en_afectados = inicio_periodo(dias_cubo, frecuencia).isin(list(afectados))
+            partes.append(_agregar_periodos(cubo[np.asarray(en_afectados)], frecuencia))
+
+    partes = [p for p in partes if not p.empty]
+    series = pd.concat(partes, ignore_index=True) if partes else _agregar_periodos(cubo.iloc[:0], "D")
+    series = series.sort_values(['frecuencia', 'Agente', 'periodo'], ignore_index=True)
+    return series, {"huellas": huellas, "periodos_recalculados": recalculados}
+
+
+def serie(series, frecuencia, agente=TODOS, ventana=None, desde=None, hasta=None):
+    """Medias (por periodo y móviles) de las métricas de tendencia para un agente.
+
+    Devuelve un DataFrame indexado por 'periodo' con, por métrica, la media del
+    periodo y la media móvil de `ventana` periodos (ponderada por número de
+    llamadas). Los periodos sin llamadas se incluyen vacíos para que la ventana
+    cuente periodos de calendario.
+    """
+    ventana = ventana or FRECUENCIAS[frecuencia][1]
+    filas = series[(series['frecuencia'] == frecuencia) & (series['Agente'] == agente)]
+    if filas.empty:
+        return pd.DataFrame()
+    filas = filas.assign(periodo=inicio_periodo(filas['periodo'], "D")).set_index('periodo').sort_index()
+
+    calendario = pd.date_range(filas.index.min(), filas.index.max(),
+                               freq={"D": "D", "W": "W-MON", "M": "MS"}[frecuencia])
+    resultado = pd.DataFrame(index=calendario.rename('periodo'))
+    resultado['llamadas'] = filas['llamadas'].astype('float64').reindex(calendario, fill_value=0)
+    for metrica in METRICAS_TENDENCIA:
+        if metrica + cubos.SUFIJO_SUMA not in filas.columns:
+            continue
+        suma = filas[metrica + cubos.SUFIJO_SUMA].astype('float64').reindex(calendario, fill_value=0)
+        conteo = filas[metrica + cubos.SUFIJO_CONTEO].astype('float64').reindex(calendario, fill_value=0)
+        resultado[metrica] = suma / conteo.replace(0, np.nan)
+        resultado[f"{metrica} (media móvil)"] = (
+            suma.rolling(ventana, min_periods=1).sum() / conteo.rolling(ventana, min_periods=1).sum().replace(0, np.nan)
+        )
+
+    if desde is not None:
+        resultado = resultado[resultado.index >= inicio_periodo([pd.Timestamp(desde)], frecuencia)[0]]
+    if hasta is not None:
+        resultado = resultado[resultado.index <= pd.Timestamp(hasta)]
+    return resultado
+
+
+def mostrar_tendencias(series, agentes, desde=None, hasta=None, clave="tendencias"):
+    """Sección de tendencias para las páginas del tablero."""
+    st.markdown("### 📉 Tendencia en el tiempo")
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        agente = st.selectbox("Agente", [TODOS] + list(agentes), key=f"{clave}_agente")
+    with col2:
+        frecuencia = st.radio(
+            "Periodo", list(FRECUENCIAS), format_func=lambda f: FRECUENCIAS[f][0],
+            horizontal=True, key=f"{clave}_frecuencia"
+        )
+    with col3:
+        ventana = st.number_input(
+            "Ventana media móvil", min_value=1, max_value=60,
+            value=FRECUENCIAS[frecuencia][1], key=f"{clave}_ventana_{frecuencia}"
+        )
+
+    datos_serie = serie(series, frecuencia, agente, int(ventana), desde, hasta)
+    if datos_serie.empty:
+        st.info("No hay datos de tendencia para la selección actual.")
+        return
+    st.plotly_chart(graficos.figura_tendencia(datos_serie, METRICAS_TENDENCIA), use_container_width=True)
@@ -0,0 +1,390 @@
+# ===================================================
+# Pipeline de audio a puntajes (transcripción + calificación)
+# ===================================================
+# Produce, a partir de las grabaciones, las columnas que los tableros leen de
+# los Excel: transcripción resumida en 'Palabras'/'Oraciones', los pasos del
+# guion ('Conteo_*' en servicio, 0/1 en ventas), 'Puntaje_Total_%',
+# 'Estado_Llamada', sentimiento, polaridad, subjetividad y confianza.
+#
+# Uso (desde la raíz del proyecto):
+#   python -m tablero.transcripcion --conjunto servicio --audios data/audios
+#   python -m tablero.transcripcion --conjunto ventas --audios /grabaciones --procesos 2
+#
+# - Transcribe en CPU con faster-whisper (int8) usando su pipeline por lotes:
+#   los segmentos de voz de cada audio se decodifican juntos en un lote.
+# - Varios procesos trabajadores; cada uno carga los modelos UNA vez al iniciar
+#   y recibe lotes de archivos. Los núcleos se reparten entre procesos para no
+#   sobresuscribir la CPU (procesos × hilos ≈ núcleos disponibles).
+# - El sentimiento se califica por lote de transcripciones con transformers.
+# - Punto de control: cada lote terminado se agrega a un archivo JSONL en el
+#   almacén. Al volver a correr se saltan los audios ya procesados (misma ruta,
+#   tamaño y fecha de modificación), así que una corrida interrumpida continúa
+#   donde quedó.
+# - Al final todas las filas, con su transcripción en 'Transcripcion', se
+#   publican en el almacén compartido como '<conjunto>_audio'
+#   (tablero/almacen.py) y se informa el rendimiento en llamadas por minuto de
+#   CPU. Al preparar los datos de cada conjunto (tablero/datos.py) esas filas se
+#   cruzan con las llamadas del Excel por nombre de audio: las páginas muestran
+#   los puntajes del pipeline con el Agente y la Fecha de cada llamada.
+#
+# faster-whisper, transformers y torch solo se importan dentro de los procesos
+# trabajadores: el tablero puede importar este módulo sin tenerlos instalados.
+import argparse
+import json
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from tablero import almacen, datos
+
+MODELO_WHISPER = "small"
+MODELO_SENTIMIENTO = "pysentimiento/robertuito-sentiment-analysis"
+
+EXTENSIONES_AUDIO = {".wav", ".mp3", ".ogg", ".gsm", ".m4a", ".flac"}
+
+FRECUENCIA_MUESTREO = 16000
+# Audios más cortos o más silenciosos que esto se marcan como vacíos sin transcribir
+DURACION_MINIMA_S = 1.0
+AMPLITUD_MINIMA = 1e-4
+
+# Archivos por lote enviado a cada trabajador y segmentos por lote de whisper
+ARCHIVOS_POR_LOTE = 8
+SEGMENTOS_POR_LOTE = 8
+
+# Puntaje desde el cual la llamada se considera efectiva (6 de 7 pasos)
+UMBRAL_EFECTIVA = 85.0
+
+# Frases por paso del guion. Se buscan sobre el texto en minúsculas y sin tildes.
+PASOS_SERVICIO = {
+    "Conteo_saludo_inicial": ["buenos dias", "buenas tardes", "buenas noches", "bienvenido", "mi nombre es", "le habla"],
+    "Conteo_identificacion_cliente": ["con quien tengo el gusto", "su nombre", "numero de documento", "cedula",
+                                      "identificacion", "me confirma"],
+    "Conteo_comprension_problema": ["en que le puedo ayudar", "en que le puedo colaborar", "entiendo", "comprendo",
+                                    "cual es el inconveniente", "me indica"],
+    "Conteo_ofrecimiento_solucion": ["le ofrezco", "vamos a realizar", "la solucion", "procedemos", "le ayudo",
+                                     "podemos hacer"],
+    "Conteo_manejo_inquietudes": ["alguna otra inquietud", "alguna pregunta", "alguna duda", "le explico",
+                                  "le aclaro", "algo mas en lo que"],
+    "Conteo_cierre_servicio": ["gracias por comunicarse", "que tenga un buen dia", "feliz dia", "feliz tarde",
+                               "fue un gusto", "hasta luego"],
+    "Conteo_proximo_paso": ["le llegara", "le enviaremos", "recibira", "en las proximas", "numero de radicado",
+                            "el siguiente paso"],
+}
+
+PASOS_VENTAS = {
+    "apertura": ["buenos dias", "buenas tardes", "buenas noches", "mi nombre es", "le habla", "le saluda"],
+    "presentacion_beneficio": ["beneficio", "descuento", "promocion", "sin costo", "gratis", "ventaja"],
+    "creacion_necesidad": ["necesita", "le serviria", "le gustaria", "actualmente usted", "cuanto paga", "le interesa"],
+    "manejo_objeciones": ["entiendo", "comprendo", "no se preocupe", "le garantizo", "sin compromiso", "precisamente"],
+    "cierre": ["lo activamos", "procedemos", "acepta", "le confirmo", "queda registrado", "firmar"],
+    "confirmacion_bienvenida": ["bienvenido", "bienvenida", "ya hace parte", "queda activo", "felicitaciones"],
+    "consejos_cierre": ["recuerde", "le recomiendo", "tenga en cuenta", "no olvide", "cualquier inquietud"],
+}
+
+# Contexto de cada proceso trabajador (lo fija _iniciar_trabajador)
+_MODELOS = {}
+
+
+# ===================================================
+# Calificación del texto (sin modelos, testeable aparte)
+# ===================================================
+def normalizar_texto(texto):
+    """Minúsculas, sin tildes y con espacios simples."""
+    sin_tildes = unicodedata.normalize("NFKD", texto or "")
+    sin_tildes = "".join(c for c in sin_tildes if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", sin_tildes.lower()).strip()
+
+
+def normalizar_nombre(nombre):
+    """Forma de 'NombreAudios_Normalizado': minúsculas y separadores como espacios."""
+    return re.sub(r"[\s._\-]+", " ", str(nombre).lower()).strip()
+
+
+def _patrones(pasos):
+    return {paso: re.compile(r"\b(?:" + "|".join(re.escape(f) for f in frases) + r")\b")
+            for paso, frases in pasos.items()}
+
+
+_PATRONES = {"servicio": _patrones(PASOS_SERVICIO), "ventas": _patrones(PASOS_VENTAS)}
+
+
+def contar_pasos(texto, conjunto):
+    """Apariciones de las frases de cada paso del guion en `texto`."""
+    normalizado = normalizar_texto(texto)
+    return {paso: len(patron.findall(normalizado)) for paso, patron in _PATRONES[conjunto].items()}
+
+
+def puntaje_total(conteos):
+    """Porcentaje de pasos del guion que aparecen al menos una vez."""
+    if not conteos:
+        return 0.0
+    return round(100 * sum(1 for c in conteos.values() if c >= 1) / len(conteos), 2)
+
+
+def contar_palabras_oraciones(texto):
+    texto = (texto or "").strip()
+    if not texto:
+        return 0, 0
+    return len(texto.split()), len([o for o in re.split(r"[.!?¿¡]+", texto) if o.strip()])
+
+
+def calificar(analisis, conjunto):
+    """Convierte el análisis de un audio en una fila con el esquema del Excel del conjunto.
+
+    `analisis` trae 'audio', 'nombre', 'peso', 'vacio', 'texto' y las
+    probabilidades 'pos', 'neg', 'neu' del modelo de sentimiento.
+    """
+    texto = analisis["texto"]
+    palabras, oraciones = contar_palabras_oraciones(texto)
+    sin_texto = analisis["vacio"] or palabras == 0
+    conteos = contar_pasos(texto, conjunto)
+    puntaje = puntaje_total(conteos)
+    pos, neg, neu = analisis.get("pos", 0.0), analisis.get("neg", 0.0), analisis.get("neu", 0.0)
+    polaridad = 0.0 if sin_texto else round(pos - neg, 2)
+    subjetividad = 0.0 if sin_texto else round(1 - neu, 2)
+    nombre_txt = Path(analisis["nombre"]).with_suffix("").name
+
+    if conjunto == "servicio":
+        etiqueta = max((("pos", pos), ("neg", neg), ("neu", neu)), key=lambda par: par[1])
+        return {
+            "Archivo_Analizado": f"{nombre_txt}.TXT",
+            "Archivo_Vacio": "Sí" if sin_texto else "No",
+            "audio": analisis["audio"],
+            "NombreAudios": f"{nombre_txt}.TXT",
+            "NombreAudios_Normalizado": normalizar_nombre(f"{nombre_txt}.TXT"),
+            **conteos,
+            "Puntaje_Total_%": puntaje,
+            "Estado_Llamada": "✅ Efectiva" if puntaje >= UMBRAL_EFECTIVA else "❌ No Efectiva",
+            "Sentimiento": "Sin texto" if sin_texto else etiqueta[0],
+            "Polarity": polaridad,
+            "Subjectivity": subjetividad,
+            "Confianza": 0.0 if sin_texto else round(etiqueta[1], 2),
+            "Palabras": palabras,
+            "Oraciones": oraciones,
+        }
+
+    return {
+        "Estado Archivo": "Encontrado",
+        "Peso Archivo (Bytes)": analisis["peso"],
+        **{paso: int(c >= 1) for paso, c in conteos.items()},
+        "Puntaje_Total_%": puntaje,
+        "Polarity": polaridad,
+        "Subjectivity": subjetividad,
+        "clasificacion": "positivo" if pos >= neg else "negativo",
+        "Confianza": round(max(pos, neg) / ((pos + neg) or 1), 2),
+        "Palabra": palabras,
+        "Oraciones": oraciones,
+        "archivo": f"{nombre_txt}.txt",
+        "audio": analisis["audio"],
+    }
+
+
+# ===================================================
+# Trabajadores (modelos cargados una vez por proceso)
+# ===================================================
+def _iniciar_trabajador(conjunto, modelo, hilos):
+    import torch
+    from faster_whisper import BatchedInferencePipeline, WhisperModel
+    from transformers import pipeline
+
+    torch.set_num_threads(hilos)
+    whisper = WhisperModel(modelo, device="cpu", compute_type="int8", cpu_threads=hilos)
+    _MODELOS["conjunto"] = conjunto
+    _MODELOS["whisper"] = BatchedInferencePipeline(model=whisper)
+    _MODELOS["sentimiento"] = pipeline("text-classification", model=MODELO_SENTIMIENTO,
+                                       top_k=None, truncation=True, device=-1)
+
+
+def _transcribir(ruta):
+    """Texto del audio, o None si está vacío (muy corto o en silencio)."""
+    from faster_whisper import decode_audio
+
+    if ruta.stat().st_size == 0:
+        return None
+    senal = decode_audio(str(ruta), sampling_rate=FRECUENCIA_MUESTREO)
+    if len(senal) < DURACION_MINIMA_S * FRECUENCIA_MUESTREO or float(abs(senal).max()) < AMPLITUD_MINIMA:
+        return None
+    segmentos, _ = _MODELOS["whisper"].transcribe(senal, language="es", beam_size=1,
+                                                  batch_size=SEGMENTOS_POR_LOTE)
+    return " ".join(s.text.strip() for s in segmentos).strip()
+
+
+def _procesar_lote(trabajos):
+    """Transcribe y califica un lote de audios. Corre dentro de un proceso trabajador.
+
+    Devuelve `(registros, errores)`; los audios con error no se guardan en el
+    punto de control para que se reintenten en la próxima corrida.
+    """
+    analisis, errores = [], []
+    for clave, ruta, relativa in trabajos:
+        try:
+            texto = _transcribir(Path(ruta))
+        except Exception as error:  # audio corrupto o formato no soportado
+            errores.append((relativa, str(error)))
+            continue
+        analisis.append({"clave": clave, "audio": relativa, "nombre": Path(ruta).name,
+                         "peso": Path(ruta).stat().st_size, "vacio": texto is None, "texto": texto or ""})
+
+    # El sentimiento se califica en un solo llamado para todo el lote
+    con_texto = [a for a in analisis if a["texto"]]
+    if con_texto:
+        salidas = _MODELOS["sentimiento"]([a["texto"] for a in con_texto], batch_size=len(con_texto))
+        for a, etiquetas in zip(con_texto, salidas):
+            a.update({e["label"].lower(): float(e["score"]) for e in etiquetas})
+
+    registros = [{"clave": a["clave"], "texto": a["texto"], "fila": calificar(a, _MODELOS["conjunto"])}
+                 for a in analisis]
+    return registros, errores
+
+
+# ===================================================
+# Punto de control y publicación
+# ===================================================
+def ruta_punto_control(conjunto, carpeta=almacen.CARPETA_ALMACEN):
+    return Path(carpeta) / f"{conjunto}_audio.jsonl"
+
+
+def clave_audio(ruta, relativa):
+    """Identifica un audio por ruta relativa, tamaño y fecha de modificación."""
+    info = ruta.stat()
+    return f"{relativa}|{info.st_size}|{info.st_mtime_ns}"
+
+
+def leer_punto_control(ruta):
+    """Registros ya procesados, por clave (el último gana)."""
+    registros = {}
+    if not ruta.exists():
+        return registros
+    with open(ruta, encoding="utf-8") as entrada:
+        for linea in entrada:
+            try:
+                registro = json.loads(linea)
+            except json.JSONDecodeError:
+                # Última línea a medio escribir si la corrida se cortó
+                continue
+            registros[registro["clave"]] = registro
+    return registros
+
+
+def buscar_audios(carpeta):
+    """(ruta, ruta relativa con '/') de cada audio bajo `carpeta`, en orden."""
+    carpeta = Path(carpeta)
+    return [(ruta, ruta.relative_to(carpeta).as_posix())
+            for ruta in sorted(carpeta.rglob("*"))
+            if ruta.is_file() and ruta.suffix.lower() in EXTENSIONES_AUDIO]
+
+
+def publicar_resultados(conjunto, registros, metadatos):
+    """Publica las filas del punto de control, con su transcripción, como '<conjunto>_audio' en el almacén."""
+    filas = pd.DataFrame([{**r["fila"], datos.COLUMNA_TRANSCRIPCION: r["texto"]} for r in registros.values()])
+    if not filas.empty:
+        # Si un audio se reemplazó queda solo su versión más reciente
+        filas = filas.drop_duplicates(subset="audio", keep="last").reset_index(drop=True)
+    ruta = ruta_punto_control(conjunto)
+    return almacen.publicar(filas, f"{conjunto}_audio", almacen.version_origen(ruta), metadatos)
+
+
+def _segundos_cpu():
+    """CPU usada por este proceso y sus hijos ya terminados, o None si no se puede medir."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    propio = resource.getrusage(resource.RUSAGE_SELF)
+    hijos = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return propio.ru_utime + propio.ru_stime + hijos.ru_utime + hijos.ru_stime
+
+
+def procesar(conjunto, carpeta_audios, procesos=None, hilos=None, modelo=MODELO_WHISPER, limite=None):
+    """Procesa los audios pendientes de `carpeta_audios` y publica el resultado.
+
+    Devuelve un resumen con procesados, omitidos, errores y rendimiento.
+    """
+    nucleos = os.cpu_count() or 1
+    procesos = procesos or max(1, nucleos // 4)
+    hilos = hilos or max(1, nucleos // procesos)
+
+    ruta_control = ruta_punto_control(conjunto)
+    ruta_control.parent.mkdir(parents=True, exist_ok=True)
+    registros = leer_punto_control(ruta_control)
+
+    pendientes, omitidos = [], 0
+    for ruta, relativa in buscar_audios(carpeta_audios):
+        clave = clave_audio(ruta, relativa)
+        if clave in registros:
+            omitidos += 1
+        else:
+            pendientes.append((clave, str(ruta), relativa))
+    if limite:
+        pendientes = pendientes[:limite]
+
+    inicio, cpu_inicio = time.perf_counter(), _segundos_cpu()
+    procesados, errores = 0, []
+    if pendientes:
+        lotes = [pendientes[i:i + ARCHIVOS_POR_LOTE] for i in range(0, len(pendientes), ARCHIVOS_POR_LOTE)]
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                                 initargs=(conjunto, modelo, hilos)) as ejecutor, \
+                open(ruta_control, "a", encoding="utf-8") as salida:
+            futuros = [ejecutor.submit(_procesar_lote, lote) for lote in lotes]
+            for futuro in as_completed(futuros):
+                nuevos, errores_lote = futuro.result()
+                for registro in nuevos:
+                    salida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                    registros[registro["clave"]] = registro
+                # Cada lote queda en disco antes de seguir: es el punto de reanudación
+                salida.flush()
+                os.fsync(salida.fileno())
+                procesados += len(nuevos)
+                errores += errores_lote
+                print(f"  {procesados}/{len(pendientes)} audios procesados")
+
+    segundos = time.perf_counter() - inicio
+    cpu_fin = _segundos_cpu()
+    if cpu_inicio is not None and cpu_fin is not None:
+        minutos_cpu = (cpu_fin - cpu_inicio) / 60
+    else:
+        # Sin medición de CPU se estima con los núcleos asignados
+        minutos_cpu = segundos * procesos * hilos / 60
+    resumen = {
+        "procesados": procesados,
+        "omitidos": omitidos,
+        "errores": errores,
+        "segundos": round(segundos, 1),
+        "minutos_cpu": round(minutos_cpu, 2),
+        "llamadas_por_minuto_cpu": round(procesados / minutos_cpu, 2) if minutos_cpu else None,
+        "procesos": procesos,
+        "hilos": hilos,
+        "modelo": modelo,
+    }
+    # Sin audios nuevos no hay nada que republicar
+    if registros and almacen.version_publicada(f"{conjunto}_audio") != almacen.version_origen(ruta_control):
+        publicar_resultados(conjunto, registros, resumen)
+    return resumen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe y califica audios de llamadas y publica los puntajes en el almacén.")
+    parser.add_argument("--conjunto", choices=["servicio", "ventas"], required=True, help="Esquema de columnas a producir")
+    parser.add_argument("--audios", default=str(datos.CARPETA_AUDIOS), help="Carpeta con las grabaciones (se recorre completa)")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos trabajadores (por defecto: núcleos / 4)")
+    parser.add_argument("--hilos", type=int, default=None, help="Hilos por proceso (por defecto: núcleos / procesos)")
+    parser.add_argument("--modelo", default=MODELO_WHISPER, help=f"Modelo de faster-whisper (por defecto: {MODELO_WHISPER})")
+    parser.add_argument("--limite", type=int, default=None, help="Procesar como máximo N audios pendientes")
+    args = parser.parse_args(argv)
+
+    resumen = procesar(args.conjunto, args.audios, args.procesos, args.hilos, args.modelo, args.limite)
+    for relativa, error in resumen["errores"]:
+        print(f"⚠️ {relativa}: {error}")
+    rendimiento = resumen["llamadas_por_minuto_cpu"]
+    print(f"✅ {args.conjunto}: {resumen['procesados']} audios procesados, {resumen['omitidos']} ya estaban en el punto de control, "
+          f"{len(resumen['errores'])} con error ({resumen['segundos']} s, {resumen['minutos_cpu']} min de CPU, "
+          f"{rendimiento if rendimiento is not None else 'N/A'} llamadas por minuto de CPU)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import sys
+from pathlib import Path
+
+# Las pruebas importan el paquete `tablero` desde la raíz del repositorio
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tablero import almacen, cubos
+
+METRICAS = ['Puntaje_Total_%', 'Polarity', 'Confianza']
+
+
+def _llamadas(dias, seed):
+    rng = np.random.default_rng(seed)
+    n = 30 * dias
+    return pd.DataFrame({
+        'fecha_convertida': pd.Timestamp('2025-04-20') + pd.to_timedelta(rng.integers(0, dias * 24, n), unit='h'),
+        'Agente': rng.choice(['Ana', 'Beto', 'Carla'], n),
+        'Puntaje_Total_%': rng.uniform(0, 100, n),
+        'Polarity': rng.uniform(-1, 1, n),
+        'Confianza': rng.uniform(0, 1, n),
+    })
+
+
+@pytest.fixture
+def versiones_cubo():
+    """Cubo diario de una versión del Excel y de la siguiente.
+
+    La siguiente agrega días al final, cambia llamadas de un día ya publicado y
+    quita todas las de otro, para que la actualización incremental recalcule
+    periodos del medio además de los nuevos.
+    """
+    anterior = _llamadas(40, seed=1)
+    siguiente = pd.concat([anterior, _llamadas(55, seed=2).query("fecha_convertida >= '2025-05-30'")],
+                          ignore_index=True)
+    dia = siguiente['fecha_convertida'].dt.floor('D')
+    siguiente.loc[dia == '2025-05-05', 'Puntaje_Total_%'] = 1.0
+    siguiente = siguiente[dia != '2025-05-12']
+    return cubos.cubo_diario(anterior, METRICAS), cubos.cubo_diario(siguiente, METRICAS)
+
+
+@pytest.fixture
+def publicar_y_abrir(tmp_path):
+    """Pasa `(df, metadatos)` por el almacén, como hace datos._incremental entre versiones."""
+    def publicar_y_abrir(df, metadatos, nombre):
+        almacen.publicar(df, nombre, "v", metadatos, carpeta=tmp_path)
+        return almacen.abrir(nombre, carpeta=tmp_path)
+    return publicar_y_abrir
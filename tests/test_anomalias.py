@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from tablero import almacen, anomalias, cubos
+
+METRICAS = ['Puntaje_Total_%', 'Polarity']
+
+
+def llamadas(dias, agentes=('Ana', 'Beto'), por_dia=5, seed=3):
+    rng = np.random.default_rng(seed)
+    filas = [(pd.Timestamp('2025-05-01') + pd.Timedelta(days=d, hours=h), agente)
+             for d in range(dias) for agente in agentes for h in range(por_dia)]
+    df = pd.DataFrame(filas, columns=['fecha_convertida', 'Agente'])
+    df['Puntaje_Total_%'] = rng.uniform(60, 90, len(df))
+    df['Polarity'] = rng.uniform(-0.2, 0.4, len(df))
+    return df
+
+
+def test_sin_dias_evaluables_devuelve_marco_tipado():
+    # Con dos días ningún agente junta la historia mínima: nada es evaluable
+    resultado = anomalias.detectar(cubos.cubo_diario(llamadas(2), METRICAS), METRICAS)
+
+    assert resultado.empty
+    assert list(resultado.columns) == ['dia', 'Agente', 'llamadas', 'puntaje_anomalia', 'anomalia', 'caidas']
+    assert resultado['dia'].dtype.kind == 'M'
+    assert resultado['anomalia'].dtype == bool
+
+
+def test_vacio_publicado_se_filtra_por_agentes(tmp_path):
+    resultado = anomalias.detectar(cubos.cubo_diario(llamadas(2), METRICAS), METRICAS)
+    almacen.publicar(resultado, 'prueba_anomalias', 'v1', carpeta=tmp_path)
+    publicado, _ = almacen.abrir('prueba_anomalias', carpeta=tmp_path)
+
+    marcados = anomalias.agentes_marcados(publicado, pd.Timestamp('2025-05-01').date(),
+                                          pd.Timestamp('2025-05-02').date(), ['Ana'])
+    assert marcados.empty
+
+
+def test_caida_marcada_por_agente():
+    df = llamadas(30)
+    caida = (df['Agente'] == 'Beto') & (df['fecha_convertida'].dt.day == 25)
+    df.loc[caida, 'Puntaje_Total_%'] = 5.0
+    df.loc[caida, 'Polarity'] = -0.9
+    resultado = anomalias.detectar(cubos.cubo_diario(df, METRICAS), METRICAS)
+
+    marcados = anomalias.agentes_marcados(resultado, agentes=['Ana', 'Beto'])
+    assert 'Beto' in set(marcados['Agente'])
+    assert set(anomalias.agentes_marcados(resultado, agentes=['Ana'])['Agente']) <= {'Ana'}
@@ -0,0 +1,54 @@
+import pandas as pd
+
+from tablero import conciliacion
+
+
+def inventario(*audios, vacios=()):
+    return pd.DataFrame({
+        "audio": list(audios),
+        "Archivo_Vacio": ["Sí" if a in vacios else "No" for a in audios],
+    })
+
+
+def test_cruza_por_nombre_normalizado():
+    llamadas = pd.DataFrame({
+        "Agente": ["Ana", "Beto", "Carla"],
+        "audio": ["9/2025/05/01/00/1746078448.360531.WAV", "1746078500.1.wav", None],
+        "NombreAudios": [None, None, "1746078600.2.wav"],
+    })
+    coincidencia, reporte = conciliacion.conciliar(
+        llamadas, inventario("1746078448.360531.TXT", "1746078600 2 txt", "huerfano.txt"), "servicio")
+
+    assert coincidencia.tolist() == ["Sí", "No", "Sí"]
+    assert reporte["emparejados"]["fila_llamada"].sort_values().tolist() == [0, 2]
+    assert set(reporte["emparejados"]["emparejado_por"]) == {"nombre"}
+    assert reporte["audios_sin_llamada"]["audio"].tolist() == ["huerfano.txt"]
+    assert reporte["llamadas_sin_audio"]["Agente"].tolist() == ["Beto"]
+
+
+def test_identificador_de_pocos_valores_no_cruza():
+    # Como en el Excel de servicio: la columna solo guarda el evento de cuelgue
+    llamadas = pd.DataFrame({
+        "audio": [f"{i}.wav" for i in range(20)],
+        conciliacion.COLUMNA_IDENTIFICADOR: ["COMPLETEAGENT", "COMPLETECALLER"] * 10,
+    })
+    assert not conciliacion.identificador_util(llamadas)
+    coincidencia, reporte = conciliacion.conciliar(llamadas, inventario("completeagent.txt"), "servicio")
+
+    assert (coincidencia == "No").all()
+    assert reporte["emparejados"].empty
+    assert len(reporte["audios_sin_llamada"]) == 1
+
+
+def test_identificador_de_archivo_cruza_lo_que_falta_por_nombre():
+    llamadas = pd.DataFrame({
+        "archivo": ["a.wav", None, None],
+        conciliacion.COLUMNA_IDENTIFICADOR: ["1.1", "2.2", "3.3"],
+    })
+    assert conciliacion.identificador_util(llamadas)
+    coincidencia, reporte = conciliacion.conciliar(llamadas, inventario("a.txt", "2.2.txt", vacios=("2.2.txt",)), "ventas")
+
+    assert coincidencia.tolist() == ["Sí", "Sí", "No"]
+    por = reporte["emparejados"].set_index("fila_llamada")["emparejado_por"]
+    assert por.to_dict() == {0: "nombre", 1: "identificador"}
+    assert reporte["audios_vacios"]["audio"].tolist() == ["2.2.txt"]
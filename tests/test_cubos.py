@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tablero import cubos
+
+METRICAS = ['Puntaje_Total_%', 'Polarity']
+
+
+@pytest.fixture
+def llamadas():
+    rng = np.random.default_rng(7)
+    n = 400
+    df = pd.DataFrame({
+        'fecha_convertida': pd.Timestamp('2025-05-01') + pd.to_timedelta(rng.integers(0, 30 * 24, n), unit='h'),
+        'Agente': rng.choice(['Ana', 'Beto', 'Carla', 'Dario'], n),
+        'Cola': rng.choice(['soporte', 'ventas'], n),
+        'Puntaje_Total_%': rng.uniform(0, 100, n),
+        'Polarity': rng.uniform(-1, 1, n),
+    })
+    # Métricas faltantes y una llamada sin fecha, como en los Excel reales
+    df.loc[rng.choice(n, 40, replace=False), 'Polarity'] = np.nan
+    df.loc[0, 'fecha_convertida'] = pd.NaT
+    return df
+
+
+def esperado(df, desde, hasta, selecciones):
+    dia = df['fecha_convertida'].dt.floor('D')
+    filas = df[(dia >= pd.Timestamp(desde)) & (dia <= pd.Timestamp(hasta))]
+    for dimension, valores in selecciones.items():
+        filas = filas[filas[dimension].isin(valores)]
+    return filas.groupby(lambda _: 0)[METRICAS].agg(['mean', 'size'])
+
+
+@pytest.mark.parametrize('selecciones', [{}, {'Agente': ['Ana', 'Carla']}, {'Agente': ['Beto'], 'Cola': ['ventas']}])
+def test_resumen_igual_a_groupby(llamadas, selecciones):
+    cubo = cubos.cubo_diario(llamadas, METRICAS, dimensiones=('Agente', 'Cola'))
+    desde, hasta = pd.Timestamp('2025-05-08').date(), pd.Timestamp('2025-05-21').date()
+
+    resumen = cubos.resumen(cubo, desde, hasta, selecciones)
+    referencia = esperado(llamadas, desde, hasta, selecciones)
+
+    assert resumen['llamadas'] == referencia[('Puntaje_Total_%', 'size')].iloc[0]
+    for metrica in METRICAS:
+        assert resumen[metrica] == pytest.approx(referencia[(metrica, 'mean')].iloc[0])
+
+
+def test_resumen_del_periodo_anterior(llamadas):
+    cubo = cubos.cubo_diario(llamadas, METRICAS)
+    desde, hasta = cubos.periodo_anterior(pd.Timestamp('2025-05-15').date(), pd.Timestamp('2025-05-28').date())
+    assert (desde, hasta) == (pd.Timestamp('2025-05-01').date(), pd.Timestamp('2025-05-14').date())
+
+    referencia = esperado(llamadas, desde, hasta, {})
+    assert cubos.resumen(cubo, desde, hasta)['Polarity'] == pytest.approx(referencia[('Polarity', 'mean')].iloc[0])
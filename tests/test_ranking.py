@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tablero import cubos, ranking
+
+
+def normalizar(acumulados):
+    acumulados = acumulados.assign(dia=ranking._dias(acumulados['dia']), Agente=acumulados['Agente'].astype(str))
+    acumulados = acumulados.astype({c: 'float64' for c in ranking._columnas(acumulados)})
+    return acumulados.sort_values(['Agente', 'dia'], ignore_index=True)
+
+
+def test_incremental_igual_a_reconstruccion(versiones_cubo, publicar_y_abrir):
+    anterior, siguiente = versiones_cubo
+    previo, metadatos = publicar_y_abrir(*ranking.actualizar(anterior), "ranking")
+
+    incremental, info = ranking.actualizar(siguiente, previo, metadatos["huellas"])
+    completo, _ = ranking.actualizar(siguiente)
+
+    pd.testing.assert_frame_equal(normalizar(incremental), normalizar(completo))
+    # Se recalculó desde el primer día cambiado, no desde el principio
+    assert info["recalculado_desde"] == "2025-05-05"
+
+
+def test_sin_cambios_devuelve_el_previo(versiones_cubo, publicar_y_abrir):
+    anterior, _ = versiones_cubo
+    previo, metadatos = publicar_y_abrir(*ranking.actualizar(anterior), "ranking")
+
+    acumulados, info = ranking.actualizar(anterior, previo, metadatos["huellas"])
+
+    assert acumulados is previo
+    assert info["recalculado_desde"] is None
+
+
+@pytest.mark.parametrize('desde, hasta', [(None, None), ('2025-05-01', '2025-05-20'), ('2025-05-12', '2025-05-12')])
+def test_ventana_igual_a_combinar(versiones_cubo, desde, hasta):
+    _, siguiente = versiones_cubo
+    consulta = ranking.Ranking(ranking.actualizar(siguiente)[0])
+
+    ventana = consulta.ventana(desde, hasta)
+    esperado = cubos.combinar(cubos.ventana(siguiente, desde, hasta)).astype('float64')
+    esperado = esperado.reindex(ventana.index, fill_value=0.0)[ventana.columns]
+    pd.testing.assert_frame_equal(ventana, esperado, check_names=False)
+
+
+def test_mejores_y_peores(versiones_cubo):
+    _, siguiente = versiones_cubo
+    promedios = cubos.promedios(cubos.combinar(siguiente))
+
+    mejores, peores = ranking.Ranking(ranking.actualizar(siguiente)[0]).mejores_y_peores('Polarity', k=2)
+
+    assert mejores['Agente'].tolist() == promedios['Polarity'].nlargest(2).index.tolist()
+    assert peores['Agente'].tolist() == promedios['Polarity'].nsmallest(2).index.tolist()
+    np.testing.assert_allclose(mejores['Polarity'], promedios['Polarity'].nlargest(2))
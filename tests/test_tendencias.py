@@ -0,0 +1,43 @@
+import pandas as pd
+
+from tablero import tendencias
+
+
+def normalizar(series):
+    series = series.assign(periodo=tendencias.inicio_periodo(series['periodo'], "D"))
+    series = series.astype({c: 'float64' for c in series.columns if c not in ('periodo', 'Agente', 'frecuencia')})
+    series = series.astype({'Agente': str, 'frecuencia': str})
+    return series.sort_values(['frecuencia', 'Agente', 'periodo'], ignore_index=True)
+
+
+def test_incremental_igual_a_reconstruccion(versiones_cubo, publicar_y_abrir):
+    anterior, siguiente = versiones_cubo
+    previo, metadatos = publicar_y_abrir(*tendencias.actualizar(anterior), "tendencias")
+
+    incremental, info = tendencias.actualizar(siguiente, previo, metadatos["huellas"])
+    completa, _ = tendencias.actualizar(siguiente)
+
+    pd.testing.assert_frame_equal(normalizar(incremental), normalizar(completa))
+    # Solo se recalcularon los periodos tocados, no toda la serie
+    assert 0 < info["periodos_recalculados"]["D"] < anterior['dia'].nunique()
+
+
+def test_sin_cambios_no_recalcula(versiones_cubo, publicar_y_abrir):
+    anterior, _ = versiones_cubo
+    previo, metadatos = publicar_y_abrir(*tendencias.actualizar(anterior), "tendencias")
+
+    incremental, info = tendencias.actualizar(anterior, previo, metadatos["huellas"])
+
+    assert info["periodos_recalculados"] == {frecuencia: 0 for frecuencia in tendencias.FRECUENCIAS}
+    pd.testing.assert_frame_equal(normalizar(incremental), normalizar(tendencias.actualizar(anterior)[0]))
+
+
+def test_serie_general_igual_al_cubo(versiones_cubo):
+    _, siguiente = versiones_cubo
+    series, _ = tendencias.actualizar(siguiente)
+
+    serie = tendencias.serie(series, "D").dropna(subset=['Polarity'])
+    por_dia = siguiente.groupby('dia')[['Polarity__suma', 'Polarity__n']].sum()
+    esperado = por_dia['Polarity__suma'] / por_dia['Polarity__n']
+    pd.testing.assert_series_equal(serie['Polarity'], esperado.rename('Polarity'),
+                                   check_names=False, check_index_type=False, check_freq=False)